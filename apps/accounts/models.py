@@ -1,8 +1,8 @@
 import uuid
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.db import models
-import string
-import random
+
+from apps.utils.slugs import SlugAllocator
 
 # from Jobapp.models import User as JobUser
 # Create your models here.
@@ -39,9 +39,20 @@ class UserManager(BaseUserManager):
         user.save(using=self._db)
         return user
 
-def generate_unique_slug(length=8):
-    characters = string.ascii_uppercase + string.digits  # Uppercase letters and digits
-    return ''.join(random.choices(characters, k=length))
+class SlugBlock(models.Model):
+    """Reserved block of slug sequence numbers, see SlugAllocator.
+    The auto-increment id is the block number"""
+
+    class Meta:
+        db_table = "tbl_slug_block"
+
+    id = models.BigAutoField(primary_key=True)
+    name = models.CharField(max_length=20)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+user_slugs = SlugAllocator("user")
+
 
 class User(AbstractBaseUser):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -77,10 +88,7 @@ class User(AbstractBaseUser):
 
     def save(self, *args, **kwargs):
         if not self.slug:  # Generate slug only if it doesn't exist
-            unique_slug = generate_unique_slug()
-            while User.objects.filter(slug=unique_slug).exists():  # Ensure uniqueness
-                unique_slug = generate_unique_slug()
-            self.slug = unique_slug
+            self.slug = user_slugs.allocate()
         super().save(*args, **kwargs)
 
     class Meta:
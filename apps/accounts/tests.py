@@ -13,6 +13,7 @@ from apps.accounts.renderers import UserRenderer  # Replace with actual import p
 from apps.accounts.serializers import (
     UserRegistrationSerializer,  # Replace with actual import path
 )
+from apps.utils.slugs import SlugAllocator
 
 from .models import User
 
@@ -48,3 +49,29 @@ class UserRegistrationViewTest(TestCase):
         )
         self.assertIn("token", response.data)
         self.assertEqual(response.data["token"], "your-token")
+
+
+class SlugAllocatorTestCase(TestCase):
+    def test_slugs_are_unique_without_lookups(self):
+        allocator = SlugAllocator("test", block_size=50)
+        allocator.allocate()
+
+        with self.assertNumQueries(0):
+            slugs = allocator.allocate_many(49)
+
+        with self.assertNumQueries(2):
+            slugs += allocator.allocate_many(60)
+
+        self.assertEqual(len(set(slugs)), len(slugs))
+        self.assertTrue(all(len(slug) == 9 and slug.isalnum() for slug in slugs))
+
+    def test_separate_allocators_never_overlap(self):
+        first = SlugAllocator("first", block_size=10).allocate_many(25)
+        second = SlugAllocator("second", block_size=10).allocate_many(25)
+        self.assertFalse(set(first) & set(second))
+
+    def test_user_save_assigns_slug(self):
+        user = User.objects.create_user(
+            email="slug@testing.com", name="Slug User", user_type="Employer"
+        )
+        self.assertEqual(len(user.slug), 9)
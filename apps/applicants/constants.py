@@ -6,3 +6,19 @@ STATUS_CHOICES = (
     ("on-hold", "On-Hold"),
     ("applied", "Applied"),
 )
+
+# columns of the applicant pipeline board, in the order they are shown
+PIPELINE_STATUSES = (
+    "applied",
+    "under-reviewed",
+    "shortlisted",
+    "on-hold",
+    "accepted",
+    "rejected",
+)
+
+# most application ids a bulk status update may list
+BULK_STATUS_MAX_ITEMS = 1000
+
+# longest Idempotency-Key header ApplyToJob accepts
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
@@ -0,0 +1,151 @@
+"""
+Streaming export of an employer's applicants as CSV or NDJSON.
+
+Rows are read in keyset batches on (created_at, id), each batch sought
+from the last row of the previous one, so only one batch is held in
+memory whatever the database driver buffers, and every row is encoded
+and handed to the response as soon as its batch is read. The header goes
+out before the first batch is fetched.
+"""
+
+import csv
+import json
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from apps.applicants.utils import entries
+
+# (column, value path) of an exported application
+COLUMNS = (
+    ("application_id", "id"),
+    ("status", "status"),
+    ("applied_at", "created_at"),
+    ("updated_at", "updated_at"),
+    ("job_id", "job_id"),
+    ("job_slug", "job__slug"),
+    ("job_role", "job__job_role"),
+    ("applicant_name", "user__user__name"),
+    ("applicant_email", "user__user__email"),
+    ("experience", "user__experience"),
+    ("profession", "user__profession"),
+    ("phone", "user__phone"),
+    ("address", "user__address"),
+    ("website", "user__website"),
+    ("resume", "user__resume"),
+    ("professional_skills", "user__professional_skills"),
+    ("education", "user__education"),
+    ("work_experience", "user__work_experience"),
+)
+
+# leading characters which make spreadsheet applications read a cell as a
+# formula, such cells are written with a ' in front to keep them text
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def escape_cell(value):
+    """Text of a CSV cell which spreadsheets won't evaluate as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def join_parts(*parts):
+    return ", ".join(str(part) for part in parts if part not in (None, ""))
+
+
+def flatten_skills(value):
+    """Python (4 yoe, last used 2024); Django (2 yoe)"""
+    flattened = []
+    for skill in entries(value):
+        details = join_parts(
+            f"{skill['total_yoe']} yoe" if skill.get("total_yoe") is not None else None,
+            f"last used {skill['last_used']}" if skill.get("last_used") else None,
+        )
+        name = skill.get("skill_name")
+        flattened.append(f"{name} ({details})" if details else str(name))
+    return "; ".join(flattened)
+
+
+def flatten_education(value):
+    """B.Tech, IIT Delhi (2016 - 2020); ..."""
+    return "; ".join(
+        f"{join_parts(entry.get('course'), entry.get('university'))} "
+        f"({entry.get('from_date')} - {entry.get('till_date')})"
+        for entry in entries(value)
+    )
+
+
+def flatten_work_experience(value):
+    """Security Engineer at Acme (2020 - 2023); ..."""
+    return "; ".join(
+        f"{entry.get('designation')} at {entry.get('company_name')} "
+        f"({entry.get('from_date')} - {entry.get('till_date')})"
+        for entry in entries(value)
+    )
+
+
+class ApplicantExport:
+    """Encodes the applications of a queryset row by row"""
+
+    def __init__(self, queryset, batch_size=1000):
+        self.queryset = queryset
+        self.batch_size = batch_size
+
+    def batches(self):
+        """Yield the rows of COLUMNS' paths a batch at a time, oldest first"""
+        rows = self.queryset.order_by("created_at", "id").values(
+            *(path for _, path in COLUMNS)
+        )
+        position = None
+        while True:
+            batch = rows
+            if position is not None:
+                created_at, pk = position
+                batch = batch.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                )
+            batch = list(batch[: self.batch_size])
+            if batch:
+                yield batch
+            if len(batch) < self.batch_size:
+                return
+            position = (batch[-1]["created_at"], batch[-1]["id"])
+
+    def rows(self):
+        """Yield every application as a dict of COLUMNS"""
+        for batch in self.batches():
+            for row in batch:
+                exported = {column: row[path] for column, path in COLUMNS}
+                if exported["resume"]:
+                    exported["resume"] = default_storage.url(exported["resume"])
+                yield exported
+
+    def ndjson(self):
+        """One JSON object per line, the profile sections stay structured"""
+        for row in self.rows():
+            for column in ("professional_skills", "education", "work_experience"):
+                row[column] = entries(row[column])
+            yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+    def csv(self):
+        """
+        A header line and a line per application, profile sections
+        flattened and applicant supplied text escaped, see `escape_cell`
+        """
+        buffer = LineBuffer()
+        writer = csv.writer(buffer)
+        yield writer.writerow([column for column, _ in COLUMNS])
+        for row in self.rows():
+            row["professional_skills"] = flatten_skills(row["professional_skills"])
+            row["education"] = flatten_education(row["education"])
+            row["work_experience"] = flatten_work_experience(row["work_experience"])
+            yield writer.writerow([escape_cell(row[column]) for column, _ in COLUMNS])
+
+
+class LineBuffer:
+    """File-like object handing back what csv.writer writes instead of keeping it"""
+
+    def write(self, value):
+        return value
@@ -0,0 +1,142 @@
+"""
+Fit scores of applicants against the job they applied to.
+
+A score combines the cosine similarity of the profile's skills and past
+designations with the job's `skills_required` and `job_role` terms, and
+how much of the job's required experience the profile covers. All the
+unscored applicants of a job are scored together: their profiles become
+the rows of a HashedFeatureMatrix and the job is compared with every row
+in one vectorized pass. An application is scored when it is created and
+rescored by the signal handlers when the job's terms or the profile
+change, the score_applicants command scores any left without a score.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from apps.applicants.models import Applicants
+from apps.applicants.utils import entries
+from apps.jobs.models import Job
+from apps.jobs.search import HashedFeatureMatrix, job_recommender, tokenize
+from apps.jobs.search.recommend import skill_weight
+
+# job fields a fit score is computed from, changing one rescores the job
+JOB_FIT_FIELDS = ("skills_required", "job_role", "experience")
+
+
+def parse_year(value):
+    try:
+        return int(str(value)[:4])
+    except (TypeError, ValueError):
+        return None
+
+
+def experience_years(experience, work_experience, current_year=None):
+    """
+    Years of experience of a profile: the larger of the stated
+    `experience`, which defaults to "0" when never filled in, and the years
+    spanned by its work experience entries
+    """
+    try:
+        stated = max(float(experience), 0)
+    except (TypeError, ValueError):
+        stated = 0
+
+    current_year = current_year or date.today().year
+    years = 0
+    for entry in entries(work_experience):
+        start = parse_year(entry.get("from_date"))
+        end = parse_year(entry.get("till_date")) or current_year
+        if start is not None and end >= start:
+            years += end - start
+    return max(stated, years)
+
+
+class ApplicantFitScorer:
+    """Scores the applications of a job and stores them as `fit_score`"""
+
+    SKILLS_SHARE = 0.75
+    EXPERIENCE_SHARE = 0.25
+    DESIGNATION_WEIGHT = 1
+
+    def profile_terms(self, skills, work_experience):
+        terms = {}
+        for skill in entries(skills):
+            weight = skill_weight(skill.get("total_yoe"), skill.get("last_used"))
+            for token in tokenize(skill.get("skill_name")):
+                terms[token] = max(terms.get(token, 0), weight)
+        for entry in entries(work_experience):
+            for token in tokenize(entry.get("designation")):
+                terms[token] = max(terms.get(token, 0), self.DESIGNATION_WEIGHT)
+        return terms
+
+    def scores(self, job, profiles):
+        """
+        Fit scores in [0, 1] of `profiles`, a list of (professional_skills,
+        experience, work_experience), for the job
+        """
+        matrix = HashedFeatureMatrix(capacity=max(len(profiles), 1))
+        years = np.zeros(len(profiles), dtype=np.float32)
+        for position, (skills, experience, work_experience) in enumerate(profiles):
+            matrix.add(position, self.profile_terms(skills, work_experience))
+            years[position] = experience_years(experience, work_experience)
+
+        skill_fit = np.zeros(len(profiles), dtype=np.float32)
+        similarities = matrix.similarities(job_recommender.job_terms(job))
+        for position, row in matrix.rows.items():
+            skill_fit[position] = similarities[row]
+
+        if job.experience > 0:
+            experience_fit = np.minimum(years / job.experience, 1)
+        else:
+            experience_fit = np.ones(len(profiles), dtype=np.float32)
+
+        fit = self.SKILLS_SHARE * skill_fit + self.EXPERIENCE_SHARE * experience_fit
+        return np.round(fit, 4).tolist()
+
+    def score(self, applications, batch_size=1000):
+        """
+        Score the applications of the queryset which have no fit score, a
+        job at a time, returns how many were scored
+        """
+        job_columns = [f"job__{field_name}" for field_name in JOB_FIT_FIELDS]
+        rows = (
+            applications.filter(fit_score__isnull=True)
+            .order_by("job_id")
+            .values_list(
+                "id",
+                "job_id",
+                *job_columns,
+                "user__professional_skills",
+                "user__experience",
+                "user__work_experience",
+            )
+        )
+
+        scored, job_rows = [], []
+        for row in rows.iterator(chunk_size=batch_size):
+            if job_rows and job_rows[0][1] != row[1]:
+                scored.extend(self.score_rows(job_rows))
+                job_rows = []
+            job_rows.append(row)
+        if job_rows:
+            scored.extend(self.score_rows(job_rows))
+
+        Applicants.objects.bulk_update(scored, ["fit_score"], batch_size=batch_size)
+        return len(scored)
+
+    def score_rows(self, rows):
+        """Scored Applicants of `score`'s rows of a single job"""
+        job = Job(
+            job_id=rows[0][1],
+            **dict(zip(JOB_FIT_FIELDS, rows[0][2 : 2 + len(JOB_FIT_FIELDS)])),
+        )
+        profiles = [row[2 + len(JOB_FIT_FIELDS) :] for row in rows]
+        return [
+            Applicants(id=row[0], fit_score=score)
+            for row, score in zip(rows, self.scores(job, profiles))
+        ]
+
+
+fit_scorer = ApplicantFitScorer()
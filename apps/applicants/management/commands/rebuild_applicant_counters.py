@@ -0,0 +1,98 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from apps.applicants.models import Applicants, JobStatusCount
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Job.total_applicants and the per status JobStatusCount rows "
+        "from tbl_applicants, fixing any drift. Use --check to only report it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare the counters against tbl_applicants, exit 1 on drift",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of jobs aggregated per query",
+        )
+
+    def handle(self, *args, **options):
+        check_only = options["check"]
+        batch_size = options["batch_size"]
+
+        drifted = 0
+        job_ids = Job.objects.order_by("job_id").values_list("job_id", flat=True)
+        batch = []
+        for job_id in job_ids.iterator(chunk_size=batch_size):
+            batch.append(job_id)
+            if len(batch) == batch_size:
+                drifted += self.process_batch(batch, check_only)
+                batch = []
+        if batch:
+            drifted += self.process_batch(batch, check_only)
+
+        if check_only and drifted:
+            raise CommandError(f"{drifted} job(s) have drifted applicant counters")
+
+        action = "found" if check_only else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{action} {drifted} drifted job(s)"))
+
+    def process_batch(self, job_ids, check_only):
+        live = defaultdict(dict)
+        rows = (
+            Applicants.objects.filter(job_id__in=job_ids)
+            .values("job_id", "status")
+            .annotate(count=Count("id"))
+        )
+        for row in rows:
+            live[row["job_id"]][row["status"]] = row["count"]
+
+        stored = defaultdict(dict)
+        for row in JobStatusCount.objects.filter(job_id__in=job_ids).values(
+            "job_id", "status", "count"
+        ):
+            if row["count"]:
+                stored[row["job_id"]][row["status"]] = row["count"]
+
+        totals = dict(
+            Job.objects.filter(job_id__in=job_ids).values_list(
+                "job_id", "total_applicants"
+            )
+        )
+
+        drifted = [
+            job_id
+            for job_id in job_ids
+            if live[job_id] != stored[job_id]
+            or totals.get(job_id) != sum(live[job_id].values())
+        ]
+        for job_id in drifted:
+            self.stdout.write(
+                f"job {job_id}: stored total={totals.get(job_id)} {stored[job_id]}, "
+                f"live total={sum(live[job_id].values())} {live[job_id]}"
+            )
+
+        if drifted and not check_only:
+            with transaction.atomic():
+                for job_id in drifted:
+                    Job.objects.filter(job_id=job_id).update(
+                        total_applicants=sum(live[job_id].values())
+                    )
+                    JobStatusCount.objects.filter(job_id=job_id).delete()
+                    JobStatusCount.objects.bulk_create(
+                        JobStatusCount(job_id=job_id, status=status, count=count)
+                        for status, count in live[job_id].items()
+                    )
+
+        return len(drifted)
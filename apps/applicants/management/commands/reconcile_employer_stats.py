@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.applicants.models import EmployerStats
+from apps.applicants.utils import live_employer_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the EmployerStats rollup against a live aggregate of tbl_job and "
+        "tbl_applicants and fix any drift. Use --check to only report it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare the rollup against the live aggregate, exit 1 on drift",
+        )
+
+    def handle(self, *args, **options):
+        live = live_employer_stats()
+        stored = {
+            row.pop("employer_id"): row
+            for row in EmployerStats.objects.values(
+                "employer_id", *EmployerStats.COUNTS
+            )
+        }
+
+        empty = dict.fromkeys(EmployerStats.COUNTS, 0)
+        drifted = [
+            employer_id
+            for employer_id in set(live) | set(stored)
+            if live.get(employer_id, empty) != stored.get(employer_id, empty)
+        ]
+        for employer_id in drifted:
+            self.stdout.write(
+                f"employer {employer_id}: stored {stored.get(employer_id, empty)}, "
+                f"live {live.get(employer_id, empty)}"
+            )
+
+        if options["check"]:
+            if drifted:
+                raise CommandError(f"{len(drifted)} employer(s) have drifted stats")
+            self.stdout.write(self.style.SUCCESS("employer stats are in sync"))
+            return
+
+        with transaction.atomic():
+            for employer_id in drifted:
+                EmployerStats.objects.update_or_create(
+                    employer_id=employer_id, defaults=live.get(employer_id, empty)
+                )
+        self.stdout.write(
+            self.style.SUCCESS(f"fixed {len(drifted)} drifted employer(s)")
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.applicants.fit import fit_scorer
+from apps.applicants.models import Applicants
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute the fit score of every application which has none, e.g. ones "
+        "created before fit scores existed or whose rescoring was interrupted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of applications read and updated per query",
+        )
+
+    def handle(self, *args, **options):
+        scored = fit_scorer.score(
+            Applicants.objects.all(), batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"scored {scored} application(s)"))
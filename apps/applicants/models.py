@@ -1,7 +1,9 @@
 import uuid
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
+from apps.accounts.models import User
 from apps.applicants import constants
 from apps.jobs.models import Job
 from apps.userprofile.models import UserProfile
@@ -16,6 +18,9 @@ class Applicants(models.Model):
 
     class Meta:
         db_table = "tbl_applicants"
+        # a job seeker applies to a job once, and an Idempotency-Key names
+        # one application of theirs, ApplyToJob relies on both
+        unique_together = [["job", "user"], ["user", "idempotency_key"]]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
@@ -24,6 +29,16 @@ class Applicants(models.Model):
     status = models.CharField(
         max_length=30, choices=constants.STATUS_CHOICES, default="applied"
     )
+    # how well the profile fits the job, computed by ApplicantFitScorer and
+    # cleared whenever the job's requirements or the profile change
+    fit_score = models.FloatField(null=True, default=None, editable=False)
+    # Idempotency-Key header of the request which created the application
+    idempotency_key = models.CharField(
+        max_length=constants.IDEMPOTENCY_KEY_MAX_LENGTH,
+        null=True,
+        default=None,
+        editable=False,
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -32,3 +47,55 @@ class Applicants(models.Model):
     # all the application on that particular case will be gone
     is_deleted = models.BooleanField(default=False, null=True, editable=False)
     is_active = models.BooleanField(default=True, null=True)
+
+
+class JobStatusCount(models.Model):
+    """Denormalized number of applications of a job in a given status.
+    Rows are maintained by ApplicantCounters alongside Job.total_applicants
+    so listing jobs never has to aggregate tbl_applicants.
+    """
+
+    class Meta:
+        db_table = "tbl_job_status_count"
+        unique_together = [["job", "status"]]
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="status_counts")
+    status = models.CharField(max_length=30, choices=constants.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+
+class EmployerStats(models.Model):
+    """Denormalized application stats of an employer, served by CompanyStats.
+    Maintained by ApplicantCounters in the same transactions as the writes
+    to tbl_applicants, reconcile_employer_stats checks them against the
+    live aggregate. job_count is the number of jobs with any application.
+    """
+
+    class Meta:
+        db_table = "tbl_employer_stats"
+
+    employer = models.OneToOneField(
+        User, primary_key=True, on_delete=models.CASCADE, related_name="employer_stats"
+    )
+    job_count = models.PositiveIntegerField(default=0)
+    applications_count = models.PositiveIntegerField(default=0)
+    reviewed_count = models.PositiveIntegerField(default=0)
+    shortlisted_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    COUNTS = ("job_count", "applications_count", "reviewed_count", "shortlisted_count")
+
+
+class ArchivedApplicant(models.Model):
+    """Application of an archived job, moved here by the archive_jobs command"""
+
+    class Meta:
+        db_table = "tbl_archived_applicants"
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    job_id = models.UUIDField(db_index=True)
+    user_id = models.UUIDField(db_index=True)
+    status = models.CharField(max_length=30, choices=constants.STATUS_CHOICES)
+    # every column of the tbl_applicants row
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True)
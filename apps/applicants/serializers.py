@@ -2,8 +2,10 @@ from rest_framework import serializers
 
 from apps.applicants import constants
 from apps.applicants.models import Applicants
+from apps.jobs.models import Job
 from apps.jobs.serializers import JobSerializer
 from apps.userprofile.serializers import UserProfileResponseSerializer
+from apps.utils.fieldsets import SparseFieldsetMixin
 
 
 class ApplicantJobSerializer(serializers.Serializer):
@@ -22,10 +24,11 @@ class ApplicantModelSerializer(serializers.Serializer):
     is_deleted = serializers.BooleanField()
     is_active = serializers.BooleanField()
     status = serializers.CharField()
+    fit_score = serializers.FloatField(allow_null=True)
 
 
 class ApplyToJobSerializer(serializers.Serializer):
-    job_id = serializers.CharField(required=True)
+    job_id = serializers.UUIDField(required=True)
 
 
 class UpdateApplicationStatusSerializer(serializers.Serializer):
@@ -33,7 +36,50 @@ class UpdateApplicationStatusSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=constants.STATUS_CHOICES, required=True)
 
 
-class AppliedJobSerializer(serializers.ModelSerializer):
+class ApplicationFilterSerializer(serializers.Serializer):
+    """Selects applications like the filters of AllApplicantsOfCompany"""
+
+    status = serializers.ListField(
+        child=serializers.ChoiceField(choices=constants.STATUS_CHOICES),
+        required=False,
+        allow_empty=False,
+    )
+    job_id = serializers.UUIDField(required=False)
+    slug = serializers.SlugField(required=False)
+
+    def validate(self, attrs):
+        # an empty filter would select every application of the employer
+        if not attrs:
+            raise serializers.ValidationError(
+                "Provide at least one of status, job_id or slug."
+            )
+        return attrs
+
+
+class BulkUpdateApplicationStatusSerializer(serializers.Serializer):
+    """Either a list of application ids or a filter, and the status to set"""
+
+    application_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+        max_length=constants.BULK_STATUS_MAX_ITEMS,
+    )
+    filter = ApplicationFilterSerializer(required=False)
+    status = serializers.ChoiceField(choices=constants.STATUS_CHOICES, required=True)
+
+    def validate(self, attrs):
+        if ("application_ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError(
+                "Provide either application_ids or filter."
+            )
+        return attrs
+
+
+class AppliedJobSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Application of a job seeker along with the job, `?fields=` and `?omit=`
+    address the job's fields as `job.<name>`"""
+
     job = JobSerializer(read_only=True)
 
     class Meta:
@@ -49,6 +95,47 @@ class AppliedJobSerializer(serializers.ModelSerializer):
         ]
 
 
+class JobCardCompanySerializer(serializers.Serializer):
+    company_id = serializers.UUIDField()
+    name = serializers.CharField()
+    picture = serializers.FileField()
+
+
+class JobCardSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """The few job fields an application history shows, the description
+    is fetched with `?job_id=` when the application is opened"""
+
+    company = JobCardCompanySerializer(read_only=True)
+
+    class Meta:
+        model = Job
+        fields = [
+            "job_id",
+            "slug",
+            "job_role",
+            "location",
+            "job_type",
+            "is_active",
+            "is_deleted",
+            "company",
+        ]
+
+
+class AppliedJobCardSerializer(AppliedJobSerializer):
+    """Application in the list of a job seeker's applications"""
+
+    job = JobCardSerializer(read_only=True)
+
+    # columns read for every listed application
+    LOADED_FIELDS = [
+        *AppliedJobSerializer.Meta.fields,
+        *(f"job__{field}" for field in JobCardSerializer.Meta.fields),
+        "job__company__company_id",
+        "job__company__name",
+        "job__company__picture",
+    ]
+
+
 class ApplicationStatsResponseSerializer(serializers.Serializer):
     applied_jobs = serializers.IntegerField()
     recruiter_actions = serializers.IntegerField()
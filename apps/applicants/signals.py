@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.applicants.fit import JOB_FIT_FIELDS, fit_scorer
+from apps.applicants.models import Applicants
+from apps.applicants.utils import ApplicantCounters
+from apps.jobs.models import Job
+from apps.jobs.signals import jobs_saved
+from apps.userprofile.models import UserProfile
+
+
+@receiver(post_delete, sender=Applicants)
+def application_deleted(sender, instance, origin=None, **kwargs):
+    """Applications are only removed by cascades from profiles or jobs,
+    keep the job counters right when the job itself survives"""
+    if isinstance(origin, Job) or getattr(origin, "model", None) is Job:
+        return
+    ApplicantCounters.application_deleted(instance.job_id, instance.status)
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created=False, **kwargs):
+    if not created:
+        jobs_bulk_saved(sender, [instance])
+
+
+@receiver(jobs_saved, sender=Job)
+def jobs_bulk_saved(sender, jobs, **kwargs):
+    """Rescore the applications of the jobs whose requirements changed"""
+    changed = []
+    for job in jobs:
+        previous, current = job.previous_values(), job.current_values()
+        if previous and any(
+            field in current and previous.get(field) != current[field]
+            for field in JOB_FIT_FIELDS
+        ):
+            changed.append(job.job_id)
+    if changed:
+        applications = Applicants.objects.filter(job_id__in=changed)
+        rescore(applications)
+
+
+@receiver(post_save, sender=UserProfile)
+def profile_saved(sender, instance, created=False, **kwargs):
+    if not created:
+        rescore(Applicants.objects.filter(user=instance))
+
+
+def rescore(applications):
+    """Clear the fit scores now and compute them again once committed"""
+    applications.filter(fit_score__isnull=False).update(fit_score=None)
+    transaction.on_commit(lambda: fit_scorer.score(applications))
@@ -1,3 +1,659 @@
+import csv
+import json
+import uuid
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
 from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.applicants import constants
+from apps.applicants.export import ApplicantExport
+from apps.applicants.fit import experience_years, fit_scorer
+from apps.applicants.models import Applicants, EmployerStats, JobStatusCount
+from apps.jobs.models import Company, Job
+from apps.userprofile.models import UserProfile
+
+
+def create_user(email, user_type):
+    user = User.objects.create_user(
+        email=email, name="Testing User", user_type=user_type
+    )
+    user.is_profile_completed = True
+    user.save()
+    return user
+
+
+class ApplicationFixturesMixin:
+    """Employer with one job and a job seeker with a profile"""
+
+    def setUp(self):
+        self.employer = create_user("employer@testing.com", "Employer")
+        self.company = Company.objects.create(
+            creator=self.employer,
+            name="Testing name",
+            location="Testing Location",
+            about="Testing about",
+            founded_year=2011,
+        )
+        self.job = Job.objects.create(
+            company=self.company,
+            employer=self.employer,
+            job_role="Security Engineer",
+            location="Remote",
+            job_type="full time",
+            vacancy_position=1,
+            industry="Security",
+        )
+
+        self.seeker = create_user("seeker@testing.com", "Job Seeker")
+        self.profile = UserProfile.objects.create(user=self.seeker)
+
+        self.employer_client = APIClient()
+        self.employer_client.force_authenticate(self.employer)
+        self.seeker_client = APIClient()
+        self.seeker_client.force_authenticate(self.seeker)
+
+    def status_counts(self):
+        return dict(
+            JobStatusCount.objects.filter(job=self.job, count__gt=0).values_list(
+                "status", "count"
+            )
+        )
+
+
+class ApplicantCountersTestCase(ApplicationFixturesMixin, TestCase):
+    def test_apply_and_status_update_maintain_counters(self):
+        response = self.seeker_client.post(
+            "/apply/job", {"job_id": str(self.job.job_id)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.total_applicants, 1)
+        self.assertEqual(self.status_counts(), {"applied": 1})
+
+        response = self.employer_client.post(
+            "/application/updatestatus",
+            {
+                "application_id": str(response.data["application_id"]),
+                "status": "shortlisted",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.status_counts(), {"shortlisted": 1})
+
+    def test_stale_job_save_keeps_counters(self):
+        stale_job = Job.objects.get(job_id=self.job.job_id)
+        Applicants.objects.create(job=self.job, user=self.profile)
+        Job.objects.filter(job_id=self.job.job_id).update(total_applicants=1)
+
+        stale_job.job_role = "Senior Security Engineer"
+        stale_job.save()
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.total_applicants, 1)
+
+    def test_rebuild_command_fixes_drift(self):
+        Applicants.objects.create(job=self.job, user=self.profile, status="on-hold")
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_applicant_counters", "--check", stdout=StringIO())
+
+        call_command("rebuild_applicant_counters", stdout=StringIO())
+        call_command("rebuild_applicant_counters", "--check", stdout=StringIO())
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.total_applicants, 1)
+        self.assertEqual(self.status_counts(), {"on-hold": 1})
+
+
+class ApplyToJobTestCase(ApplicationFixturesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def apply(self, job_id, **headers):
+        return self.seeker_client.post(
+            "/apply/job", {"job_id": str(job_id)}, format="json", headers=headers
+        )
+
+    def test_second_application_is_rejected(self):
+        self.assertEqual(
+            self.apply(self.job.job_id).status_code, status.HTTP_201_CREATED
+        )
+
+        response = self.apply(self.job.job_id)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Applicants.objects.filter(job=self.job).count(), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.total_applicants, 1)
+        self.assertEqual(self.status_counts(), {"applied": 1})
+
+    def test_unknown_job(self):
+        response = self.apply(uuid.uuid4())
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Applicants.objects.exists())
+
+        response = self.apply("not-a-uuid")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_idempotency_key_replays_the_response(self):
+        first = self.apply(self.job.job_id, **{"Idempotency-Key": "apply-1"})
+        retry = self.apply(self.job.job_id, **{"Idempotency-Key": "apply-1"})
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(Applicants.objects.filter(job=self.job).count(), 1)
+
+        other_job = Job.objects.create(
+            company=self.company,
+            employer=self.employer,
+            job_role="Other",
+            location="Remote",
+            job_type="full time",
+            vacancy_position=1,
+            industry="IT",
+        )
+        response = self.apply(other_job.job_id, **{"Idempotency-Key": "apply-1"})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_other_key_for_the_same_job_is_rejected(self):
+        self.apply(self.job.job_id)
+        response = self.apply(self.job.job_id, **{"Idempotency-Key": "apply-1"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.apply(self.job.job_id, **{"Idempotency-Key": "apply-2"})
+        response = self.apply(self.job.job_id, **{"Idempotency-Key": "apply-3"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.total_applicants, 1)
+
+
+class AppliedJobsFieldsetsTestCase(ApplicationFixturesMixin, TestCase):
+    def test_nested_job_fields(self):
+        Applicants.objects.create(job=self.job, user=self.profile)
+
+        response = self.seeker_client.get("/applied_jobs/?fields=status,job.job_role")
+        self.assertEqual(
+            response.data["results"],
+            [{"status": "applied", "job": {"job_role": "Security Engineer"}}],
+        )
+
+    def test_list_is_paginated_with_job_cards(self):
+        for number in range(3):
+            job = Job.objects.create(
+                company=self.company,
+                employer=self.employer,
+                job_role=f"Role {number}",
+                location="Remote",
+                job_type="full time",
+                vacancy_position=1,
+                industry="IT",
+            )
+            Applicants.objects.create(job=job, user=self.profile)
+
+        with self.assertNumQueries(2):
+            response = self.seeker_client.get("/applied_jobs/?limit=2")
+
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 2)
+        card = response.data["results"][0]["job"]
+        self.assertEqual(card["job_role"], "Role 2")
+        self.assertEqual(card["company"]["name"], "Testing name")
+        self.assertNotIn("description", card)
+
+        response = self.seeker_client.get(f"/applied_jobs/?job_id={job.job_id}")
+        self.assertEqual(response.data["job"]["job_role"], "Role 2")
+        self.assertIn("description", response.data["job"])
+
+
+class EmployerStatsTestCase(ApplicationFixturesMixin, TestCase):
+    def apply(self, client, job):
+        response = client.post("/apply/job", {"job_id": str(job.job_id)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["application_id"]
+
+    def test_stats_follow_applications(self):
+        other_seeker = create_user("other@testing.com", "Job Seeker")
+        UserProfile.objects.create(user=other_seeker)
+        other_client = APIClient()
+        other_client.force_authenticate(other_seeker)
+
+        application_id = self.apply(self.seeker_client, self.job)
+        self.apply(other_client, self.job)
+        self.employer_client.post(
+            "/application/updatestatus",
+            {"application_id": str(application_id), "status": "shortlisted"},
+            format="json",
+        )
+
+        with self.assertNumQueries(1):
+            response = self.employer_client.get("/company/stats")
+        self.assertEqual(
+            response.data,
+            {
+                "job_count": 1,
+                "applications_count": 2,
+                "reviewed_count": 1,
+                "shortlisted_count": 1,
+            },
+        )
+
+        Applicants.objects.get(id=application_id).delete()
+        stats = EmployerStats.objects.get(employer=self.employer)
+        self.assertEqual((stats.applications_count, stats.shortlisted_count), (1, 0))
+        call_command("reconcile_employer_stats", "--check", stdout=StringIO())
+
+    def test_reconcile_fixes_drift(self):
+        Applicants.objects.create(job=self.job, user=self.profile, status="rejected")
+        with self.assertRaises(CommandError):
+            call_command("reconcile_employer_stats", "--check", stdout=StringIO())
+
+        call_command("reconcile_employer_stats", stdout=StringIO())
+        stats = EmployerStats.objects.get(employer=self.employer)
+        self.assertEqual(
+            [getattr(stats, name) for name in EmployerStats.COUNTS], [1, 1, 1, 0]
+        )
+
+
+class AllApplicantsOfCompanyTestCase(ApplicationFixturesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_job = Job.objects.create(
+            company=self.company,
+            employer=self.employer,
+            job_role="Security Analyst",
+            location="Remote",
+            job_type="full time",
+            vacancy_position=1,
+            industry="Security",
+        )
+        for number in range(6):
+            seeker = create_user(f"seeker{number}@testing.com", "Job Seeker")
+            profile = UserProfile.objects.create(user=seeker)
+            Applicants.objects.create(
+                job=self.job if number % 2 else self.other_job,
+                user=profile,
+                status="shortlisted" if number < 2 else "applied",
+            )
+
+    def test_page_is_read_within_query_budget(self):
+        # COUNT(*) and the page with its jobs, profiles and accounts joined
+        with self.assertNumQueries(2):
+            response = self.employer_client.get("/applicants/?limit=4")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 6)
+        first = response.data["results"][0]
+        self.assertEqual(first["user"]["user"]["email"], "seeker5@testing.com")
+        self.assertEqual(first["job"]["slug"], self.job.slug)
+
+        with self.assertNumQueries(1):
+            response = self.employer_client.get(
+                "/applicants/?pagination=cursor&limit=4"
+            )
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_status_and_job_filters(self):
+        response = self.employer_client.get(
+            f"/applicants/?status=shortlisted&slug={self.job.slug}"
+        )
+        self.assertEqual(response.data["count"], 1)
+
+        response = self.employer_client.get(
+            f"/applicants/?job_id={self.other_job.job_id}"
+        )
+        self.assertEqual(response.data["count"], 3)
+
+        response = self.employer_client.get("/applicants/?status=applied,shortlisted")
+        self.assertEqual(response.data["count"], 6)
+
+
+class ExportApplicantsTestCase(ApplicationFixturesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.profile.professional_skills = [
+            {"skill_name": "Python", "total_yoe": 4, "last_used": 2024},
+            {"skill_name": "Go", "total_yoe": 1, "last_used": 0},
+        ]
+        self.profile.work_experience = [
+            {
+                "designation": "Analyst",
+                "company_name": "Acme",
+                "from_date": "2020",
+                "till_date": "2023",
+            },
+        ]
+        self.profile.save()
+        Applicants.objects.create(job=self.job, user=self.profile, status="shortlisted")
+
+        other_employer = create_user("other@testing.com", "Employer")
+        other_job = Job.objects.create(
+            company=self.company,
+            employer=other_employer,
+            job_role="Other",
+            location="Remote",
+            job_type="full time",
+            vacancy_position=1,
+            industry="IT",
+        )
+        Applicants.objects.create(job=other_job, user=self.profile)
+
+    def download(self, url):
+        response = self.employer_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_reads_keyset_batches(self):
+        for number in range(4):
+            seeker = create_user(f"seeker{number}@testing.com", "Job Seeker")
+            Applicants.objects.create(
+                job=self.job, user=UserProfile.objects.create(user=seeker)
+            )
+
+        export = ApplicantExport(Applicants.objects.filter(job=self.job), batch_size=2)
+        self.assertEqual([len(batch) for batch in export.batches()], [2, 2, 1])
+        self.assertEqual(len({row["application_id"] for row in export.rows()}), 5)
+
+    def test_csv_export_flattens_the_profile(self):
+        rows = list(csv.DictReader(StringIO(self.download("/applicants/export"))))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["applicant_email"], "seeker@testing.com")
+        self.assertEqual(rows[0]["job_slug"], self.job.slug)
+        self.assertEqual(
+            rows[0]["professional_skills"], "Python (4 yoe, last used 2024); Go (1 yoe)"
+        )
+        self.assertEqual(rows[0]["work_experience"], "Analyst at Acme (2020 - 2023)")
+
+    def test_csv_export_escapes_formulas(self):
+        self.profile.profession = '=HYPERLINK("http://evil.test","open")'
+        self.profile.address = "@SUM(A1)"
+        self.profile.save()
+
+        row = next(csv.DictReader(StringIO(self.download("/applicants/export"))))
+        self.assertEqual(row["profession"], '\'=HYPERLINK("http://evil.test","open")')
+        self.assertEqual(row["address"], "'@SUM(A1)")
+        self.assertEqual(row["applicant_email"], "seeker@testing.com")
+
+    def test_ndjson_export_is_filterable(self):
+        lines = self.download(
+            "/applicants/export?output=ndjson&status=shortlisted"
+        ).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(
+            json.loads(lines[0])["professional_skills"][0]["skill_name"], "Python"
+        )
+
+        self.assertEqual(
+            self.download("/applicants/export?output=ndjson&status=rejected"), ""
+        )
+        response = self.employer_client.get("/applicants/export?output=xml")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BulkUpdateApplicationStatusTestCase(ApplicationFixturesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.application_ids = []
+        for number in range(4):
+            seeker = create_user(f"seeker{number}@testing.com", "Job Seeker")
+            client = APIClient()
+            client.force_authenticate(seeker)
+            UserProfile.objects.create(user=seeker)
+            response = client.post(
+                "/apply/job", {"job_id": str(self.job.job_id)}, format="json"
+            )
+            self.application_ids.append(str(response.data["application_id"]))
+
+        other_employer = create_user("other@testing.com", "Employer")
+        other_job = Job.objects.create(
+            company=self.company,
+            employer=other_employer,
+            job_role="Other",
+            location="Remote",
+            job_type="full time",
+            vacancy_position=1,
+            industry="IT",
+        )
+        response = self.seeker_client.post(
+            "/apply/job", {"job_id": str(other_job.job_id)}, format="json"
+        )
+        self.foreign_application = Applicants.objects.get(
+            id=response.data["application_id"]
+        )
+
+    def update(self, payload):
+        return self.employer_client.post(
+            "/application/updatestatus/bulk", payload, format="json"
+        )
+
+    def test_listed_applications_are_updated_with_counters(self):
+        response = self.update(
+            {
+                "application_ids": self.application_ids[:3]
+                + [str(self.foreign_application.id)],
+                "status": "shortlisted",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 3)
+        self.assertEqual(response.data["not_found"], [str(self.foreign_application.id)])
+        self.assertEqual(self.status_counts(), {"applied": 1, "shortlisted": 3})
+        self.assertEqual(
+            Applicants.objects.get(id=self.foreign_application.id).status, "applied"
+        )
+
+        stats = EmployerStats.objects.get(employer=self.employer)
+        self.assertEqual((stats.reviewed_count, stats.shortlisted_count), (3, 3))
+        call_command("reconcile_employer_stats", "--check", stdout=StringIO())
+
+    def test_filtered_applications_are_updated(self):
+        response = self.update(
+            {
+                "filter": {"status": ["applied"], "slug": self.job.slug},
+                "status": "rejected",
+            }
+        )
+        self.assertEqual(response.data, {"updated": 4, "unchanged": 0})
+        self.assertEqual(self.status_counts(), {"rejected": 4})
+
+        response = self.update(
+            {"filter": {"job_id": str(self.job.job_id)}, "status": "rejected"}
+        )
+        self.assertEqual(response.data, {"updated": 0, "unchanged": 4})
+
+    def test_selection_is_required(self):
+        response = self.update({"status": "rejected"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.update({"filter": {}, "status": "rejected"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.status_counts(), {"applied": 4})
+
+    def test_filter_is_capped(self):
+        with patch.object(constants, "BULK_STATUS_MAX_ITEMS", 3):
+            response = self.update(
+                {"filter": {"job_id": str(self.job.job_id)}, "status": "rejected"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.status_counts(), {"applied": 4})
+
+
+class ApplicantPipelineTestCase(ApplicationFixturesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for number, application_status in enumerate(
+            ["applied", "applied", "applied", "shortlisted", "rejected"]
+        ):
+            seeker = create_user(f"seeker{number}@testing.com", "Job Seeker")
+            Applicants.objects.create(
+                job=self.job,
+                user=UserProfile.objects.create(user=seeker),
+                status=application_status,
+            )
+
+    def test_board(self):
+        with self.assertNumQueries(3):
+            response = self.employer_client.get(
+                f"/applicants/pipeline/{self.job.job_id}?limit=2"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total"], 5)
+        columns = {column["status"]: column for column in response.data["columns"]}
+        self.assertEqual(
+            [column["status"] for column in response.data["columns"]],
+            [
+                "applied",
+                "under-reviewed",
+                "shortlisted",
+                "on-hold",
+                "accepted",
+                "rejected",
+            ],
+        )
+        self.assertEqual(columns["applied"]["count"], 3)
+        self.assertEqual(len(columns["applied"]["results"]), 2)
+        self.assertIsNone(columns["shortlisted"]["next"])
+        self.assertEqual(
+            columns["accepted"],
+            {"status": "accepted", "count": 0, "next": None, "results": []},
+        )
+
+        # the rest of the column comes from its cursor
+        response = self.employer_client.get(columns["applied"]["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+        seen = {row["id"] for row in columns["applied"]["results"]}
+        self.assertNotIn(response.data["results"][0]["id"], seen)
+
+    def test_other_employers_job(self):
+        other_employer = create_user("other@testing.com", "Employer")
+        client = APIClient()
+        client.force_authenticate(other_employer)
+
+        response = client.get(f"/applicants/pipeline/{self.job.job_id}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ExperienceYearsTestCase(TestCase):
+    def test_default_experience_falls_back_to_work_experience(self):
+        work_experience = [{"from_date": "2015-06-01", "till_date": "2020-06-01"}]
+
+        self.assertEqual(experience_years("0", work_experience), 5)
+        self.assertEqual(experience_years(None, work_experience), 5)
+        self.assertEqual(experience_years("7", work_experience), 7)
+        self.assertEqual(experience_years("0", {}), 0)
+
+
+class ApplicantFitScoreTestCase(ApplicationFixturesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        Job.objects.filter(job_id=self.job.job_id).update(
+            skills_required="Python, Django, AWS", experience=4
+        )
+        self.job.refresh_from_db()
+
+        self.profile.professional_skills = [
+            {"skill_name": "Python", "total_yoe": 4, "last_used": 2024},
+            {"skill_name": "Django", "total_yoe": 3, "last_used": 2024},
+        ]
+        self.profile.experience = "4"
+        self.profile.save()
+        self.strong = Applicants.objects.create(job=self.job, user=self.profile)
+
+        seeker = create_user("weak@testing.com", "Job Seeker")
+        profile = UserProfile.objects.create(
+            user=seeker,
+            experience=None,
+            professional_skills=[
+                {"skill_name": "Excel", "total_yoe": 1, "last_used": 2023}
+            ],
+            work_experience=[
+                {
+                    "from_date": "2022-01-01",
+                    "till_date": "2023-01-01",
+                    "description": "Books",
+                    "designation": "Accountant",
+                    "company_name": "Acme",
+                    "found_through_null": False,
+                }
+            ],
+        )
+        self.weak = Applicants.objects.create(job=self.job, user=profile)
+
+    def ranked(self):
+        response = self.employer_client.get("/applicants/?ordering=-fit_score")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(row["id"], row["fit_score"]) for row in response.data["results"]]
+
+    def score(self, application):
+        return Applicants.objects.get(id=application.id).fit_score
+
+    def test_applicants_are_ranked_by_fit(self):
+        # the fixtures bypass ApplyToJob, as applications older than the scores
+        out = StringIO()
+        call_command("score_applicants", stdout=out)
+        self.assertIn("scored 2 application(s)", out.getvalue())
+
+        # reading the ranking scores nothing
+        with self.assertNumQueries(2):
+            ranked = self.ranked()
+        self.assertEqual(
+            [row[0] for row in ranked], [str(self.strong.id), str(self.weak.id)]
+        )
+        self.assertGreater(ranked[0][1], 0.5)
+        # one year of the four required and no matching skill
+        self.assertEqual(ranked[1][1], 0.0625)
+
+    def test_applications_are_scored_when_created(self):
+        job = Job.objects.create(
+            company=self.company,
+            employer=self.employer,
+            job_role="Backend Developer",
+            skills_required="Python",
+            location="Remote",
+            job_type="full time",
+            vacancy_position=1,
+            industry="IT",
+            experience=2,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.seeker_client.post(
+                "/apply/job", {"job_id": str(job.job_id)}, format="json"
+            )
+        application = Applicants.objects.get(id=response.data["application_id"])
+        self.assertGreater(application.fit_score, 0.5)
+
+    def test_scores_follow_changes(self):
+        fit_scorer.score(Applicants.objects.all())
+        strong, weak = self.score(self.strong), self.score(self.weak)
+
+        self.profile.professional_skills = []
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save()
+        self.assertLess(self.score(self.strong), strong)
+        self.assertEqual(self.score(self.weak), weak)
+
+        job = Job.objects.get(job_id=self.job.job_id)
+        job.location = "Pune"
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertEqual(self.score(self.weak), weak)
 
-# Create your tests here.
+        job.experience = 1
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertGreater(self.score(self.weak), weak)
@@ -2,13 +2,22 @@ from django.urls import path
 
 from apps.applicants.views import (
     AllApplicantsOfCompany,
+    ApplicantPipeline,
+    BulkUpdateApplicationStatus,
     ApplyToJob,
     UpdateApplicationStatus, GetAppliedJobs,
-    ApplicationStats
+    ApplicationStats,
+    ExportApplicants,
 )
 
 urlpatterns = [
     path("applicants/", AllApplicantsOfCompany.as_view(), name="applicants"),
+    path(
+        "applicants/pipeline/<uuid:job_id>",
+        ApplicantPipeline.as_view(),
+        name="applicantpipeline",
+    ),
+    path("applicants/export", ExportApplicants.as_view(), name="exportapplicants"),
     path("applied_jobs/",GetAppliedJobs.as_view(), name="applied_jobs"),
     path("apply/job", ApplyToJob.as_view(), name="applytojob"),
     path(
@@ -16,6 +25,11 @@ urlpatterns = [
         UpdateApplicationStatus.as_view(),
         name="updateapplicationstatus",
     ),
+    path(
+        "application/updatestatus/bulk",
+        BulkUpdateApplicationStatus.as_view(),
+        name="bulkupdateapplicationstatus",
+    ),
     path(
         "application/stats",
         ApplicationStats.as_view(),
@@ -0,0 +1,235 @@
+import uuid
+from collections import Counter
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Subquery
+from django.utils import timezone
+
+from apps.applicants.models import Applicants, EmployerStats, JobStatusCount
+from apps.jobs.models import Job
+from apps.userprofile.models import UserProfile
+
+
+def entries(value):
+    """The dicts of a profile JSON field, which defaults to {} when empty"""
+    if not isinstance(value, list):
+        return []
+    return [entry for entry in value if isinstance(entry, dict)]
+
+
+def status_stats(status):
+    """The EmployerStats counts an application in this status adds to"""
+    return {
+        "applications_count": 1,
+        "reviewed_count": int(status != "applied"),
+        "shortlisted_count": int(status == "shortlisted"),
+    }
+
+
+def insert_application(job_id, user_id, idempotency_key=None):
+    """
+    Apply the profile of user `user_id` to the job in one
+    `INSERT ... SELECT`, which only produces a row when both the job and the
+    profile exist. Returns the new application id, or None when nothing was
+    inserted; an application which already exists for the pair, or with the
+    same idempotency key of the user, raises IntegrityError from the unique
+    indexes.
+    """
+    quote = connection.ops.quote_name
+    now = timezone.now()
+    values = {
+        "id": uuid.uuid4(),
+        "status": "applied",
+        "created_at": now,
+        "updated_at": now,
+        "is_deleted": False,
+        "is_active": True,
+        "idempotency_key": idempotency_key,
+    }
+    fields = [Applicants._meta.get_field(name) for name in values]
+    columns = [field.column for field in fields] + [
+        Applicants._meta.get_field("job").column,
+        Applicants._meta.get_field("user").column,
+    ]
+    job_pk = Job._meta.pk.column
+    profile_pk = UserProfile._meta.pk.column
+    profile_user = UserProfile._meta.get_field("user").column
+
+    sql = (
+        f"INSERT INTO {quote(Applicants._meta.db_table)} "
+        f"({', '.join(quote(column) for column in columns)}) "
+        f"SELECT {', '.join(['%s'] * len(fields))}, "
+        f"j.{quote(job_pk)}, p.{quote(profile_pk)} "
+        f"FROM {quote(Job._meta.db_table)} j, {quote(UserProfile._meta.db_table)} p "
+        f"WHERE j.{quote(job_pk)} = %s AND p.{quote(profile_user)} = %s"
+    )
+    params = [
+        field.get_db_prep_save(values[field.name], connection) for field in fields
+    ] + [
+        Job._meta.pk.get_db_prep_value(job_id, connection),
+        UserProfile._meta.get_field("user").get_db_prep_value(user_id, connection),
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        inserted = cursor.rowcount
+    return values["id"] if inserted else None
+
+
+class ApplicantCounters:
+    """
+    Keeps Job.total_applicants, the JobStatusCount rows and EmployerStats
+    in step with tbl_applicants. Every method issues relative
+    `count = count + n` updates, so callers only need to run them in the
+    same transaction as the write to tbl_applicants for the counters to
+    stay exact.
+    """
+
+    @staticmethod
+    def application_created(job_id, status="applied"):
+        # the 0 -> 1 transition is its own UPDATE so that exactly one
+        # application counts the job into the employer's job_count
+        first = Job.objects.filter(job_id=job_id, total_applicants=0).update(
+            total_applicants=1
+        )
+        if not first:
+            Job.objects.filter(job_id=job_id).update(
+                total_applicants=F("total_applicants") + 1
+            )
+        ApplicantCounters.add_to_status(job_id, status, 1)
+        ApplicantCounters.add_to_employer(
+            job_id, job_count=first, **status_stats(status)
+        )
+
+    @staticmethod
+    def application_deleted(job_id, status):
+        last = Job.objects.filter(job_id=job_id, total_applicants=1).update(
+            total_applicants=0
+        )
+        if not last:
+            Job.objects.filter(job_id=job_id, total_applicants__gt=0).update(
+                total_applicants=F("total_applicants") - 1
+            )
+        ApplicantCounters.add_to_status(job_id, status, -1)
+        ApplicantCounters.add_to_employer(
+            job_id,
+            job_count=-last,
+            **{name: -delta for name, delta in status_stats(status).items()},
+        )
+
+    @staticmethod
+    def status_changed(job_id, old_status, new_status):
+        if old_status == new_status:
+            return
+        ApplicantCounters.add_to_status(job_id, old_status, -1)
+        ApplicantCounters.add_to_status(job_id, new_status, 1)
+
+        old, new = status_stats(old_status), status_stats(new_status)
+        ApplicantCounters.add_to_employer(
+            job_id, **{name: new[name] - old[name] for name in new}
+        )
+
+    @staticmethod
+    def statuses_changed(employer_id, changes, new_status):
+        """
+        Counter updates of a bulk status change, `changes` counts the moved
+        applications per (job_id, old_status) of the employer's jobs
+        """
+        per_job = Counter()
+        employer_deltas = Counter()
+        new = status_stats(new_status)
+        for (job_id, old_status), count in changes.items():
+            if old_status == new_status:
+                continue
+            ApplicantCounters.add_to_status(job_id, old_status, -count)
+            per_job[job_id] += count
+            old = status_stats(old_status)
+            for name in new:
+                employer_deltas[name] += (new[name] - old[name]) * count
+
+        for job_id, count in per_job.items():
+            ApplicantCounters.add_to_status(job_id, new_status, count)
+        ApplicantCounters.add_to_employer(
+            job_id=None, employer_id=employer_id, **employer_deltas
+        )
+
+    @staticmethod
+    def add_to_status(job_id, status, delta):
+        counts = JobStatusCount.objects.filter(job_id=job_id, status=status)
+        if delta < 0:
+            counts = counts.filter(count__gte=-delta)
+        if counts.update(count=F("count") + delta) or delta <= 0:
+            return
+
+        # first application of the job in this status, create the row and
+        # fall back to the update if a concurrent request created it first
+        try:
+            with transaction.atomic():
+                JobStatusCount.objects.create(job_id=job_id, status=status, count=delta)
+        except IntegrityError:
+            JobStatusCount.objects.filter(job_id=job_id, status=status).update(
+                count=F("count") + delta
+            )
+
+    @staticmethod
+    def add_to_employer(job_id, employer_id=None, **deltas):
+        """Add the deltas to the EmployerStats of the job's employer"""
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        if employer_id is None:
+            employer_id = Subquery(
+                Job.objects.filter(job_id=job_id).values("employer_id")[:1]
+            )
+        stats = EmployerStats.objects.filter(employer_id=employer_id)
+        # like add_to_status, drifted rows are left for the reconcile
+        # command instead of going negative
+        stats = stats.filter(
+            **{f"{name}__gte": -delta for name, delta in deltas.items() if delta < 0}
+        )
+        updated = stats.update(
+            **{name: F(name) + delta for name, delta in deltas.items()}
+        )
+        if updated or any(delta < 0 for delta in deltas.values()):
+            return
+
+        if isinstance(employer_id, Subquery):
+            employer_id = (
+                Job.objects.filter(job_id=job_id)
+                .values_list("employer_id", flat=True)
+                .first()
+            )
+            if employer_id is None:
+                return
+        try:
+            with transaction.atomic():
+                EmployerStats.objects.create(employer_id=employer_id, **deltas)
+        except IntegrityError:
+            EmployerStats.objects.filter(employer_id=employer_id).update(
+                **{name: F(name) + delta for name, delta in deltas.items()}
+            )
+
+
+def live_employer_stats(employer_ids=None):
+    """
+    Aggregate the EmployerStats counts straight from tbl_applicants, the
+    same figures the raw CompanyStats query used to compute, keyed by
+    employer id
+    """
+    applications = Applicants.objects.all()
+    if employer_ids is not None:
+        applications = applications.filter(job__employer_id__in=employer_ids)
+    rows = (
+        applications.order_by()
+        .values("job__employer_id")
+        .annotate(
+            job_count=Count("job_id", distinct=True),
+            applications_count=Count("id"),
+            reviewed_count=Count("id", filter=~Q(status="applied")),
+            shortlisted_count=Count("id", filter=Q(status="shortlisted")),
+        )
+    )
+    return {
+        row["job__employer_id"]: {name: row[name] for name in EmployerStats.COUNTS}
+        for row in rows
+    }
@@ -1,51 +1,215 @@
+from collections import Counter
+
 from drf_spectacular.utils import extend_schema
-from rest_framework import exceptions, permissions, status
+import django_filters.rest_framework as df_filters
+from rest_framework import exceptions, filters, generics, permissions, status
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
-from django.db.models import Count, Q
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
 
 from apps.accounts.permissions import IsEmployer, IsJobSeeker, IsProfileCompleted
+from apps.applicants.export import ApplicantExport
+from apps.applicants.fit import fit_scorer
 from apps.applicants.models import Applicants
+from apps.applicants import constants
+from apps.applicants.utils import ApplicantCounters, insert_application
 from apps.applicants.serializers import (
     ApplicantModelSerializer,
     ApplyToJobSerializer,
-    UpdateApplicationStatusSerializer, AppliedJobSerializer,
+    UpdateApplicationStatusSerializer, AppliedJobSerializer, AppliedJobCardSerializer,
+    BulkUpdateApplicationStatusSerializer,
     ApplicationStatsResponseSerializer
 )
 from apps.jobs.models import Job
+from apps.jobs.serializers import JOB_DESCRIPTION_FIELDS, JobSerializer
 from apps.userprofile.models import UserProfile
+from apps.utils.fieldsets import parse_fieldsets
+from apps.utils.pagination import DefaultPagination, KeysetOptInMixin, KeysetPagination
 from apps.utils.responses import InternalServerError
 
 
-class AllApplicantsOfCompany(APIView):
+def applicants_of_employer(employer):
+    # the job, profile and account of every applicant come with the page
+    # in one query, the job's large text fields aren't rendered
+    return (
+        Applicants.objects.filter(job__employer=employer)
+        .select_related("job", "user", "user__user")
+        .defer(*(f"job__{field}" for field in JOB_DESCRIPTION_FIELDS))
+    )
+
+
+class ApplicantsFilter(df_filters.FilterSet):
+    status = df_filters.BaseInFilter(field_name="status")
+    job_id = df_filters.UUIDFilter(field_name="job_id")
+    slug = df_filters.CharFilter(field_name="job__slug")
+
+    class Meta:
+        model = Applicants
+        fields = ["status", "job_id", "slug"]
+
+
+class AllApplicantsOfCompany(KeysetOptInMixin, generics.ListAPIView):
     """Fetch all applicant who have applied to this
     company ordered in the reverse time based order with their current state
+
+    Filter with `?status=applied,shortlisted`, `?job_id=` or `?slug=`, pages
+    use limit/offset or, with `?pagination=cursor`, keyset pagination.
+    `?ordering=-fit_score` ranks applicants by fit, see `apps.applicants.fit`
+    for when the scores are computed.
     """
 
     permission_classes = [permissions.IsAuthenticated, IsEmployer, IsProfileCompleted]
+    serializer_class = ApplicantModelSerializer
+    pagination_class = DefaultPagination
+    filter_backends = [df_filters.DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = ApplicantsFilter
+    ordering_fields = ["created_at", "updated_at", "status", "fit_score"]
+    ordering = ["-created_at", "id"]
+
+    def get_queryset(self):
+        return applicants_of_employer(self.request.user)
 
     @extend_schema(
         responses={200: ApplicantModelSerializer(many=True)}, tags=["applications"]
     )
-    def get(self, request):
+    def get(self, request, *args, **kwargs):
         """List all users that belong to company"""
-        filters = {
-            "job__employer": request.user
-        }
-        slug = request.query_params.get('slug', None)
-        if slug:
-            filters["slug"] = slug
-            
-        applicants = Applicants.objects.filter(**filters)
+        return super().get(request, *args, **kwargs)
+
+
+class ApplicantPipeline(APIView):
+    """The applicants of one job as a board with a column per status
+    API: /applicants/pipeline/<job_id>?limit=10
+
+    Every column holds its count and its first `limit` applicants, newest
+    first, with a `next` link to the rest of the column. The board is read
+    with three queries however many applicants the job has: the job, the
+    counts from one GROUP BY, and the first rows of every column from one
+    ROW_NUMBER() window. `?status=<status>` with or without a `cursor`
+    returns one page of that column alone.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsEmployer, IsProfileCompleted]
+
+    @extend_schema(tags=["applications"])
+    def get(self, request, job_id):
+        if not Job.objects.filter(
+            job_id=job_id, employer=request.user, is_deleted=False
+        ).exists():
+            raise exceptions.NotFound()
+
+        applications = applicants_of_employer(request.user).filter(job_id=job_id)
+        paginator = KeysetPagination()
+
+        column = request.query_params.get("status")
+        if column is not None:
+            if column not in constants.PIPELINE_STATUSES:
+                raise exceptions.ValidationError({"status": "Invalid status"})
+            page = paginator.paginate_queryset(
+                applications.filter(status=column), request, view=self
+            )
+            return paginator.get_paginated_response(
+                ApplicantModelSerializer(page, many=True).data
+            )
+
+        counts = dict(
+            applications.order_by()
+            .values("status")
+            .annotate(count=Count("id"))
+            .values_list("status", "count")
+        )
+
+        limit = paginator.get_page_size(request)
+        rows = (
+            applications.annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=[F("status")],
+                    order_by=[F("created_at").desc(), F("id").desc()],
+                )
+            )
+            .filter(position__lte=limit)
+            .order_by("status", "-created_at", "-id")
+        )
+        columns = {name: [] for name in constants.PIPELINE_STATUSES}
+        for application in rows:
+            columns[application.status].append(application)
+
+        # the `next` links are the cursors KeysetPagination hands out after
+        # the last row of a column page
+        paginator.pk_name = "id"
+        board_url = request.build_absolute_uri()
+        board = []
+        for name, page in columns.items():
+            next_link = None
+            if counts.get(name, 0) > len(page):
+                paginator.base_url = replace_query_param(board_url, "status", name)
+                next_link = paginator.encode_cursor(page[-1], reverse=False)
+            board.append(
+                {
+                    "status": name,
+                    "count": counts.get(name, 0),
+                    "next": next_link,
+                    "results": ApplicantModelSerializer(page, many=True).data,
+                }
+            )
 
         return Response(
-            ApplicantModelSerializer(applicants, many=True).data,
+            {"job_id": job_id, "total": sum(counts.values()), "columns": board},
             status=status.HTTP_200_OK,
         )
 
 
+class ExportApplicants(APIView):
+    """Download every applicant of the employer's jobs, `?output=csv` (the
+    default) or `?output=ndjson`, filtered like AllApplicantsOfCompany
+    API: /applicants/export?output=csv&status=shortlisted
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsEmployer, IsProfileCompleted]
+    outputs = {
+        "csv": ("text/csv", "csv"),
+        "ndjson": ("application/x-ndjson", "ndjson"),
+    }
+
+    @extend_schema(tags=["applications"])
+    def get(self, request):
+        output = request.query_params.get("output", "csv")
+        if output not in self.outputs:
+            raise exceptions.ValidationError(
+                {"output": f"Choose one of {', '.join(self.outputs)}."}
+            )
+
+        applicants = ApplicantsFilter(
+            request.query_params,
+            queryset=Applicants.objects.filter(job__employer=request.user),
+        )
+        if not applicants.is_valid():
+            raise exceptions.ValidationError(applicants.errors)
+
+        content_type, extension = self.outputs[output]
+        export = ApplicantExport(applicants.qs)
+        streaming_response = StreamingHttpResponse(
+            getattr(export, output)(), content_type=content_type
+        )
+        filename = f"applicants-{timezone.now():%Y%m%d}.{extension}"
+        streaming_response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return streaming_response
+
+
 class ApplyToJob(APIView):
-    """Apply to a job"""
+    """Apply to a job
+
+    Requests carrying an `Idempotency-Key` header are safe to retry: the key
+    is stored with the application, and a retry with it gets the 201 of the
+    application the first request created
+    """
 
     permission_classes = [permissions.IsAuthenticated, IsJobSeeker, IsProfileCompleted]
 
@@ -53,26 +217,52 @@ class ApplyToJob(APIView):
     def post(self, request):
         serializer = ApplyToJobSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        job_id = serializer.validated_data["job_id"]
 
-        # fetching job and user profile to create an application
-        user_profile = UserProfile.objects.get(user_id=request.user.id)
-        try:
-            job = Job.objects.get(job_id=serializer.data["job_id"])
-        except Job.DoesNotExist:
-            raise exceptions.NotFound()
-        
-        application = Applicants.objects.filter(job=job, user=user_profile)
-        if application.exists():
-            return Response(
-                {"msg": "Already Applied!"},
-                status=status.HTTP_403_FORBIDDEN
-            )
+        idempotency_key = request.headers.get("Idempotency-Key")
+        if idempotency_key is not None:
+            if not 0 < len(idempotency_key) <= constants.IDEMPOTENCY_KEY_MAX_LENGTH:
+                raise exceptions.ValidationError({"Idempotency-Key": "Invalid key"})
 
-        application = Applicants(job=job, user=user_profile)
-        application.save()
+        # a single INSERT ... SELECT both checks that the job and profile
+        # exist and creates the application, the unique (job, user) index
+        # rejects a second application to the same job
+        try:
+            with transaction.atomic():
+                application_id = insert_application(
+                    job_id, request.user.id, idempotency_key
+                )
+                if application_id is None:
+                    raise exceptions.NotFound()
+                ApplicantCounters.application_created(job_id)
+                application = Applicants.objects.filter(id=application_id)
+                transaction.on_commit(lambda: fit_scorer.score(application))
+        except IntegrityError:
+            # only a retry of the request which created the application,
+            # with its key, is answered as if it had created it
+            replay = None
+            if idempotency_key is not None:
+                replay = (
+                    Applicants.objects.filter(
+                        user__user_id=request.user.id, idempotency_key=idempotency_key
+                    )
+                    .values("id", "job_id")
+                    .first()
+                )
+            if replay is None:
+                return Response(
+                    {"msg": "Already Applied!"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            if replay["job_id"] != job_id:
+                return Response(
+                    {"msg": "Idempotency-Key was used for another job"},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            application_id = replay["id"]
 
         return Response(
-            {"msg": "Created", "application_id": application.id},
+            {"msg": "Created", "application_id": application_id},
             status=status.HTTP_201_CREATED,
         )
 
@@ -87,10 +277,22 @@ class UpdateApplicationStatus(APIView):
         serializer = UpdateApplicationStatusSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        if not Applicants.objects.filter(id=serializer.data["application_id"]).update(
+        with transaction.atomic():
+            application = (
+                Applicants.objects.select_for_update()
+                .filter(id=serializer.data["application_id"])
+                .values("job_id", "status")
+                .first()
+            )
+            if application is None:
+                raise exceptions.NotFound()
+
+            Applicants.objects.filter(id=serializer.data["application_id"]).update(
                 status=serializer.data["status"]
-        ):
-            raise exceptions.NotFound()
+            )
+            ApplicantCounters.status_changed(
+                application["job_id"], application["status"], serializer.data["status"]
+            )
 
         return Response(
             {"msg": "Success", "detail": "Status updated successfully."},
@@ -98,41 +300,116 @@ class UpdateApplicationStatus(APIView):
         )
 
 
-class GetAppliedJobs(APIView):
+class BulkUpdateApplicationStatus(APIView):
+    """Move many applications of the employer's jobs to one status, selected
+    by `application_ids` or by a `filter` of status, job_id and slug
+    API: /application/updatestatus/bulk
     """
-    get applied jobs will return all the applied jobs associated with that candidate
+
+    permission_classes = [permissions.IsAuthenticated, IsEmployer, IsProfileCompleted]
+
+    @extend_schema(request=BulkUpdateApplicationStatusSerializer, tags=["applications"])
+    def post(self, request):
+        serializer = BulkUpdateApplicationStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        new_status = serializer.validated_data["status"]
+
+        # ownership is part of the selection, applications of other
+        # employers' jobs are simply never matched
+        applications = Applicants.objects.filter(job__employer=request.user)
+        application_ids = serializer.validated_data.get("application_ids")
+        if application_ids is not None:
+            applications = applications.filter(id__in=application_ids)
+        else:
+            selection = serializer.validated_data["filter"]
+            if "status" in selection:
+                applications = applications.filter(status__in=selection["status"])
+            if "job_id" in selection:
+                applications = applications.filter(job_id=selection["job_id"])
+            if "slug" in selection:
+                applications = applications.filter(job__slug=selection["slug"])
+
+        with transaction.atomic():
+            # a filter is held to the same limit as a list of ids, one row
+            # more than the limit is read to tell whether it was exceeded
+            matched = list(
+                applications.select_for_update(of=("self",))
+                .order_by("created_at", "id")
+                .values_list("id", "job_id", "status")[: constants.BULK_STATUS_MAX_ITEMS + 1]
+            )
+            if len(matched) > constants.BULK_STATUS_MAX_ITEMS:
+                raise exceptions.ValidationError(
+                    {
+                        "filter": f"Matches more than {constants.BULK_STATUS_MAX_ITEMS} "
+                        f"applications, narrow it down."
+                    }
+                )
+            moved = [row for row in matched if row[2] != new_status]
+            updated = Applicants.objects.filter(id__in=[row[0] for row in moved]).update(
+                status=new_status, updated_at=timezone.now()
+            )
+            ApplicantCounters.statuses_changed(
+                request.user.id,
+                Counter((job_id, old_status) for _, job_id, old_status in moved),
+                new_status,
+            )
+
+        result = {"updated": updated, "unchanged": len(matched) - len(moved)}
+        if application_ids is not None:
+            found = {row[0] for row in matched}
+            result["not_found"] = [str(pk) for pk in application_ids if pk not in found]
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class GetAppliedJobs(KeysetOptInMixin, generics.ListAPIView):
+    """
+    get applied jobs will return all the applied jobs associated with that candidate,
+    newest first and paginated like AllApplicantsOfCompany, each with a compact
+    card of its job. `?job_id=` returns that one application with the full job.
     """
     permission_classes = [permissions.IsAuthenticated, IsProfileCompleted]
+    serializer_class = AppliedJobCardSerializer
+    pagination_class = DefaultPagination
+
+    def get_queryset(self):
+        # the job and its company come with every row of the page, and
+        # only the columns of the card are read
+        return (
+            Applicants.objects.filter(user__user_id=self.request.user.id)
+            .select_related("job", "job__company")
+            .only(*AppliedJobCardSerializer.LOADED_FIELDS)
+            .order_by("-created_at", "id")
+        )
+
+    def get_serializer_context(self):
+        # ?fields= / ?omit= decide which job columns are rendered
+        return {**super().get_serializer_context(), "fieldsets": parse_fieldsets(self.request)}
 
     @extend_schema(
-        responses={200: AppliedJobSerializer(many=True)},
+        responses={200: AppliedJobCardSerializer(many=True)},
         tags=["applied_jobs"]
     )
-    def get(self, request):
-        """List all users that belong to the company, or a specific applicant by ID"""
+    def get(self, request, *args, **kwargs):
         job_id = request.query_params.get('job_id')
+        if not job_id:
+            return super().get(request, *args, **kwargs)
 
-        # finding out the user_id associated with logged in user_id
-        user_id = UserProfile.objects.get(user_id=request.user.id)
-
-        if job_id:
-            try:
-                applicant = Applicants.objects.get(user_id=user_id, job_id=job_id)
-                return Response(
-                    AppliedJobSerializer(applicant).data,
-                    status=status.HTTP_200_OK
-                )
-            except Applicants.DoesNotExist:
-                return Response(
-                    {"detail": "Applicant not found."},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        else:
-            applicants = Applicants.objects.filter(user_id=user_id).order_by('-created_at')
+        fieldsets = parse_fieldsets(request)
+        applications = Applicants.objects.select_related("job").defer(
+            *JobSerializer.deferred_model_fields(fieldsets, prefix="job__")
+        )
+        try:
+            applicant = applications.get(user__user_id=request.user.id, job_id=job_id)
+        except (Applicants.DoesNotExist, DjangoValidationError):
             return Response(
-                AppliedJobSerializer(applicants, many=True).data,
-                status=status.HTTP_200_OK
+                {"detail": "Applicant not found."},
+                status=status.HTTP_404_NOT_FOUND
             )
+        context = {"request": request, "fieldsets": fieldsets}
+        return Response(
+            AppliedJobSerializer(applicant, context=context).data,
+            status=status.HTTP_200_OK
+        )
 
 
 class ApplicationStats(APIView):
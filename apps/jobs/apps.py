@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class JobsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.jobs"
+
+    def ready(self):
+        from apps.jobs import signals  # noqa: F401
@@ -0,0 +1,169 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.applicants.models import Applicants, ArchivedApplicant
+from apps.applicants.utils import ApplicantCounters, status_stats
+from apps.jobs.models import ArchiveCheckpoint, ArchivedJob, Job
+from apps.jobs.signals import jobs_saved
+
+
+class JobArchiver:
+    """
+    Expires and archives jobs in bounded batches.
+
+    Both steps walk their jobs in (created_at, job_id) order, `batch_size`
+    jobs per transaction, and save their position in ArchiveCheckpoint
+    within the same transaction. A step which is interrupted can therefore
+    be resumed with the cutoff it started with, a step which completes
+    removes its checkpoint. In dry-run mode nothing is written and the
+    batches are only counted.
+    """
+
+    EXPIRE = "expire"
+    ARCHIVE = "archive"
+
+    def __init__(self, batch_size=500, dry_run=False, max_batches=None, log=None):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.max_batches = max_batches
+        self.log = log or (lambda message: None)
+
+    def expire(self, days, resume=False):
+        """Deactivate active jobs created more than `days` days ago"""
+        return self.run(self.EXPIRE, days, resume)
+
+    def archive(self, days, resume=False):
+        """Move jobs soft deleted more than `days` days ago to the archive tables"""
+        return self.run(self.ARCHIVE, days, resume)
+
+    def candidates(self, step, cutoff):
+        if step == self.EXPIRE:
+            return Job.objects.filter(
+                is_active=True, is_deleted=False, created_at__lt=cutoff
+            )
+        # updated_at is last touched by the soft delete itself
+        return Job.objects.filter(is_deleted=True, updated_at__lt=cutoff)
+
+    def run(self, step, days, resume=False):
+        """Process the step's jobs, returns the number of jobs handled"""
+        checkpoint = ArchiveCheckpoint.objects.filter(name=step).first()
+        if checkpoint is not None and resume:
+            self.log(
+                f"{step}: resuming from {checkpoint.last_created_at} "
+                f"{checkpoint.last_job_id}, cutoff {checkpoint.cutoff}"
+            )
+        else:
+            # a fresh run starts over, reusing the row of an interrupted one
+            checkpoint = checkpoint or ArchiveCheckpoint(name=step)
+            checkpoint.cutoff = timezone.now() - timedelta(days=days)
+            checkpoint.last_created_at = None
+            checkpoint.last_job_id = None
+
+        position = (checkpoint.last_created_at, checkpoint.last_job_id)
+        handled = batches = 0
+        finished = False
+        while self.max_batches is None or batches < self.max_batches:
+            with transaction.atomic():
+                batch = self.next_batch(step, checkpoint.cutoff, position)
+                if not batch:
+                    finished = True
+                    break
+
+                if not self.dry_run:
+                    getattr(self, f"{step}_batch")(batch)
+                    checkpoint.last_created_at = batch[-1].created_at
+                    checkpoint.last_job_id = batch[-1].job_id
+                    checkpoint.save()
+
+            position = (batch[-1].created_at, batch[-1].job_id)
+            handled += len(batch)
+            batches += 1
+            self.log(f"{step}: batch {batches}, {len(batch)} job(s)")
+
+        # a step stopped by max_batches keeps its checkpoint for --resume
+        if finished and not self.dry_run and checkpoint.pk:
+            checkpoint.delete()
+        return handled
+
+    def next_batch(self, step, cutoff, position):
+        jobs = self.candidates(step, cutoff).order_by("created_at", "job_id")
+        last_created_at, last_job_id = position
+        if last_created_at is not None:
+            jobs = jobs.filter(
+                Q(created_at__gt=last_created_at)
+                | Q(created_at=last_created_at, job_id__gt=last_job_id)
+            )
+        if not self.dry_run:
+            jobs = jobs.select_for_update()
+        return list(jobs[: self.batch_size])
+
+    def expire_batch(self, jobs):
+        now = timezone.now()
+        for job in jobs:
+            job.is_active = False
+            job.updated_at = now
+        Job.objects.bulk_update(jobs, ["is_active", "updated_at"])
+        jobs_saved.send(sender=Job, jobs=jobs)
+
+    def archive_batch(self, jobs):
+        job_ids = [job.job_id for job in jobs]
+        ArchivedJob.objects.bulk_create(
+            [
+                ArchivedJob(
+                    job_id=job.job_id,
+                    employer_id=job.employer_id,
+                    company_id=job.company_id,
+                    created_at=job.created_at,
+                    deleted_at=job.updated_at,
+                    data=job.current_values(),
+                )
+                for job in jobs
+            ],
+            ignore_conflicts=True,
+        )
+
+        applications = list(Applicants.objects.filter(job_id__in=job_ids).values())
+        ArchivedApplicant.objects.bulk_create(
+            [
+                ArchivedApplicant(
+                    id=application["id"],
+                    job_id=application["job_id"],
+                    user_id=application["user_id"],
+                    status=application["status"],
+                    data=application,
+                )
+                for application in applications
+            ],
+            batch_size=2000,
+            ignore_conflicts=True,
+        )
+        self.remove_from_employer_stats(jobs, applications)
+
+        # cascades to the applications, status counts and signatures
+        Job.objects.filter(job_id__in=job_ids).delete()
+
+    @staticmethod
+    def remove_from_employer_stats(jobs, applications):
+        """
+        The cascade doesn't touch the counters of the jobs it deletes, take
+        the archived applications out of their employers' stats at once
+        """
+        employer_of = {job.job_id: job.employer_id for job in jobs}
+        deltas = defaultdict(Counter)
+        for application in applications:
+            deltas[employer_of[application["job_id"]]].update(
+                status_stats(application["status"])
+            )
+        for job_id in {application["job_id"] for application in applications}:
+            deltas[employer_of[job_id]]["job_count"] += 1
+
+        for employer_id, counts in deltas.items():
+            ApplicantCounters.add_to_employer(
+                job_id=None,
+                employer_id=employer_id,
+                **{name: -count for name, count in counts.items()},
+            )
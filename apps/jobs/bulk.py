@@ -0,0 +1,103 @@
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.jobs.models import Job, job_slugs
+from apps.jobs.signals import jobs_saved
+
+
+class JobBulkWriter:
+    """
+    Creates and updates the jobs of one employer in batches.
+
+    Items are validated data of JobBulkItemSerializer, an item carrying a
+    `job_id` updates that job and every other item creates a new one, as an
+    active job unless the item says otherwise. A job_id may appear only
+    once per request. All existing jobs are fetched with one query, new jobs are written with
+    bulk_create and existing ones with bulk_update, `batch_size` rows per
+    statement, inside a single transaction.
+    """
+
+    def __init__(self, employer, company, batch_size=500):
+        self.employer = employer
+        self.company = company
+        self.batch_size = batch_size
+
+    def write(self, items):
+        """
+        Returns one result dict per item, in order, with a `status` of
+        created, updated or error.
+        """
+        results = [None] * len(items)
+        occurrences = Counter(item["job_id"] for item in items if item.get("job_id"))
+        update_ids = {job_id for job_id, count in occurrences.items() if count == 1}
+        existing = {
+            job.job_id: job
+            for job in Job.objects.filter(
+                job_id__in=update_ids, employer=self.employer, is_deleted=False
+            )
+        }
+
+        now = timezone.now()
+        to_create, to_update, update_fields = [], [], {"updated_at"}
+        for position, item in enumerate(items):
+            item = dict(item)
+            job_id = item.pop("job_id", None)
+
+            if job_id is None:
+                item.setdefault("is_active", True)
+                job = Job(company=self.company, employer=self.employer, **item)
+                to_create.append((position, job))
+                continue
+
+            if occurrences[job_id] > 1:
+                results[position] = {
+                    "status": "error",
+                    "job_id": job_id,
+                    "errors": {
+                        "job_id": ["Job appears more than once in the request."]
+                    },
+                }
+                continue
+
+            job = existing.get(job_id)
+            if job is None:
+                results[position] = {
+                    "status": "error",
+                    "job_id": job_id,
+                    "errors": {"job_id": ["Job does not exist or is not yours."]},
+                }
+                continue
+
+            for field_name, value in item.items():
+                setattr(job, field_name, value)
+            job.updated_at = now
+            update_fields.update(item)
+            to_update.append((position, job))
+
+        job_slugs.assign([job for _, job in to_create])
+
+        with transaction.atomic():
+            Job.objects.bulk_create(
+                [job for _, job in to_create], batch_size=self.batch_size
+            )
+            if to_update:
+                Job.objects.bulk_update(
+                    [job for _, job in to_update],
+                    sorted(update_fields),
+                    batch_size=self.batch_size,
+                )
+            written_jobs = [job for _, job in to_create + to_update]
+            jobs_saved.send(sender=Job, jobs=written_jobs)
+            for job in written_jobs:
+                job._loaded_values = job.current_values()
+
+        for status, written in (("created", to_create), ("updated", to_update)):
+            for position, job in written:
+                results[position] = {
+                    "status": status,
+                    "job_id": job.job_id,
+                    "slug": job.slug,
+                }
+        return results
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+from apps.utils.cache import VersionedCache
+
+# serialized anonymous job list/retrieve responses, bumped on every job write
+job_response_cache = VersionedCache(
+    "jobs:responses", timeout=settings.JOB_RESPONSE_CACHE_TIMEOUT
+)
+
+# company list pages with their active job counts, bumped on company writes
+# and on job writes which change whether a job is active
+company_response_cache = VersionedCache(
+    "jobs:companies", timeout=settings.COMPANY_RESPONSE_CACHE_TIMEOUT
+)
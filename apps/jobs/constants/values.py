@@ -39,6 +39,31 @@ trending_keywords = [
     "SOC Analyst",
 ]
 
+TRENDING_KEYWORDS_COUNT = len(trending_keywords)
+
+# number of jobs returned by /jobs/recommended/, and the most `?limit=` may ask
+RECOMMENDED_JOBS_COUNT = 10
+RECOMMENDED_JOBS_MAX_COUNT = 50
+
+# /jobs/<id>/similar/ returns up to SIMILAR_JOBS_COUNT jobs whose estimated
+# text similarity is at least SIMILAR_JOBS_THRESHOLD, report_duplicate_jobs
+# flags postings at or above DUPLICATE_JOBS_THRESHOLD
+SIMILAR_JOBS_COUNT = 5
+SIMILAR_JOBS_THRESHOLD = 0.3
+DUPLICATE_JOBS_THRESHOLD = 0.8
+
+# suggestions returned by /company/autocomplete/, and the most `?limit=` may ask
+AUTOCOMPLETE_COUNT = 10
+AUTOCOMPLETE_MAX_COUNT = 20
+
+# (label, min, max) years of experience used by the /jobs/?facets=true counts
+EXPERIENCE_BUCKETS = (
+    ("0-1", 0, 1),
+    ("2-4", 2, 4),
+    ("5-9", 5, 9),
+    ("10+", 10, None),
+)
+
 EMPLOYER_ID = "employer_id"
 USER_ID = "user_id"
 JOB_ID = "job_id"
@@ -53,6 +78,7 @@ PROFILE_PICTURE_DOCUMENT_TYPE = "profile_picture"
 COVER_LETTER_DOCUMENT_TYPE = "cover_letter"
 
 ITEMS_PER_PAGE = 5
+BULK_JOBS_MAX_ITEMS = 500
 PAST_3_WEEK_DATETIME_DAYS18 = 18
 
 EMPLOYER = "Employer"
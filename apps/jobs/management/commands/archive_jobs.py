@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.archive import JobArchiver
+
+
+class Command(BaseCommand):
+    help = (
+        "Deactivate jobs older than --expire-days and move jobs soft deleted more "
+        "than --archive-days ago, with their applications, out of tbl_job into the "
+        "archive tables. Meant to be run on a schedule, e.g. nightly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--expire-days",
+            type=int,
+            default=settings.JOB_EXPIRY_DAYS,
+            help="Age in days after which active jobs are deactivated, 0 to skip",
+        )
+        parser.add_argument(
+            "--archive-days",
+            type=int,
+            default=settings.JOB_ARCHIVE_AFTER_DAYS,
+            help="Days after their soft delete at which jobs are archived",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of jobs handled per transaction",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop each step after this many batches, --resume continues it",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue interrupted steps from their checkpoints",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many jobs would be expired and archived",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if options["archive_days"] < 0 or options["expire_days"] < 0:
+            raise CommandError("--expire-days and --archive-days can't be negative")
+
+        archiver = JobArchiver(
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            max_batches=options["max_batches"],
+            log=self.stdout.write,
+        )
+        action = "would be" if options["dry_run"] else "were"
+
+        if options["expire_days"]:
+            expired = archiver.expire(options["expire_days"], resume=options["resume"])
+            self.stdout.write(self.style.SUCCESS(f"{expired} job(s) {action} expired"))
+
+        archived = archiver.archive(options["archive_days"], resume=options["resume"])
+        self.stdout.write(self.style.SUCCESS(f"{archived} job(s) {action} archived"))
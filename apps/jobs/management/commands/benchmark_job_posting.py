@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import User
+from apps.jobs.bulk import JobBulkWriter
+from apps.jobs.models import Company, Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of posting jobs one by one, as JobViewSets.create "
+        "does, against JobBulkWriter. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=200, help="Jobs per run")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        items = [
+            {
+                "job_role": f"Benchmark Engineer {i}",
+                "location": "Remote",
+                "job_type": "full time",
+                "vacancy_position": 1,
+                "industry": "Security",
+                "category": "Engineering",
+                "skills_required": "Python, Django, MySQL",
+            }
+            for i in range(count)
+        ]
+
+        with transaction.atomic():
+            employer = User.objects.create_user(
+                email="benchmark-employer@null.jobs",
+                name="Benchmark",
+                user_type="Employer",
+            )
+            Company.objects.create(
+                creator=employer, name="Benchmark", location="Remote", founded_year=2000
+            )
+
+            def single():
+                for item in items:
+                    company = Company.objects.get(creator=employer)
+                    Job(company=company, employer=employer, **item).save()
+
+            def bulk():
+                company = Company.objects.get(creator=employer)
+                JobBulkWriter(employer, company, options["batch_size"]).write(items)
+
+            for name, run in (("single", single), ("bulk", bulk)):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    run()
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{name:>6}: {count} jobs in {elapsed:.3f}s "
+                    f"({count / elapsed:.0f} jobs/s, {len(queries)} queries)"
+                )
+
+            transaction.set_rollback(True)
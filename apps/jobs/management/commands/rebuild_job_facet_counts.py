@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.rollups import JobFacetCounts
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the active job counts per category and job_type against a "
+        "live aggregate of tbl_job and rebuild them. Use --check to only report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare the rollup against tbl_job, exit 1 on drift",
+        )
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for facet in JobFacetCounts.FACETS:
+            stored = JobFacetCounts.stored_counts(facet)
+            live = JobFacetCounts.live_counts(facet)
+            for value in sorted(set(stored) | set(live)):
+                if stored.get(value, 0) != live.get(value, 0):
+                    drifted += 1
+                    self.stdout.write(
+                        f"{facet}={value!r}: stored {stored.get(value, 0)}, "
+                        f"live {live.get(value, 0)}"
+                    )
+
+        if options["check"]:
+            if drifted:
+                raise CommandError(f"{drifted} facet count(s) have drifted")
+            self.stdout.write(self.style.SUCCESS("facet counts are in sync"))
+            return
+
+        JobFacetCounts.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"rebuilt facet counts, {drifted} had drifted")
+        )
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.constants import values
+from apps.jobs.models import Job
+from apps.jobs.search import job_similarity
+
+
+class Command(BaseCommand):
+    help = (
+        "Report groups of near-duplicate job postings found through the MinHash "
+        "LSH index, for moderators to review. Missing signatures are computed first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=values.DUPLICATE_JOBS_THRESHOLD,
+            help="Minimum estimated similarity of two postings to flag them",
+        )
+        parser.add_argument(
+            "--fail-on-duplicates",
+            action="store_true",
+            help="Exit 1 when any duplicate group is found",
+        )
+
+    def handle(self, *args, **options):
+        threshold = options["threshold"]
+        if not 0 < threshold <= 1:
+            raise CommandError("--threshold must be within (0, 1]")
+
+        job_similarity.backfill()
+        job_similarity.rebuild()
+        groups = job_similarity.duplicate_groups(threshold)
+
+        job_ids = [job_id for group in groups for job_id in group]
+        jobs = (
+            Job.objects.filter(job_id__in=job_ids).select_related("employer").in_bulk()
+        )
+        for number, group in enumerate(groups, start=1):
+            self.stdout.write(f"group {number}: {len(group)} postings")
+            members = sorted(group, key=lambda job_id: jobs[job_id].created_at)
+            for job_id in members:
+                job = jobs[job_id]
+                self.stdout.write(
+                    f"  {job.job_id} {job.slug} {job.job_role!r} "
+                    f"employer={job.employer.email} similarity={group[job_id]:.2f}"
+                )
+
+        if options["fail_on_duplicates"] and groups:
+            raise CommandError(f"{len(groups)} group(s) of duplicate postings found")
+        self.stdout.write(self.style.SUCCESS(f"found {len(groups)} duplicate group(s)"))
@@ -1,12 +1,12 @@
 import uuid
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 from apps.accounts.models import User
 from apps.jobs.constants import values
-import string
-import random
 from apps.jobs.constants.values import GENDER, HIRING_STATUS, JOB_TYPE, STATUS_CHOICES
+from apps.utils.slugs import SlugAllocator
 
 
 class Company(models.Model):
@@ -53,9 +53,14 @@ class Company(models.Model):
     # policy
     is_deleted = models.BooleanField(default=False, editable=False)
 
-def generate_unique_slug(length=8):
-    characters = string.ascii_uppercase + string.digits  # Uppercase letters and digits
-    return ''.join(random.choices(characters, k=length))
+job_slugs = SlugAllocator("job")
+
+
+class JobQuerySet(models.QuerySet):
+    def active(self):
+        """Jobs that are live: activated and not soft deleted"""
+        return self.filter(is_active=True, is_deleted=False)
+
 
 class Job(models.Model):
     """
@@ -68,6 +73,8 @@ class Job(models.Model):
     class Meta:
         db_table = values.DB_TABLE_JOBS
 
+    objects = JobQuerySet.as_manager()
+
     job_id = models.UUIDField(
         primary_key=True, default=uuid.uuid4, editable=False, null=False
     )
@@ -100,6 +107,10 @@ class Job(models.Model):
     is_deleted = models.BooleanField(default=False, null=True, editable=False)
     is_featured = models.BooleanField(default=False, null=True)
 
+    # denormalized count of applications, maintained by the apply flow, the
+    # per status breakdown lives in applicants.JobStatusCount
+    total_applicants = models.PositiveIntegerField(default=0, editable=False)
+
     # These fields will be displayed as a part of "description" field and the
     # body of the job
     job_responsibilities = models.TextField(default="No Job Responsibilities provided")
@@ -107,13 +118,126 @@ class Job(models.Model):
     education_or_certifications = models.TextField(default="No Education details provided")
     about = models.TextField(default="No description provided")
 
+    # counters maintained with relative UPDATEs, a full save() of a stale
+    # instance must never write them back
+    COUNTER_FIELDS = ("total_applicants",)
+
     def save(self, *args, **kwargs):
         if not self.slug:  # Generate slug only if it doesn't exist
-            unique_slug = generate_unique_slug()
-            while User.objects.filter(slug=unique_slug).exists():  # Ensure uniqueness
-                unique_slug = generate_unique_slug()
-            self.slug = unique_slug
+            self.slug = job_slugs.allocate()
+
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred_fields = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred_fields
+            ]
         super().save(*args, **kwargs)
+        self._loaded_values = self.current_values()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # remember what was read so signal handlers can diff against it
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def current_values(self):
+        deferred_fields = self.get_deferred_fields()
+        return {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred_fields
+        }
+
+    def previous_values(self):
+        """Field values as last read from or written to the database,
+        an empty dict for jobs which aren't stored yet"""
+        return getattr(self, "_loaded_values", {})
+
+
+class JobFacetCount(models.Model):
+    """
+    Rollup of active jobs per value of a facet (category, job_type),
+    maintained incrementally by JobFacetCounts.
+    """
+
+    class Meta:
+        db_table = "tbl_job_facet_count"
+        unique_together = [["facet", "value"]]
+
+    facet = models.CharField(max_length=20)
+    # jobs without a category are counted under the empty string
+    value = models.CharField(max_length=80, blank=True)
+    count = models.PositiveIntegerField(default=0)
+
+
+class JobSignature(models.Model):
+    """
+    MinHash signature of a job's text, NUM_PERM little endian uint32s,
+    maintained by JobSimilarityIndex.
+    """
+
+    class Meta:
+        db_table = "tbl_job_signature"
+
+    job = models.OneToOneField(
+        Job, primary_key=True, on_delete=models.CASCADE, related_name="signature"
+    )
+    signature = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class TrendingKeyword(models.Model):
+    """
+    Decayed search frequency of a keyword as of updated_at, merged in
+    periodically by the TrendingKeywords flusher of every worker.
+    """
+
+    class Meta:
+        db_table = "tbl_trending_keyword"
+
+    keyword = models.CharField(max_length=100, unique=True)
+    score = models.FloatField(default=0)
+    updated_at = models.DateTimeField()
+
+
+class ArchivedJob(models.Model):
+    """
+    Soft deleted job moved out of tbl_job by the archive_jobs command, its
+    applications are archived in applicants.ArchivedApplicant.
+    """
+
+    class Meta:
+        db_table = "tbl_archived_job"
+
+    job_id = models.UUIDField(primary_key=True, editable=False)
+    employer_id = models.UUIDField(db_index=True)
+    company_id = models.UUIDField(db_index=True)
+    created_at = models.DateTimeField()
+    deleted_at = models.DateTimeField()
+    # every column of the tbl_job row
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+
+class ArchiveCheckpoint(models.Model):
+    """
+    Progress of an interrupted archive_jobs step: the cutoff it was run
+    with and the (created_at, job_id) of the last job it handled.
+    """
+
+    class Meta:
+        db_table = "tbl_archive_checkpoint"
+
+    name = models.CharField(max_length=50, unique=True)
+    cutoff = models.DateTimeField()
+    last_created_at = models.DateTimeField(null=True)
+    last_job_id = models.UUIDField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 class ContactMessage(models.Model):
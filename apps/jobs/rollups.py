@@ -0,0 +1,113 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from apps.jobs.models import Job, JobFacetCount
+from apps.utils.cache import VersionedCache
+
+
+class JobFacetCounts:
+    """
+    Number of active jobs per category and per job_type.
+
+    The counts are kept in tbl_job_facet_count and adjusted by the Job
+    signal handlers with the difference between a job's previous and new
+    state, so reading them never touches tbl_job. Readers are served from
+    the cache, which is versioned and bumped whenever a count moves; the
+    bump only reaches the cache of the worker which wrote, so entries also
+    expire after JOB_FACET_CACHE_TIMEOUT seconds.
+    """
+
+    FACETS = ("category", "job_type")
+
+    cache = VersionedCache("jobs:facets", timeout=settings.JOB_FACET_CACHE_TIMEOUT)
+
+    @classmethod
+    def contribution(cls, values):
+        """The (facet, value) pairs a job with these field values counts under"""
+        if not values or not values.get("is_active") or values.get("is_deleted"):
+            return Counter()
+        return Counter((facet, values.get(facet) or "") for facet in cls.FACETS)
+
+    @classmethod
+    def changes(cls, previous_values, current_values):
+        """Count deltas caused by a job going from one state to the other"""
+        # fields missing from the previous values (deferred) did not change
+        if previous_values:
+            previous_values = {**current_values, **previous_values}
+
+        deltas = Counter(cls.contribution(current_values))
+        deltas.subtract(cls.contribution(previous_values))
+        return deltas
+
+    @classmethod
+    def apply(cls, deltas):
+        changed = False
+        for (facet, value), delta in deltas.items():
+            if delta:
+                cls.add(facet, value, delta)
+                changed = True
+
+        if changed:
+            transaction.on_commit(cls.cache.bump)
+
+    @staticmethod
+    def add(facet, value, delta):
+        counts = JobFacetCount.objects.filter(facet=facet, value=value)
+        if delta < 0:
+            counts = counts.filter(count__gte=-delta)
+        if counts.update(count=F("count") + delta) or delta <= 0:
+            return
+
+        try:
+            with transaction.atomic():
+                JobFacetCount.objects.create(facet=facet, value=value, count=delta)
+        except IntegrityError:
+            JobFacetCount.objects.filter(facet=facet, value=value).update(
+                count=F("count") + delta
+            )
+
+    @classmethod
+    def counts(cls, facet):
+        """Return {value: count} of active jobs for the facet"""
+        counts = cls.cache.get(facet)
+        if counts is None:
+            counts = {
+                value or None: count
+                for value, count in JobFacetCount.objects.filter(
+                    facet=facet, count__gt=0
+                ).values_list("value", "count")
+            }
+            cls.cache.set(counts, facet)
+        return counts
+
+    @classmethod
+    def live_counts(cls, facet):
+        """Aggregate the counts straight from tbl_job"""
+        return {
+            row[facet] or "": row["count"]
+            for row in Job.objects.active()
+            .values(facet)
+            .annotate(count=Count("job_id"))
+        }
+
+    @classmethod
+    def stored_counts(cls, facet):
+        return dict(
+            JobFacetCount.objects.filter(facet=facet, count__gt=0).values_list(
+                "value", "count"
+            )
+        )
+
+    @classmethod
+    def rebuild(cls):
+        with transaction.atomic():
+            JobFacetCount.objects.all().delete()
+            JobFacetCount.objects.bulk_create(
+                JobFacetCount(facet=facet, value=value, count=count)
+                for facet in cls.FACETS
+                for value, count in cls.live_counts(facet).items()
+            )
+            transaction.on_commit(cls.cache.bump)
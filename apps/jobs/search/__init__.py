@@ -0,0 +1,24 @@
+from apps.jobs.search.autocomplete import (
+    CompanyAutocomplete,
+    PrefixIndex,
+    company_autocomplete,
+)
+from apps.jobs.search.facets import compute_facets
+from apps.jobs.search.filters import JobSearchFilter
+from apps.jobs.search.index import InvertedIndex, JobSearchIndex, job_index, tokenize
+from apps.jobs.search.recommend import (
+    HashedFeatureMatrix,
+    JobRecommender,
+    job_recommender,
+)
+from apps.jobs.search.similarity import (
+    JobSimilarityIndex,
+    MinHasher,
+    MinHashLSH,
+    job_similarity,
+)
+from apps.jobs.search.trending import (
+    DecayedSpaceSaving,
+    TrendingKeywords,
+    trending_keywords,
+)
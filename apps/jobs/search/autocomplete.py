@@ -0,0 +1,296 @@
+"""
+Prefix autocomplete over company names and job roles.
+
+Every suggestion is stored once, under each of its words, in a sorted
+list of (word suffix of the label, kind, id) keys, so the suggestions
+matching a prefix are the contiguous range bisect finds for it, and
+"sec" suggests "Cyber Security". Suggestions are ranked by their number
+of active jobs. Ranges of very short prefixes can be large, their ranked
+results are kept in a small cache which writes update in place.
+"""
+
+import bisect
+import threading
+from collections import OrderedDict
+
+from django.db.models import Count, Q
+
+from apps.jobs.search.base import ProcessIndex
+
+COMPANY = "company"
+JOB_ROLE = "job_role"
+
+
+def normalize_label(label, max_length=100):
+    return " ".join(str(label or "").lower().split())[:max_length]
+
+
+def rank_key(suggestion):
+    """Sort key of a (kind, id, label, weight) suggestion, best first"""
+    return (-suggestion[3], suggestion[2].lower(), suggestion[1])
+
+
+class PrefixIndex:
+    """
+    Sorted prefix index of weighted suggestions. A suggestion is indexed
+    under at most `max_words` of its words, and at most `max_cached`
+    prefixes with more than `scan_limit` matches have their results cached.
+
+    A write only touches the cached prefixes of the words it changes. The
+    suggestion is moved to its new rank in each of their lists, and a list
+    is dropped only when the suggestion leaves its cut-off top results, as
+    the one which should take its place is not known.
+    """
+
+    def __init__(self, max_words=8, scan_limit=256, max_cached=1024):
+        self.max_words = max_words
+        self.scan_limit = scan_limit
+        self.max_cached = max_cached
+        self._keys = []
+        self._entries = {}
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, entry_id):
+        return entry_id in self._entries
+
+    def index_keys(self, label, entry_id):
+        words = normalize_label(label).split(" ")[: self.max_words]
+        return sorted(
+            {(" ".join(words[position:]), *entry_id) for position in range(len(words))}
+        )
+
+    def load(self, suggestions):
+        """Add many (entry_id, label, weight) at once, sorting the keys only once"""
+        with self._lock:
+            for entry_id, label, weight in suggestions:
+                self._remove(entry_id)
+                keys = self.index_keys(label, entry_id)
+                self._keys.extend(keys)
+                self._entries[entry_id] = {
+                    "label": label,
+                    "weight": weight,
+                    "keys": keys,
+                }
+            self._keys.sort()
+            self._cache.clear()
+
+    def weight(self, entry_id):
+        entry = self._entries.get(entry_id)
+        return entry["weight"] if entry is not None else None
+
+    def add(self, entry_id, label, weight=0):
+        """Add or replace the suggestion `label` stored as entry_id (kind, id)"""
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is not None and entry["label"] == label:
+                entry["weight"] = weight
+                self._update_cache(entry_id, entry["keys"])
+                return
+
+            previous_keys = self._remove(entry_id)
+            keys = self.index_keys(label, entry_id)
+            for key in keys:
+                bisect.insort(self._keys, key)
+            self._entries[entry_id] = {
+                "label": label,
+                "weight": weight,
+                "keys": keys,
+            }
+            self._update_cache(entry_id, previous_keys + keys)
+
+    def add_weight(self, entry_id, delta):
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return None
+            entry["weight"] = max(entry["weight"] + delta, 0)
+            self._update_cache(entry_id, entry["keys"])
+            return entry["weight"]
+
+    def remove(self, entry_id):
+        with self._lock:
+            self._update_cache(entry_id, self._remove(entry_id))
+
+    def _remove(self, entry_id):
+        """Drop the entry's keys, returns them"""
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return []
+        for key in entry["keys"]:
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+        return entry["keys"]
+
+    def _update_cache(self, entry_id, keys):
+        """Bring the cached prefixes of `keys` in line with the entry's state"""
+        if not self._cache:
+            return
+        prefixes = {
+            key[0][:length] for key in keys for length in range(1, len(key[0]) + 1)
+        }
+        entry = self._entries.get(entry_id)
+        for prefix in prefixes.intersection(self._cache):
+            cached = self._cache[prefix]
+            ranked = cached["ranked"]
+            position = next(
+                (
+                    position
+                    for position, suggestion in enumerate(ranked)
+                    if suggestion[:2] == entry_id
+                ),
+                None,
+            )
+            if position is not None:
+                del ranked[position]
+
+            if entry is not None and any(
+                key[0].startswith(prefix) for key in entry["keys"]
+            ):
+                suggestion = (*entry_id, entry["label"], entry["weight"])
+                rank = rank_key(suggestion)
+                if cached["complete"] or (ranked and rank < rank_key(ranked[-1])):
+                    ranked.insert(
+                        bisect.bisect([rank_key(other) for other in ranked], rank),
+                        suggestion,
+                    )
+                    if len(ranked) > cached["size"]:
+                        ranked.pop()
+                        cached["complete"] = False
+                    continue
+
+            # the entry left a list cut off after `size` results
+            if position is not None and not cached["complete"]:
+                del self._cache[prefix]
+
+    def search(self, prefix, limit=10):
+        """Return [(kind, id, label, weight)] of the best suggestions for a prefix"""
+        prefix = normalize_label(prefix)
+        if not prefix:
+            return []
+
+        with self._lock:
+            cached = self._cache.get(prefix)
+            if cached is not None and (
+                cached["complete"] or len(cached["ranked"]) >= limit
+            ):
+                self._cache.move_to_end(prefix)
+                return cached["ranked"][:limit]
+
+            start = bisect.bisect_left(self._keys, (prefix,))
+            end = bisect.bisect_left(self._keys, (prefix + "\uffff",))
+            entry_ids = {key[1:] for key in self._keys[start:end]}
+            suggestions = []
+            for entry_id in entry_ids:
+                entry = self._entries[entry_id]
+                suggestions.append((*entry_id, entry["label"], entry["weight"]))
+            ranked = sorted(suggestions, key=rank_key)
+
+            if end - start > self.scan_limit:
+                size = max(limit, 20)
+                self._cache[prefix] = {
+                    "ranked": ranked[:size],
+                    "size": size,
+                    "complete": len(ranked) <= size,
+                }
+                if len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+            return ranked[:limit]
+
+
+class CompanyAutocomplete(ProcessIndex):
+    """
+    Process wide PrefixIndex of non-deleted company names and the roles of
+    active jobs, weighted by active job counts, rebuilt every
+    `COMPANY_AUTOCOMPLETE_TTL` seconds.
+
+    Job changes arrive as weight deltas, one applied while a rebuild runs
+    can be counted twice in the rebuilt index until the next one.
+    """
+
+    ttl_setting = "COMPANY_AUTOCOMPLETE_TTL"
+
+    def build(self):
+        from apps.jobs.models import Company, Job
+
+        companies = Company.objects.filter(is_deleted=False).annotate(
+            active_jobs=Count(
+                "company", filter=Q(company__is_active=True, company__is_deleted=False)
+            )
+        )
+        suggestions = {
+            (COMPANY, str(company_id)): [name, active_jobs]
+            for company_id, name, active_jobs in companies.values_list(
+                "company_id", "name", "active_jobs"
+            ).iterator(chunk_size=2000)
+        }
+
+        # spellings of a role which only differ in case or spacing are merged
+        roles = Job.objects.active().values("job_role").annotate(count=Count("job_id"))
+        for row in roles.order_by().iterator(chunk_size=2000):
+            role = normalize_label(row["job_role"])
+            if role:
+                suggestion = suggestions.setdefault(
+                    (JOB_ROLE, role), [row["job_role"].strip(), 0]
+                )
+                suggestion[1] += row["count"]
+
+        index = PrefixIndex()
+        index.load(
+            (entry_id, label, weight)
+            for entry_id, (label, weight) in suggestions.items()
+        )
+        return index
+
+    def index_company(self, company):
+        entry_id = (COMPANY, str(company.company_id))
+        if company.is_deleted:
+            self.update(lambda index: index.remove(entry_id))
+        else:
+            name = company.name
+            self.update(
+                lambda index: index.add(entry_id, name, index.weight(entry_id) or 0)
+            )
+
+    def remove_company(self, company_id):
+        self.update(lambda index: index.remove((COMPANY, str(company_id))))
+
+    def jobs_changed(self, changes):
+        """
+        Apply active job count changes, `changes` holds (company_id,
+        job_role, delta) for every job which started or stopped being an
+        active job with that company and role
+        """
+
+        def apply(index):
+            for company_id, job_role, delta in changes:
+                index.add_weight((COMPANY, str(company_id)), delta)
+
+                role = normalize_label(job_role)
+                if not role:
+                    continue
+                weight = index.add_weight((JOB_ROLE, role), delta)
+                if weight is None and delta > 0:
+                    index.add((JOB_ROLE, role), job_role.strip(), delta)
+                elif weight == 0:
+                    index.remove((JOB_ROLE, role))
+
+        self.update(apply)
+
+    def suggest(self, prefix, limit=10):
+        return [
+            {
+                "type": kind,
+                "id": ident if kind == COMPANY else None,
+                "label": label,
+                "active_jobs": weight,
+            }
+            for kind, ident, label, weight in self.get_index().search(prefix, limit)
+        ]
+
+
+company_autocomplete = CompanyAutocomplete()
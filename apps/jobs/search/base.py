@@ -0,0 +1,137 @@
+"""
+Common lifecycle of the process wide job indexes.
+
+Every worker process holds its own copy of each index, built from the
+database and kept current by the signal handlers in `apps.jobs.signals`.
+Writes made by other processes only reach it through a periodic rebuild,
+which runs in a background thread while the current copy keeps serving.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessIndex:
+    """
+    An in-memory structure built by `build()` and swapped in as a whole.
+
+    Only a process' very first build runs in the caller of `get_index()`.
+    Once the structure is older than the `ttl_setting` seconds it is
+    still returned, and a background thread builds its replacement.
+    Writes passed to `update()` while that build runs are applied to the
+    current structure and replayed onto the new one before the swap, so
+    they should set state (add, remove) rather than add to it.
+    """
+
+    ttl_setting = None
+    default_ttl = 900
+
+    def __init__(self):
+        self._index = None
+        self._built_at = 0
+        self._pending = None
+        # guards the swap and the writes replayed onto a new build
+        self._lock = threading.Lock()
+        # held for the whole build, one build at a time
+        self._building = threading.Lock()
+        self._thread = None
+
+    @property
+    def ttl(self):
+        return getattr(settings, self.ttl_setting, self.default_ttl)
+
+    @property
+    def tracking(self):
+        """Whether writes have to be passed to `update()` yet"""
+        return self._index is not None or self._pending is not None
+
+    def build(self):
+        raise NotImplementedError
+
+    def get_index(self):
+        index = self._index
+        if index is None:
+            with self._building:
+                index = self._index
+                if index is None:
+                    self._track_writes()
+                    index = self._rebuild()
+        elif time.monotonic() - self._built_at > self.ttl:
+            self.refresh_in_background()
+        return index
+
+    def rebuild(self):
+        """Build a new structure in the caller and swap it in"""
+        with self._building:
+            self._track_writes()
+            return self._rebuild()
+
+    def _track_writes(self):
+        # from here on writes are kept for the structure about to be built
+        with self._lock:
+            self._pending = []
+
+    def _rebuild(self):
+        try:
+            index = self.build()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            for change in self._pending:
+                change(index)
+            self._pending = None
+            self._index = index
+            self._built_at = time.monotonic()
+        return index
+
+    def refresh_in_background(self):
+        """Start a rebuild in a thread unless one is already running"""
+        if not self._building.acquire(blocking=False):
+            return
+        self._track_writes()
+        self._thread = threading.Thread(
+            target=self._rebuild_in_background,
+            name=f"{type(self).__name__}-rebuild",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _rebuild_in_background(self):
+        close_old_connections()
+        try:
+            self._rebuild()
+        except Exception:
+            logger.exception("Rebuilding %s failed", type(self).__name__)
+        finally:
+            self._building.release()
+            connection.close()
+
+    def warm(self):
+        """Build the index in the background if the process has none yet"""
+        if self._index is None:
+            self.refresh_in_background()
+
+    def update(self, change):
+        """
+        Apply `change(index)` to the current structure, and to the one
+        being built if there is a build running. Nothing is applied before
+        the first build, it reads the database as it is then.
+        """
+        with self._lock:
+            if self._index is not None:
+                change(self._index)
+            if self._pending is not None:
+                self._pending.append(change)
+
+    def clear(self):
+        with self._lock:
+            self._index = None
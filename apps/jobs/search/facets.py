@@ -0,0 +1,87 @@
+from collections import Counter
+
+from django.db.models import Case, CharField, Count, Value, When
+
+from apps.jobs.constants import values
+from apps.jobs.search.filters import RankedJobs
+
+FACET_FIELDS = ("category", "job_type", "is_featured", "experience")
+
+
+def experience_bucket():
+    """Case expression naming the EXPERIENCE_BUCKETS range of a job"""
+    whens = []
+    for label, minimum, maximum in values.EXPERIENCE_BUCKETS:
+        lookup = {"experience__gte": minimum}
+        if maximum is not None:
+            lookup["experience__lte"] = maximum
+        whens.append(When(then=Value(label), **lookup))
+    return Case(*whens, default=Value(None), output_field=CharField())
+
+
+def experience_label(experience):
+    """Name of the EXPERIENCE_BUCKETS range the experience falls in"""
+    if experience is None:
+        return None
+    for label, minimum, maximum in values.EXPERIENCE_BUCKETS:
+        if experience >= minimum and (maximum is None or experience <= maximum):
+            return label
+    return None
+
+
+def compute_facets(queryset):
+    """
+    Count the jobs of the queryset per category, job_type, is_featured and
+    experience bucket. The queryset is grouped once on all four columns
+    and the marginal counts are folded together here, so every facet comes
+    out of a single aggregation query.
+
+    Search results are counted from the attributes the index returned
+    with them, without a query.
+    """
+    if isinstance(queryset, RankedJobs):
+        groups = Counter(
+            (
+                attributes["category"],
+                attributes["job_type"],
+                attributes["is_featured"],
+                experience_label(attributes["experience"]),
+            )
+            for attributes in queryset.attributes
+        )
+        rows = [
+            {
+                "category": category,
+                "job_type": job_type,
+                "is_featured": is_featured,
+                "experience_bucket": bucket,
+                "count": count,
+            }
+            for (category, job_type, is_featured, bucket), count in groups.items()
+        ]
+    else:
+        rows = (
+            queryset.order_by()
+            .annotate(experience_bucket=experience_bucket())
+            .values("category", "job_type", "is_featured", "experience_bucket")
+            .annotate(count=Count("job_id"))
+        )
+
+    counters = {facet: Counter() for facet in FACET_FIELDS}
+    for row in rows:
+        counters["category"][row["category"]] += row["count"]
+        counters["job_type"][row["job_type"]] += row["count"]
+        counters["is_featured"][bool(row["is_featured"])] += row["count"]
+        counters["experience"][row["experience_bucket"]] += row["count"]
+
+    bucket_order = [label for label, _, _ in values.EXPERIENCE_BUCKETS]
+    facets = {}
+    for facet, counts in counters.items():
+        if facet == "experience":
+            ordered = [
+                (label, counts[label]) for label in bucket_order if counts[label]
+            ]
+        else:
+            ordered = counts.most_common()
+        facets[facet] = [{"value": value, "count": count} for value, count in ordered]
+    return facets
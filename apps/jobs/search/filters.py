@@ -0,0 +1,104 @@
+from rest_framework import filters
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.settings import api_settings
+
+from apps.jobs.search.index import job_index
+
+
+class RankedJobs:
+    """
+    Search matches in relevance order, handed to the paginator in place of
+    a queryset. The count comes from the index and slicing reads only the
+    jobs of the slice, by primary key.
+    """
+
+    def __init__(self, queryset, job_ids, attributes):
+        self.queryset = queryset
+        self.job_ids = job_ids
+        self.attributes = attributes
+
+    def count(self):
+        return len(self.job_ids)
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item : item + 1][0]
+
+        job_ids = self.job_ids[item]
+        jobs = {job.job_id: job for job in self.queryset.filter(job_id__in=job_ids)}
+        return [jobs[job_id] for job_id in job_ids if job_id in jobs]
+
+
+class JobSearchFilter(filters.SearchFilter):
+    """
+    `?search=` backend answered from the in-memory BM25 index instead of
+    `LIKE '%term%'` scans.
+
+    The view's filterset and search scope are turned into conditions on the
+    attributes indexed with every job, so the index returns exactly the
+    matching jobs and only the requested limit/offset page is read from the
+    database, see `RankedJobs`. It has to be the last filter backend.
+
+    With `?ordering=`, keyset pagination, or a filter the index has no
+    attribute for, the matches are handed to SQL as `job_id IN (...)` and
+    come back in the order of the queryset.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        conditions = self.get_conditions(request, queryset, view)
+        index = job_index.get_index()
+        matched = index.search(" ".join(search_terms), conditions=conditions or ())
+        job_ids = [job_id for job_id, _ in matched]
+
+        paginator = getattr(view, "paginator", None)
+        if (
+            conditions is None
+            or not isinstance(paginator, LimitOffsetPagination)
+            or request.query_params.get(api_settings.ORDERING_PARAM)
+        ):
+            return queryset.filter(job_id__in=job_ids)
+
+        return RankedJobs(
+            queryset, job_ids, [index.attributes(job_id) for job_id in job_ids]
+        )
+
+    def get_conditions(self, request, queryset, view):
+        """
+        (attribute, lookup, value) conditions equivalent to the filters
+        applied by the other backends, None if one of them can't be
+        checked against the index
+        """
+        get_scope = getattr(view, "get_search_scope", dict)
+        conditions = [
+            (attribute, "exact", value) for attribute, value in get_scope().items()
+        ]
+
+        filterset_class = getattr(view, "filterset_class", None)
+        if filterset_class is None:
+            return conditions
+
+        filterset = filterset_class(request.query_params, queryset, request=request)
+        if not filterset.is_valid():
+            return None
+        for name, value in filterset.form.cleaned_data.items():
+            if value is None or value == "" or value == []:
+                continue
+            field = filterset.filters[name]
+            if (
+                field.field_name not in job_index.ATTRIBUTES
+                or field.lookup_expr not in ("exact", "in", "gte", "lte")
+                or field.exclude
+            ):
+                return None
+            conditions.append((field.field_name, field.lookup_expr, value))
+        return conditions
@@ -0,0 +1,300 @@
+"""
+In-memory inverted index with BM25 ranking.
+
+The index keeps a posting list per term (term -> {doc_id: weighted tf}),
+the weighted length of every document and a sorted vocabulary that lets
+query terms match as prefixes, the same way the old `LIKE '%term%'`
+search let "dev" find "Developer".
+
+Next to the postings every document can carry a dict of attributes, so a
+search can be narrowed by exact/in/range conditions on them without going
+to the database.
+"""
+
+import bisect
+import math
+import operator
+import re
+import threading
+from collections import Counter, defaultdict
+
+from apps.jobs.search.base import ProcessIndex
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+STOP_WORDS = frozenset(
+    (
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "for",
+        "from",
+        "in",
+        "is",
+        "it",
+        "of",
+        "on",
+        "or",
+        "the",
+        "to",
+        "with",
+        "will",
+        "you",
+    )
+)
+
+
+LOOKUPS = {
+    "exact": operator.eq,
+    "in": lambda value, choices: value in choices,
+    "gte": lambda value, bound: value is not None and value >= bound,
+    "lte": lambda value, bound: value is not None and value <= bound,
+}
+
+
+def tokenize(text):
+    """Lowercase the text and split it into index terms"""
+    if not text:
+        return []
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(str(text).lower())
+        if token not in STOP_WORDS
+    ]
+
+
+class InvertedIndex:
+    """
+    Posting lists over weighted fields, scored with Okapi BM25.
+
+    Documents are added as a dict of field name -> text, each field's
+    term frequencies are multiplied by its weight so e.g. a match in the
+    job role counts more than one in the long description.
+    """
+
+    def __init__(self, field_weights, k1=1.2, b=0.75, max_prefix_expansions=50):
+        self.field_weights = field_weights
+        self.k1 = k1
+        self.b = b
+        self.max_prefix_expansions = max_prefix_expansions
+
+        self._postings = defaultdict(dict)
+        self._doc_terms = {}
+        self._doc_lengths = {}
+        self._doc_attributes = {}
+        self._total_length = 0
+        self._vocabulary = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_lengths
+
+    def add(self, doc_id, fields, attributes=None):
+        """Index a document, replacing any previous version of it"""
+        terms = Counter()
+        for field_name, weight in self.field_weights.items():
+            for token in tokenize(fields.get(field_name)):
+                terms[token] += weight
+
+        with self._lock:
+            self._remove(doc_id)
+            for term, frequency in terms.items():
+                postings = self._postings[term]
+                if not postings:
+                    bisect.insort(self._vocabulary, term)
+                postings[doc_id] = frequency
+
+            length = sum(terms.values())
+            self._doc_terms[doc_id] = tuple(terms)
+            self._doc_lengths[doc_id] = length
+            self._doc_attributes[doc_id] = attributes or {}
+            self._total_length += length
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        self._doc_attributes.pop(doc_id, None)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                position = bisect.bisect_left(self._vocabulary, term)
+                if (
+                    position < len(self._vocabulary)
+                    and self._vocabulary[position] == term
+                ):
+                    del self._vocabulary[position]
+
+    def attributes(self, doc_id):
+        return self._doc_attributes.get(doc_id, {})
+
+    def matches(self, doc_id, conditions):
+        """Check a document against (attribute, lookup, value) conditions"""
+        attributes = self._doc_attributes[doc_id]
+        return all(
+            LOOKUPS[lookup](attributes.get(attribute), value)
+            for attribute, lookup, value in conditions
+        )
+
+    def expand(self, token):
+        """Return the indexed terms starting with the given token"""
+        start = bisect.bisect_left(self._vocabulary, token)
+        expansions = []
+        for term in self._vocabulary[start : start + self.max_prefix_expansions]:
+            if not term.startswith(token):
+                break
+            expansions.append(term)
+        return expansions
+
+    def search(self, query, limit=None, conditions=()):
+        """
+        Return (doc_id, score) pairs ordered by descending BM25 score.
+        Every query token has to match (as a prefix) in a document for it to
+        be returned, mirroring the AND semantics of DRF's SearchFilter, and
+        so do the attribute `conditions`, see `matches`.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        with self._lock:
+            total_docs = len(self._doc_lengths)
+            if not total_docs:
+                return []
+            average_length = self._total_length / total_docs or 1
+
+            scores = None
+            for token in tokens:
+                token_scores = defaultdict(float)
+                for term in self.expand(token):
+                    postings = self._postings[term]
+                    idf = math.log(
+                        1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5)
+                    )
+                    for doc_id, frequency in postings.items():
+                        norm = self.k1 * (
+                            1
+                            - self.b
+                            + self.b * self._doc_lengths[doc_id] / average_length
+                        )
+                        token_scores[doc_id] += (
+                            idf * frequency * (self.k1 + 1) / (frequency + norm)
+                        )
+
+                if scores is None:
+                    scores = {
+                        doc_id: score
+                        for doc_id, score in token_scores.items()
+                        if not conditions or self.matches(doc_id, conditions)
+                    }
+                else:
+                    scores = {
+                        doc_id: score + token_scores[doc_id]
+                        for doc_id, score in scores.items()
+                        if doc_id in token_scores
+                    }
+
+                if not scores:
+                    return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], str(item[0])))
+        return ranked[:limit] if limit else ranked
+
+
+class JobSearchIndex(ProcessIndex):
+    """
+    Process wide BM25 index over the text fields of non-deleted jobs, with
+    the columns the job listing filters on kept as document attributes.
+    It is rebuilt every `JOB_SEARCH_INDEX_TTL` seconds, see ProcessIndex.
+    """
+
+    ttl_setting = "JOB_SEARCH_INDEX_TTL"
+
+    FIELD_WEIGHTS = {
+        "job_role": 3,
+        "skills_required": 2,
+        "location": 2,
+        "industry": 1,
+        "category": 1,
+        "job_type": 1,
+        "about": 1,
+        "job_responsibilities": 1,
+        "education_or_certifications": 1,
+    }
+
+    ATTRIBUTES = (
+        "employer_id",
+        "is_active",
+        "is_featured",
+        "category",
+        "job_type",
+        "experience",
+    )
+
+    def document(self, job):
+        """Collect the indexed fields of a job, skipping placeholder defaults"""
+        from apps.jobs.models import Job
+
+        fields = {}
+        for field_name in self.FIELD_WEIGHTS:
+            value = (
+                job[field_name] if isinstance(job, dict) else getattr(job, field_name)
+            )
+            if value == Job._meta.get_field(field_name).default:
+                continue
+            fields[field_name] = value
+        return fields
+
+    def attributes(self, job):
+        if isinstance(job, dict):
+            return {attribute: job[attribute] for attribute in self.ATTRIBUTES}
+        return {attribute: getattr(job, attribute) for attribute in self.ATTRIBUTES}
+
+    def build(self):
+        from apps.jobs.models import Job
+
+        index = InvertedIndex(self.FIELD_WEIGHTS)
+        columns = dict.fromkeys(("job_id", *self.FIELD_WEIGHTS, *self.ATTRIBUTES))
+        jobs = Job.objects.filter(is_deleted=False).values(*columns)
+        for job in jobs.iterator(chunk_size=2000):
+            index.add(job["job_id"], self.document(job), self.attributes(job))
+        return index
+
+    def index_job(self, job):
+        # nothing to do until a build starts, it will read the job then
+        if not self.tracking:
+            return
+        if job.is_deleted:
+            self.update(lambda index: index.remove(job.job_id))
+        else:
+            document, attributes = self.document(job), self.attributes(job)
+            self.update(lambda index: index.add(job.job_id, document, attributes))
+
+    def remove_jobs(self, job_ids):
+        def remove(index):
+            for job_id in job_ids:
+                index.remove(job_id)
+
+        self.update(remove)
+
+    def search(self, query, limit=None, conditions=()):
+        return self.get_index().search(query, limit=limit, conditions=conditions)
+
+
+job_index = JobSearchIndex()
@@ -0,0 +1,265 @@
+"""
+Skill based job recommendations.
+
+Every active job is a row of hashed features built from its
+`skills_required` and `job_role` terms. Rows are stored in ELLPACK form,
+two fixed width arrays holding the feature ids and the L2 normalised term
+weights of each row, which keeps updating a single job O(1) while still
+letting a profile be scored against all jobs in one vectorized pass.
+Document frequencies are kept per feature so the idf weights stay current
+as rows come and go.
+"""
+
+import math
+import threading
+import zlib
+from collections import Counter
+from datetime import date
+
+import numpy as np
+
+from apps.jobs.search.base import ProcessIndex
+from apps.jobs.search.index import tokenize
+
+
+def feature_id(term, dimensions):
+    """Stable hash of a term, unlike hash() it is the same in every process"""
+    return zlib.crc32(term.encode()) % dimensions
+
+
+class HashedFeatureMatrix:
+    """
+    Fixed width sparse rows of hashed features with per feature document
+    frequencies. Rows of removed documents are recycled by later additions.
+    """
+
+    def __init__(self, dimensions=2**18, row_width=32, capacity=1024):
+        self.dimensions = dimensions
+        self.row_width = row_width
+        self.features = np.zeros((capacity, row_width), dtype=np.int32)
+        self.weights = np.zeros((capacity, row_width), dtype=np.float32)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.doc_freq = np.zeros(dimensions, dtype=np.int32)
+        self.doc_ids = [None] * capacity
+        self.rows = {}
+        self.free_rows = []
+        self._size = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.rows
+
+    def vectorize(self, weighted_terms):
+        """Return (feature ids, unit length weights) of the heaviest features"""
+        totals = Counter()
+        for term, weight in weighted_terms.items():
+            totals[feature_id(term, self.dimensions)] += weight
+        top = totals.most_common(self.row_width)
+        if not top:
+            return [], []
+
+        norm = math.sqrt(sum(weight * weight for _, weight in top))
+        return [feature for feature, _ in top], [weight / norm for _, weight in top]
+
+    def _grow(self):
+        capacity = len(self.live) * 2
+        for name in ("features", "weights"):
+            grown = np.zeros(
+                (capacity, self.row_width), dtype=getattr(self, name).dtype
+            )
+            grown[: self._size] = getattr(self, name)[: self._size]
+            setattr(self, name, grown)
+        live = np.zeros(capacity, dtype=bool)
+        live[: self._size] = self.live[: self._size]
+        self.live = live
+        self.doc_ids.extend([None] * (capacity - len(self.doc_ids)))
+
+    def add(self, doc_id, weighted_terms):
+        features, weights = self.vectorize(weighted_terms)
+        with self._lock:
+            self._remove(doc_id)
+            if not features:
+                return
+
+            if self.free_rows:
+                row = self.free_rows.pop()
+            else:
+                if self._size == len(self.live):
+                    self._grow()
+                row = self._size
+                self._size += 1
+
+            self.features[row] = 0
+            self.weights[row] = 0
+            self.features[row, : len(features)] = features
+            self.weights[row, : len(weights)] = weights
+            self.doc_freq[features] += 1
+            self.live[row] = True
+            self.doc_ids[row] = doc_id
+            self.rows[doc_id] = row
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        row = self.rows.pop(doc_id, None)
+        if row is None:
+            return
+        used = self.weights[row] > 0
+        self.doc_freq[self.features[row][used]] -= 1
+        self.live[row] = False
+        self.weights[row] = 0
+        self.doc_ids[row] = None
+        self.free_rows.append(row)
+
+    def idf(self, features):
+        total = len(self.rows)
+        return np.log((1 + total) / (1 + self.doc_freq[features])) + 1
+
+    def similarities(self, weighted_terms):
+        """
+        Cosine similarity of the weighted terms with every row, an array
+        indexed by row number with zeros for unused rows. Unlike score()
+        features aren't idf weighted, so values stay within [0, 1].
+        """
+        features, weights = self.vectorize(weighted_terms)
+        with self._lock:
+            size = self._size
+            if not features or not size:
+                return np.zeros(size, dtype=np.float32)
+
+            query = np.zeros(self.dimensions, dtype=np.float32)
+            query[features] = weights
+            similarities = (self.weights[:size] * query[self.features[:size]]).sum(
+                axis=1
+            )
+            similarities[~self.live[:size]] = 0
+            return similarities
+
+    def score(self, weighted_terms, limit=10, exclude=()):
+        """
+        Return up to `limit` (doc_id, score) pairs best matching the
+        weighted terms, best first. The query is a dense idf weighted vector
+        over the hashed features, so scoring every row is a gather and a
+        row sum over the (rows x row_width) arrays.
+        """
+        features, weights = self.vectorize(weighted_terms)
+        if not features:
+            return []
+
+        with self._lock:
+            size = self._size
+            if not size:
+                return []
+
+            query = np.zeros(self.dimensions, dtype=np.float32)
+            query[features] = np.asarray(weights) * self.idf(features)
+
+            scores = (self.weights[:size] * query[self.features[:size]]).sum(axis=1)
+            scores[~self.live[:size]] = 0
+            for doc_id in exclude:
+                row = self.rows.get(doc_id)
+                if row is not None:
+                    scores[row] = 0
+
+            limit = min(limit, size)
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                (self.doc_ids[row], float(scores[row]))
+                for row in top
+                if scores[row] > 0
+            ]
+
+
+def skill_weight(total_yoe, last_used, current_year=None):
+    """
+    Weight of a profile skill: grows with the years of experience and
+    halves for every RECENCY_HALF_LIFE years since the year it was last used
+    """
+    current_year = current_year or date.today().year
+    try:
+        years_idle = max(current_year - int(last_used), 0) if last_used else 0
+        experience = max(int(total_yoe or 0), 0)
+    except (TypeError, ValueError):
+        years_idle, experience = 0, 0
+    return (1 + math.log1p(experience)) * 0.5 ** (
+        years_idle / JobRecommender.RECENCY_HALF_LIFE
+    )
+
+
+class JobRecommender(ProcessIndex):
+    """
+    Process wide HashedFeatureMatrix over the active jobs, rebuilt every
+    `JOB_RECOMMENDER_TTL` seconds.
+    """
+
+    ttl_setting = "JOB_RECOMMENDER_TTL"
+
+    FIELD_WEIGHTS = {"skills_required": 2, "job_role": 1}
+    PROFESSION_WEIGHT = 1
+    RECENCY_HALF_LIFE = 3
+
+    def job_terms(self, job):
+        from apps.jobs.models import Job
+
+        terms = Counter()
+        for field_name, weight in self.FIELD_WEIGHTS.items():
+            value = (
+                job[field_name] if isinstance(job, dict) else getattr(job, field_name)
+            )
+            if value == Job._meta.get_field(field_name).default:
+                continue
+            for token in tokenize(value):
+                terms[token] += weight
+        return {term: 1 + math.log(count) for term, count in terms.items()}
+
+    def profile_terms(self, profile):
+        """Weighted terms of a UserProfile's professional_skills and profession"""
+        terms = Counter()
+        skills = profile.professional_skills
+        for skill in skills if isinstance(skills, list) else []:
+            if not isinstance(skill, dict):
+                continue
+            weight = skill_weight(skill.get("total_yoe"), skill.get("last_used"))
+            for token in tokenize(skill.get("skill_name")):
+                terms[token] = max(terms[token], weight)
+        for token in tokenize(profile.profession):
+            terms[token] += self.PROFESSION_WEIGHT
+        return dict(terms)
+
+    def build(self):
+        from apps.jobs.models import Job
+
+        matrix = HashedFeatureMatrix()
+        jobs = Job.objects.active().values("job_id", *self.FIELD_WEIGHTS)
+        for job in jobs.iterator(chunk_size=2000):
+            matrix.add(job["job_id"], self.job_terms(job))
+        return matrix
+
+    def index_job(self, job):
+        if not self.tracking:
+            return
+        if job.is_active and not job.is_deleted:
+            terms = self.job_terms(job)
+            self.update(lambda matrix: matrix.add(job.job_id, terms))
+        else:
+            self.update(lambda matrix: matrix.remove(job.job_id))
+
+    def remove_jobs(self, job_ids):
+        def remove(matrix):
+            for job_id in job_ids:
+                matrix.remove(job_id)
+
+        self.update(remove)
+
+    def recommend(self, profile, limit=10, exclude=()):
+        """Return (job_id, score) pairs of the jobs best matching the profile"""
+        return self.get_index().score(self.profile_terms(profile), limit, exclude)
+
+
+job_recommender = JobRecommender()
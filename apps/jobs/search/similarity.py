@@ -0,0 +1,297 @@
+"""
+Similar and near-duplicate job detection with MinHash and LSH.
+
+A job's MinHash signature is the minimum of NUM_PERM universal hashes
+over the shingles (terms and term pairs) of its job_role, skills_required
+and about, the share of equal positions in two signatures estimates the
+Jaccard similarity of their shingle sets. Signatures are stored in
+tbl_job_signature as packed uint32s and are split into bands, jobs which
+agree on every row of any band land in the same LSH bucket, so candidate
+matches are found by lookup instead of comparing every pair of jobs.
+"""
+
+import threading
+import zlib
+from collections import defaultdict
+
+import numpy as np
+from django.db import connection
+
+from apps.jobs.search.base import ProcessIndex
+from apps.jobs.search.index import tokenize
+
+# Mersenne prime of the universal hashes, small enough that a * x + b
+# stays within uint64
+PRIME = (1 << 31) - 1
+
+SIGNATURE_DTYPE = np.dtype("<u4")
+
+
+def shingles(text):
+    tokens = tokenize(text)
+    return set(tokens) | {
+        f"{first} {second}" for first, second in zip(tokens, tokens[1:])
+    }
+
+
+class MinHasher:
+    def __init__(self, num_perm=128, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        """Return the uint32 signature of the shingles, None for an empty set"""
+        if not shingle_set:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) % PRIME for shingle in shingle_set),
+            dtype=np.uint64,
+            count=len(shingle_set),
+        )
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % PRIME
+        return permuted.min(axis=1).astype(SIGNATURE_DTYPE)
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class MinHashLSH:
+    """
+    Banded LSH index of signatures. With `bands` bands of `rows` rows, two
+    jobs of Jaccard similarity s share a bucket with probability
+    1 - (1 - s ** rows) ** bands, about 0.42 is where that crosses one half
+    for the defaults.
+    """
+
+    def __init__(self, bands=32, rows=4):
+        self.bands = bands
+        self.rows = rows
+        self.buckets = [defaultdict(set) for _ in range(bands)]
+        self.signatures = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.signatures
+
+    def band_keys(self, signature):
+        return [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, doc_id, signature):
+        with self._lock:
+            self._remove(doc_id)
+            self.signatures[doc_id] = signature
+            for band, key in enumerate(self.band_keys(signature)):
+                self.buckets[band][key].add(doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        signature = self.signatures.pop(doc_id, None)
+        if signature is None:
+            return
+        for band, key in enumerate(self.band_keys(signature)):
+            bucket = self.buckets[band][key]
+            bucket.discard(doc_id)
+            if not bucket:
+                del self.buckets[band][key]
+
+    def query(self, signature, threshold=0.0, limit=None, exclude=()):
+        """Return (doc_id, similarity) of the bucket mates of a signature, best first"""
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self.band_keys(signature)):
+                candidates.update(self.buckets[band].get(key, ()))
+            candidates.difference_update(exclude)
+            scored = [
+                (doc_id, similarity(signature, self.signatures[doc_id]))
+                for doc_id in candidates
+            ]
+
+        ranked = sorted(
+            (pair for pair in scored if pair[1] >= threshold),
+            key=lambda pair: (-pair[1], str(pair[0])),
+        )
+        return ranked[:limit] if limit else ranked
+
+    def similar_pairs(self, threshold):
+        """Yield (doc_id, doc_id, similarity) of bucket mates at or above threshold"""
+        with self._lock:
+            seen = set()
+            for buckets in self.buckets:
+                for bucket in buckets.values():
+                    members = sorted(bucket, key=str)
+                    for position, first in enumerate(members):
+                        for second in members[position + 1 :]:
+                            if (first, second) in seen:
+                                continue
+                            seen.add((first, second))
+                            score = similarity(
+                                self.signatures[first], self.signatures[second]
+                            )
+                            if score >= threshold:
+                                yield first, second, score
+
+
+class JobSimilarityIndex(ProcessIndex):
+    """
+    Process wide LSH index over the signatures of non-deleted jobs, rebuilt
+    every `JOB_SIMILARITY_INDEX_TTL` seconds. Building only reads
+    tbl_job_signature, jobs saved before it existed get their signature
+    from `backfill`, which the report_duplicate_jobs command runs.
+    """
+
+    ttl_setting = "JOB_SIMILARITY_INDEX_TTL"
+
+    FIELDS = ("job_role", "skills_required", "about")
+
+    def __init__(self):
+        super().__init__()
+        self.hasher = MinHasher()
+
+    def signature(self, job):
+        from apps.jobs.models import Job
+
+        text = []
+        for field_name in self.FIELDS:
+            value = (
+                job[field_name] if isinstance(job, dict) else getattr(job, field_name)
+            )
+            if value != Job._meta.get_field(field_name).default:
+                text.append(value)
+        return self.hasher.signature(shingles(" ".join(text)))
+
+    @staticmethod
+    def unpack(data):
+        return np.frombuffer(bytes(data), dtype=SIGNATURE_DTYPE)
+
+    def store(self, jobs):
+        """
+        Compute and save the signatures of the jobs whose text changed,
+        returns {job_id: signature or None}
+        """
+        from apps.jobs.models import JobSignature
+
+        signatures = {}
+        for job in jobs:
+            previous_values = job.previous_values()
+            current_values = job.current_values()
+            if previous_values and all(
+                previous_values.get(field_name, current_values.get(field_name))
+                == current_values.get(field_name)
+                for field_name in self.FIELDS
+            ):
+                continue
+            signatures[job.job_id] = self.signature(job)
+
+        empty = [
+            job_id for job_id, signature in signatures.items() if signature is None
+        ]
+        if empty:
+            JobSignature.objects.filter(job_id__in=empty).delete()
+        # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target, it is
+        # resolved on the unique job column by itself
+        conflict_target = {}
+        if connection.features.supports_update_conflicts_with_target:
+            conflict_target["unique_fields"] = ["job"]
+        JobSignature.objects.bulk_create(
+            [
+                JobSignature(job_id=job_id, signature=signature.tobytes())
+                for job_id, signature in signatures.items()
+                if signature is not None
+            ],
+            update_conflicts=True,
+            update_fields=["signature", "updated_at"],
+            **conflict_target,
+        )
+        return signatures
+
+    def backfill(self):
+        """Store the signatures of jobs which don't have one yet"""
+        from apps.jobs.models import Job, JobSignature
+
+        missing = Job.objects.filter(is_deleted=False, signature__isnull=True).values(
+            "job_id", *self.FIELDS
+        )
+        batch = []
+        for job in missing.iterator(chunk_size=2000):
+            signature = self.signature(job)
+            if signature is not None:
+                batch.append(
+                    JobSignature(job_id=job["job_id"], signature=signature.tobytes())
+                )
+            if len(batch) >= 2000:
+                JobSignature.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        JobSignature.objects.bulk_create(batch, ignore_conflicts=True)
+
+    def build(self):
+        from apps.jobs.models import JobSignature
+
+        lsh = MinHashLSH()
+        rows = JobSignature.objects.filter(job__is_deleted=False).values_list(
+            "job_id", "signature"
+        )
+        for job_id, data in rows.iterator(chunk_size=2000):
+            lsh.add(job_id, self.unpack(data))
+        return lsh
+
+    def index_job(self, job, signature):
+        if job.is_deleted or signature is None:
+            self.update(lambda lsh: lsh.remove(job.job_id))
+        else:
+            self.update(lambda lsh: lsh.add(job.job_id, signature))
+
+    def remove_jobs(self, job_ids):
+        def remove(lsh):
+            for job_id in job_ids:
+                lsh.remove(job_id)
+
+        self.update(remove)
+
+    def similar(self, job_id, threshold=0.0, limit=None):
+        """Return (job_id, similarity) of the jobs most similar to a job"""
+        lsh = self.get_index()
+        signature = lsh.signatures.get(job_id)
+        if signature is None:
+            return []
+        return lsh.query(signature, threshold, limit, exclude={job_id})
+
+    def duplicate_groups(self, threshold):
+        """
+        Group the jobs which are at least `threshold` similar to another
+        job of the group, returns a list of {job_id: best similarity}
+        """
+        parent = {}
+
+        def find(job_id):
+            parent.setdefault(job_id, job_id)
+            while parent[job_id] != job_id:
+                parent[job_id] = parent[parent[job_id]]
+                job_id = parent[job_id]
+            return job_id
+
+        best = defaultdict(float)
+        for first, second, score in self.get_index().similar_pairs(threshold):
+            parent[find(first)] = find(second)
+            best[first] = max(best[first], score)
+            best[second] = max(best[second], score)
+
+        groups = defaultdict(dict)
+        for job_id in parent:
+            groups[find(job_id)][job_id] = best[job_id]
+        return list(groups.values())
+
+
+job_similarity = JobSimilarityIndex()
@@ -0,0 +1,247 @@
+"""
+Trending search keywords computed from the `search` terms of /jobs/.
+
+Recording a term only appends it to an in-process buffer. The buffer is
+drained into a Space-Saving sketch by a background thread whenever it
+fills up, and before every flush or read. The sketch keeps the heavy
+hitters of the current flush interval in a fixed number of counters and
+is periodically merged into tbl_trending_keyword from a background
+thread. Scores decay exponentially with the configured half life so old
+searches fade out.
+"""
+
+import heapq
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+
+def normalize_keyword(term, max_length=100):
+    if not term:
+        return ""
+    return " ".join(str(term).lower().split())[:max_length]
+
+
+class DecayedSpaceSaving:
+    """
+    Space-Saving heavy hitters sketch with forward exponential decay.
+
+    At most `capacity` items are tracked. When a new item arrives and the
+    sketch is full it takes over the smallest counter, inheriting its weight
+    as an overestimate. Weights are stored relative to a landmark time so
+    decaying them costs nothing until they are read.
+
+    The smallest counter is found through a min-heap of (weight, item)
+    holding one entry per counter. Counters only grow, so an entry is
+    refreshed lazily when it reaches the top with an outdated weight,
+    which keeps both offers and evictions O(log capacity).
+    """
+
+    def __init__(self, capacity, decay_rate, landmark=None):
+        self.capacity = capacity
+        self.decay_rate = decay_rate
+        self.landmark = time.time() if landmark is None else landmark
+        self.counters = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self.counters)
+
+    def offer(self, item, at, weight=1.0):
+        weight *= math.exp(self.decay_rate * (at - self.landmark))
+        if item in self.counters:
+            self.counters[item] += weight
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = weight
+            heapq.heappush(self._heap, (weight, item))
+        else:
+            while True:
+                smallest, victim = self._heap[0]
+                current = self.counters[victim]
+                if current == smallest:
+                    break
+                heapq.heapreplace(self._heap, (current, victim))
+
+            weight += self.counters.pop(victim)
+            self.counters[item] = weight
+            heapq.heapreplace(self._heap, (weight, item))
+
+    def items(self, at):
+        """Return (item, weight decayed to `at`) pairs by descending weight"""
+        scale = math.exp(-self.decay_rate * (at - self.landmark))
+        return sorted(
+            ((item, weight * scale) for item, weight in self.counters.items()),
+            key=lambda pair: pair[1],
+            reverse=True,
+        )
+
+
+class TrendingKeywords:
+    """Process wide recorder and reader of trending search keywords"""
+
+    def __init__(self, buffer_size=10000, sketch_capacity=500, max_stored=1000):
+        self.buffer_size = buffer_size
+        self.sketch_capacity = sketch_capacity
+        self.max_stored = max_stored
+
+        # drained into the bounded sketch when it holds buffer_size terms,
+        # so no recorded term is lost however fast searches come in
+        self._buffer = deque()
+        self._draining = threading.Lock()
+        self._drainer = None
+        self._sketch = None
+        self._last_flush = time.monotonic()
+        self._flushing = threading.Lock()
+        self._sketch_lock = threading.Lock()
+        self._stored = None
+        self._stored_at = 0
+
+    @property
+    def half_life(self):
+        return getattr(settings, "TRENDING_KEYWORDS_HALF_LIFE", 24 * 60 * 60)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, "TRENDING_KEYWORDS_FLUSH_INTERVAL", 300)
+
+    @property
+    def decay_rate(self):
+        return math.log(2) / self.half_life
+
+    def record(self, term):
+        keyword = normalize_keyword(term)
+        if not keyword:
+            return
+
+        self._buffer.append((keyword, time.time()))
+        if len(self._buffer) >= self.buffer_size and self._draining.acquire(
+            blocking=False
+        ):
+            self._drainer = threading.Thread(
+                target=self._drain_in_background, daemon=True
+            )
+            self._drainer.start()
+        if (
+            time.monotonic() - self._last_flush > self.flush_interval
+            and not self._flushing.locked()
+        ):
+            self._last_flush = time.monotonic()
+            threading.Thread(target=self._flush_in_background, daemon=True).start()
+
+    def drain(self):
+        """Move the buffered terms into the sketch of the current interval"""
+        with self._sketch_lock:
+            if self._sketch is None:
+                self._sketch = DecayedSpaceSaving(self.sketch_capacity, self.decay_rate)
+            while self._buffer:
+                keyword, at = self._buffer.popleft()
+                self._sketch.offer(keyword, at)
+
+    def _drain_in_background(self):
+        try:
+            self.drain()
+        finally:
+            self._draining.release()
+
+    def _flush_in_background(self):
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Merge the heavy hitters of the current interval into the table"""
+        from apps.jobs.models import TrendingKeyword
+
+        with self._flushing:
+            self.drain()
+            with self._sketch_lock:
+                sketch, self._sketch = self._sketch, None
+
+            now = time.time()
+            pending = dict(sketch.items(now)) if sketch is not None else {}
+            if not pending:
+                return
+
+            updated_at = datetime.fromtimestamp(now, tz=timezone.utc)
+            with transaction.atomic():
+                stored = {
+                    row.keyword: row
+                    for row in TrendingKeyword.objects.select_for_update().filter(
+                        keyword__in=pending
+                    )
+                }
+                for keyword, weight in pending.items():
+                    row = stored.get(keyword)
+                    if row is None:
+                        TrendingKeyword.objects.create(
+                            keyword=keyword, score=weight, updated_at=updated_at
+                        )
+                    else:
+                        row.score = self.decayed(row, now) + weight
+                        row.updated_at = updated_at
+                        row.save(update_fields=["score", "updated_at"])
+
+            self.prune(now)
+            self._stored = None
+
+    def decayed(self, row, now):
+        return row.score * math.exp(
+            -self.decay_rate * (now - row.updated_at.timestamp())
+        )
+
+    def prune(self, now):
+        """Keep only the `max_stored` highest scoring keywords in the table"""
+        from apps.jobs.models import TrendingKeyword
+
+        rows = list(TrendingKeyword.objects.all())
+        if len(rows) <= self.max_stored:
+            return
+        rows.sort(key=lambda row: self.decayed(row, now), reverse=True)
+        TrendingKeyword.objects.filter(
+            keyword__in=[row.keyword for row in rows[self.max_stored :]]
+        ).delete()
+
+    def stored_scores(self, now):
+        """Decayed scores of the table, re-read at most once per flush interval"""
+        from apps.jobs.models import TrendingKeyword
+
+        if (
+            self._stored is None
+            or time.monotonic() - self._stored_at > self.flush_interval
+        ):
+            self._stored = list(TrendingKeyword.objects.all())
+            self._stored_at = time.monotonic()
+        return {row.keyword: self.decayed(row, now) for row in self._stored}
+
+    def top(self, k=10):
+        """Return the k keywords with the highest decayed score"""
+        now = time.time()
+        self.drain()
+
+        scores = self.stored_scores(now)
+        with self._sketch_lock:
+            pending = self._sketch.items(now) if self._sketch is not None else []
+        for keyword, weight in pending:
+            scores[keyword] = scores.get(keyword, 0) + weight
+
+        return [
+            keyword
+            for keyword, _ in sorted(
+                scores.items(), key=lambda pair: pair[1], reverse=True
+            )[:k]
+        ]
+
+    def reset(self):
+        self._buffer.clear()
+        self._sketch = None
+        self._stored = None
+
+
+trending_keywords = TrendingKeywords()
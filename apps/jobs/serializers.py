@@ -2,14 +2,25 @@ from re import findall
 
 from rest_framework import serializers
 
+from apps.applicants.constants import STATUS_CHOICES
 from apps.jobs.models import Company, ContactMessage, Job
+from apps.utils.fieldsets import SparseFieldsetMixin
 
+JOB_DESCRIPTION_FIELDS = (
+    "about",
+    "job_responsibilities",
+    "skills_required",
+    "education_or_certifications",
+)
 
-class JobSerializer(serializers.ModelSerializer):
+
+class JobSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Job object serializer class"""
 
+    # the large text fields are rendered together as "description"
+    fieldset_groups = {"description": JOB_DESCRIPTION_FIELDS}
+
     total_applicants = serializers.IntegerField(read_only=True)
-    has_applied = serializers.BooleanField(read_only=True)
 
     class Meta:
         """
@@ -34,7 +45,7 @@ class JobSerializer(serializers.ModelSerializer):
 
         data = super().to_representation(instance)
 
-        if data:
+        if data and any(field in data for field in JOB_DESCRIPTION_FIELDS):
             try:
                 # Combine fields
                 data.update(
@@ -55,9 +66,69 @@ class JobSerializer(serializers.ModelSerializer):
             except Exception:
                 data = {"error": {"message": "Something Went Wrong"}}
 
+        # the view resolves the applications of job seekers for the whole
+        # page at once and hands the job ids over through the context
+        applied_job_ids = self.context.get("applied_job_ids")
+        if applied_job_ids is not None:
+            data["has_applied"] = instance.job_id in applied_job_ids
+
+        # per status applicant counts of the employer dashboard, read from
+        # the JobStatusCount rollup for the whole page by the view
+        status_counts = self.context.get("status_counts")
+        if status_counts is not None:
+            data["applicants_by_status"] = {
+                job_status: status_counts.get(instance.job_id, {}).get(job_status, 0)
+                for job_status, _ in STATUS_CHOICES
+            }
+
         return data
 
 
+class JobBulkItemSerializer(serializers.ModelSerializer):
+    """
+    One job of a bulk posting, an item with a job_id updates that job.
+    New jobs are published unless the item sets is_active to false.
+    """
+
+    job_id = serializers.UUIDField(required=False)
+    # Job.is_active is not editable, bulk posting sets it explicitly
+    is_active = serializers.BooleanField(required=False)
+
+    class Meta:
+        model = Job
+        fields = [
+            "job_id",
+            "job_role",
+            "location",
+            "experience",
+            "job_type",
+            "vacancy_position",
+            "industry",
+            "category",
+            "is_active",
+            "is_featured",
+            "job_responsibilities",
+            "skills_required",
+            "education_or_certifications",
+            "about",
+        ]
+
+
+class JobBulkResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=["created", "updated", "error"])
+    job_id = serializers.UUIDField(required=False)
+    slug = serializers.SlugField(required=False)
+    errors = serializers.DictField(required=False)
+
+
+class JobBulkResponseSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    updated = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    results = JobBulkResultSerializer(many=True)
+
+
 class CompanySerializer(serializers.ModelSerializer):
     """Company object serializer class"""
 
@@ -66,6 +137,12 @@ class CompanySerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class CompanyListSerializer(CompanySerializer):
+    """Company with the number of its active jobs, annotated by the listing"""
+
+    active_jobs = serializers.IntegerField(read_only=True)
+
+
 class ContactUsSerializer(serializers.ModelSerializer):
     """Contact us object serializer class"""
 
@@ -86,6 +163,11 @@ class JobsCountByCategoriesSerializer(serializers.Serializer):
     count = serializers.CharField()
 
 
+class JobsCountByJobTypesSerializer(serializers.Serializer):
+    job_type = serializers.CharField()
+    count = serializers.CharField()
+
+
 class CompanyStatsResponseSerializer(serializers.Serializer):
     job_count = serializers.IntegerField()
     applications_count = serializers.IntegerField()
@@ -0,0 +1,143 @@
+"""
+Signal handlers keeping the derived job data (search index,
+recommendations, similarity signatures, autocomplete, cached responses,
+facet rollups) in sync with tbl_job and tbl_company. Writes which don't
+fire post_save send their own signals instead: bulk_create/bulk_update
+send `jobs_saved` and the soft delete in `JobViewSets.destroy` sends
+`jobs_deleted` with the affected jobs as loaded before the write.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from apps.jobs.cache import company_response_cache, job_response_cache
+from apps.jobs.models import Company, Job
+from apps.jobs.rollups import JobFacetCounts
+from apps.jobs.search import (
+    company_autocomplete,
+    job_index,
+    job_recommender,
+    job_similarity,
+)
+
+# sent with `jobs` after they are written with bulk_create or bulk_update
+jobs_saved = Signal()
+
+# sent with `jobs` after they are soft deleted through a queryset update
+jobs_deleted = Signal()
+
+
+def counts_as_active(values):
+    return (
+        bool(values) and bool(values.get("is_active")) and not values.get("is_deleted")
+    )
+
+
+def active_job_changes(job, previous_values, current_values):
+    """(company_id, job_role, delta) for the autocomplete weights of a job"""
+    if previous_values:
+        previous_values = {**current_values, **previous_values}
+
+    changes = []
+    for values, delta in ((previous_values, -1), (current_values, 1)):
+        if counts_as_active(values):
+            changes.append((values.get("company_id"), values.get("job_role"), delta))
+    if len(changes) == 2 and changes[0][:2] == changes[1][:2]:
+        return []
+    return changes
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, **kwargs):
+    job_bulk_saved(sender, [instance])
+
+
+@receiver(jobs_saved, sender=Job)
+def job_bulk_saved(sender, jobs, **kwargs):
+    deltas = Counter()
+    for job in jobs:
+        deltas.update(
+            JobFacetCounts.changes(job.previous_values(), job.current_values())
+        )
+    JobFacetCounts.apply(deltas)
+    signatures = job_similarity.store(jobs)
+
+    def update_index():
+        for job in jobs:
+            job_index.index_job(job)
+            job_recommender.index_job(job)
+            if job.job_id in signatures:
+                job_similarity.index_job(job, signatures[job.job_id])
+            elif job.is_deleted:
+                job_similarity.remove_jobs([job.job_id])
+
+    transaction.on_commit(update_index)
+    transaction.on_commit(job_response_cache.bump)
+    if any(
+        counts_as_active(job.previous_values())
+        != counts_as_active(job.current_values())
+        for job in jobs
+    ):
+        transaction.on_commit(company_response_cache.bump)
+
+    changes = [
+        change
+        for job in jobs
+        for change in active_job_changes(
+            job, job.previous_values(), job.current_values()
+        )
+    ]
+    if changes:
+        transaction.on_commit(lambda: company_autocomplete.jobs_changed(changes))
+
+
+@receiver(jobs_deleted, sender=Job)
+def job_soft_deleted(sender, jobs, **kwargs):
+    deltas = Counter()
+    for job in jobs:
+        deltas.subtract(JobFacetCounts.contribution(job.previous_values()))
+    JobFacetCounts.apply(deltas)
+
+    job_ids = [job.job_id for job in jobs]
+    transaction.on_commit(lambda: job_index.remove_jobs(job_ids))
+    transaction.on_commit(lambda: job_recommender.remove_jobs(job_ids))
+    transaction.on_commit(lambda: job_similarity.remove_jobs(job_ids))
+    transaction.on_commit(job_response_cache.bump)
+    if any(counts_as_active(job.previous_values()) for job in jobs):
+        transaction.on_commit(company_response_cache.bump)
+
+    changes = [
+        change
+        for job in jobs
+        for change in active_job_changes(job, job.previous_values(), {})
+    ]
+    if changes:
+        transaction.on_commit(lambda: company_autocomplete.jobs_changed(changes))
+
+
+@receiver(post_save, sender=Company)
+def company_saved(sender, instance, **kwargs):
+    transaction.on_commit(company_response_cache.bump)
+    transaction.on_commit(lambda: company_autocomplete.index_company(instance))
+
+
+@receiver(post_delete, sender=Company)
+def company_deleted(sender, instance, **kwargs):
+    transaction.on_commit(company_response_cache.bump)
+    transaction.on_commit(
+        lambda: company_autocomplete.remove_company(instance.company_id)
+    )
+
+
+@receiver(request_started)
+def warm_indexes(sender, **kwargs):
+    """Start building the job indexes when the worker gets its first request"""
+    request_started.disconnect(warm_indexes)
+    if settings.JOB_INDEXES_WARM_UP:
+        for index in (job_index, job_recommender, job_similarity, company_autocomplete):
+            index.warm()
@@ -1,13 +1,47 @@
+import threading
+import time
 import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import AccessToken
 
+from apps.applicants.models import Applicants, ArchivedApplicant, JobStatusCount
 from apps.jobs.models import User
+from apps.userprofile.models import UserProfile
 
-from .models import Company, Job
+from .constants import values
+from .models import (
+    ArchiveCheckpoint,
+    ArchivedJob,
+    Company,
+    Job,
+    JobSignature,
+    TrendingKeyword,
+)
+from .rollups import JobFacetCounts
+from .search import (
+    DecayedSpaceSaving,
+    HashedFeatureMatrix,
+    InvertedIndex,
+    JobSearchFilter,
+    PrefixIndex,
+    TrendingKeywords,
+    company_autocomplete,
+    job_index,
+    job_recommender,
+    job_similarity,
+)
+from .search.base import ProcessIndex
 
 # Create your tests here.
 
@@ -58,3 +92,961 @@ class JobViewSetsTestCase(TestCase):
         # dummy token
         self.access_token = ""
         self.client.credentials(HTTP_ACCESSTOKEN=self.access_token)
+
+
+def create_employer_with_company(email="employer@testing.com"):
+    """Create an employer user along with the company they are hiring for"""
+    employer = User.objects.create_user(
+        email=email, name="Testing Employer", user_type="Employer"
+    )
+    company = Company.objects.create(
+        creator=employer,
+        name="Testing name",
+        location="Testing Location",
+        about="Testing about",
+        founded_year=2011,
+    )
+    return employer, company
+
+
+def create_job(employer, company, **kwargs):
+    job_data = {
+        "job_role": "Data Scientist",
+        "location": "New York, NY",
+        "job_type": "part time",
+        "vacancy_position": 2,
+        "industry": "Data Science",
+        "category": "Analytics",
+    }
+    job_data.update(kwargs)
+    return Job.objects.create(company=company, employer=employer, **job_data)
+
+
+class JobCursorPaginationTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        self.jobs = [
+            create_job(self.employer, self.company, job_role=f"Role {i}")
+            for i in range(5)
+        ]
+        cache.clear()
+        self.client = APIClient()
+
+    def test_walks_all_pages_in_created_order(self):
+        expected = [
+            str(job.job_id)
+            for job in sorted(
+                self.jobs, key=lambda job: (job.created_at, job.job_id), reverse=True
+            )
+        ]
+
+        seen = []
+        url = "/jobs/?pagination=cursor&limit=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            seen.extend(job["job_id"] for job in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_prior_page(self):
+        first = self.client.get("/jobs/?pagination=cursor&limit=2")
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+
+    def test_rejects_unsupported_ordering(self):
+        response = self.client.get("/jobs/?pagination=cursor&ordering=job_role")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class InvertedIndexTestCase(TestCase):
+    def setUp(self):
+        self.index = InvertedIndex({"job_role": 3, "about": 1})
+        self.index.add(1, {"job_role": "Security Engineer", "about": "Web security"})
+        self.index.add(
+            2, {"job_role": "Software Developer", "about": "Security minded"}
+        )
+        self.index.add(3, {"job_role": "Sales Executive", "about": "Handling sales"})
+
+    def test_ranks_field_weighted_matches_first(self):
+        self.assertEqual([doc for doc, _ in self.index.search("security")], [1, 2])
+
+    def test_all_terms_must_match_as_prefixes(self):
+        self.assertEqual([doc for doc, _ in self.index.search("dev secur")], [2])
+        self.assertEqual(self.index.search("dev sales"), [])
+
+    def test_remove_and_reindex(self):
+        self.index.remove(1)
+        self.assertEqual([doc for doc, _ in self.index.search("security")], [2])
+
+        self.index.add(2, {"job_role": "Sales Manager"})
+        self.assertEqual(self.index.search("security"), [])
+        self.assertEqual(len(self.index), 2)
+
+    def test_conditions_filter_on_attributes(self):
+        self.index.add(1, {"job_role": "Security Engineer"}, {"experience": 5})
+        self.index.add(2, {"job_role": "Security Analyst"}, {"experience": 1})
+
+        def search(*conditions):
+            return [
+                doc for doc, _ in self.index.search("security", conditions=conditions)
+            ]
+
+        self.assertEqual(search(("experience", "gte", 2)), [1])
+        self.assertEqual(search(("experience", "in", [1, 2])), [2])
+        self.assertEqual(search(("experience", "exact", 3)), [])
+
+
+class ProcessIndexTestCase(SimpleTestCase):
+    class Builds(ProcessIndex):
+        ttl_setting = "JOB_SEARCH_INDEX_TTL"
+
+        def __init__(self):
+            super().__init__()
+            self.builds = 0
+            self.release = threading.Event()
+            self.release.set()
+
+        def build(self):
+            self.release.wait(5)
+            self.builds += 1
+            return [self.builds]
+
+    def test_stale_index_is_served_while_rebuilding(self):
+        index = self.Builds()
+        first = index.get_index()
+        self.assertEqual(first, [1])
+
+        index.release.clear()
+        index._built_at -= index.ttl + 1
+        self.assertIs(index.get_index(), first)
+        # a write during the rebuild reaches the current and the next index
+        index.update(lambda built: built.append("written"))
+        self.assertIs(index.get_index(), first)
+
+        index.release.set()
+        index._thread.join(5)
+        self.assertEqual(first, [1, "written"])
+        self.assertEqual(index.get_index(), [2, "written"])
+        self.assertEqual(index.builds, 2)
+
+
+class JobSearchTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        self.pentester = create_job(
+            self.employer,
+            self.company,
+            job_role="Pentester",
+            skills_required="Burp, Python",
+        )
+        self.analyst = create_job(self.employer, self.company, job_role="SOC Analyst")
+        job_index.clear()
+        cache.clear()
+        self.client = APIClient()
+
+    def tearDown(self):
+        job_index.clear()
+
+    def test_search_matches_skills(self):
+        response = self.client.get("/jobs/?search=python")
+        self.assertEqual(
+            [job["job_id"] for job in response.data["results"]],
+            [str(self.pentester.job_id)],
+        )
+
+    def test_index_follows_saves(self):
+        job_index.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.analyst.skills_required = "Splunk, Python"
+            self.analyst.save()
+
+        response = self.client.get("/jobs/?search=python")
+        self.assertEqual(response.data["count"], 2)
+
+    def test_filters_and_pages_see_every_match(self):
+        for number in range(4):
+            create_job(
+                self.employer,
+                self.company,
+                job_role=f"Python Developer {number}",
+                job_type="full time",
+            )
+
+        job_index.get_index()
+        # filters and count are answered by the index, SQL only reads the page
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/jobs/?search=python&job_type=full time&limit=3"
+            )
+        self.assertEqual(response.data["count"], 4)
+        first_page = [job["job_id"] for job in response.data["results"]]
+
+        response = self.client.get(
+            "/jobs/?search=python&job_type=full time&limit=3&offset=3"
+        )
+        last_page = [job["job_id"] for job in response.data["results"]]
+
+        self.assertEqual(len(first_page), 3)
+        self.assertEqual(len(last_page), 1)
+        self.assertNotIn(last_page[0], first_page)
+        self.assertNotIn(str(self.pentester.job_id), first_page + last_page)
+
+
+class JobHasAppliedTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        self.applied_job = create_job(self.employer, self.company, job_role="Applied")
+        self.other_job = create_job(self.employer, self.company, job_role="Other")
+
+        self.seeker = User.objects.create_user(
+            email="seeker@testing.com", name="Testing Seeker", user_type="Job Seeker"
+        )
+        profile = UserProfile.objects.create(user=self.seeker)
+        Applicants.objects.create(job=self.applied_job, user=profile)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def test_has_applied_is_resolved_per_page(self):
+        response = self.client.get("/jobs/")
+        has_applied = {
+            job["job_id"]: job["has_applied"] for job in response.data["results"]
+        }
+
+        self.assertEqual(
+            has_applied,
+            {str(self.applied_job.job_id): True, str(self.other_job.job_id): False},
+        )
+
+    def test_anonymous_listing_has_no_has_applied(self):
+        cache.clear()
+        response = APIClient().get("/jobs/")
+        self.assertNotIn("has_applied", response.data["results"][0])
+
+
+class JobResponseCacheTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        self.job = create_job(self.employer, self.company)
+        cache.clear()
+        self.client = APIClient()
+
+    def test_anonymous_list_is_served_from_cache(self):
+        first = self.client.get("/jobs/?limit=5&category=Analytics")
+        with self.assertNumQueries(0):
+            second = self.client.get("/jobs/?category=Analytics&limit=5")
+        self.assertEqual(first.data, second.data)
+
+    def test_job_write_invalidates_cache(self):
+        self.client.get("/jobs/")
+        with self.captureOnCommitCallbacks(execute=True):
+            create_job(self.employer, self.company, job_role="Second role")
+
+        response = self.client.get("/jobs/")
+        self.assertEqual(response.data["count"], 2)
+
+
+class JobFacetCountsTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        self.job = create_job(self.employer, self.company, category="Security")
+        cache.clear()
+
+    def activate(self, job):
+        job.is_active = True
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+
+    def test_counts_follow_job_writes(self):
+        self.activate(self.job)
+        other = Job.objects.get(job_id=create_job(self.employer, self.company).job_id)
+        self.activate(other)
+
+        response = APIClient().get("/jobs/get_count_by_categories/")
+        self.assertEqual(
+            {row["category"]: row["count"] for row in response.data},
+            {"Security": "1", "Analytics": "1"},
+        )
+
+        other.category = "Security"
+        with self.captureOnCommitCallbacks(execute=True):
+            other.save()
+        self.assertEqual(JobFacetCounts.counts("category"), {"Security": 2})
+        self.assertEqual(JobFacetCounts.counts("job_type"), {"part time": 2})
+
+    def test_inactive_jobs_are_not_counted(self):
+        self.assertEqual(JobFacetCounts.counts("category"), {})
+
+    def test_rebuild_command_checks_live_aggregate(self):
+        Job.objects.filter(job_id=self.job.job_id).update(is_active=True)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_job_facet_counts", "--check", stdout=StringIO())
+
+        call_command("rebuild_job_facet_counts", stdout=StringIO())
+        call_command("rebuild_job_facet_counts", "--check", stdout=StringIO())
+        self.assertEqual(JobFacetCounts.counts("category"), {"Security": 1})
+
+
+class TrendingKeywordsTestCase(TestCase):
+    def setUp(self):
+        self.trending = TrendingKeywords(sketch_capacity=3)
+
+    def test_sketch_memory_is_bounded(self):
+        sketch = DecayedSpaceSaving(capacity=3, decay_rate=0.0, landmark=0)
+        for i in range(100):
+            sketch.offer("python", at=i)
+            sketch.offer(f"rare {i}", at=i)
+
+        self.assertEqual(len(sketch), 3)
+        self.assertEqual(len(sketch._heap), 3)
+        self.assertEqual(sketch.items(at=100)[0], ("python", 100.0))
+
+    def test_full_buffer_is_drained_into_the_sketch(self):
+        trending = TrendingKeywords(buffer_size=4, sketch_capacity=3)
+        for _ in range(10):
+            trending.record("python")
+        trending.record("go")
+
+        # the request only starts the drain, a thread does the work
+        trending._drainer.join(5)
+        self.assertLess(len(trending._buffer), 4)
+        trending.drain()
+        self.assertAlmostEqual(
+            dict(trending._sketch.items(time.time()))["python"], 10, places=2
+        )
+
+    def test_flush_persists_heavy_hitters(self):
+        for term in [
+            "Python",
+            "soc analyst",
+            "python ",
+            "SOC  analyst",
+            "python",
+            "Go",
+        ]:
+            self.trending.record(term)
+        self.trending.flush()
+
+        self.assertAlmostEqual(
+            TrendingKeyword.objects.get(keyword="python").score, 3, places=2
+        )
+        self.trending.reset()
+        self.assertEqual(self.trending.top(2), ["python", "soc analyst"])
+
+    def test_endpoint_serves_recorded_searches_first(self):
+        cache.clear()
+        client = APIClient()
+        with patch("apps.jobs.views.trending_keywords", self.trending):
+            client.get("/jobs/?search=malware")
+            client.get("/jobs/?search=malware&offset=10")
+            response = client.get("/jobs/get_trending_keywords/")
+
+        keywords = response.data["data"]["trending_keywords"]
+        self.assertEqual(keywords[0], "malware")
+        self.assertEqual(len(keywords), len(values.trending_keywords))
+
+
+class JobBulkPostingTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        self.employer.is_profile_completed = True
+        self.employer.save()
+        self.existing = create_job(self.employer, self.company)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def job_item(self, **kwargs):
+        item = {
+            "job_role": "Pentester",
+            "location": "Remote",
+            "job_type": "full time",
+            "vacancy_position": 1,
+            "industry": "Security",
+        }
+        item.update(kwargs)
+        return item
+
+    def test_requires_an_authenticated_employer(self):
+        response = APIClient().post("/jobs/bulk/", [self.job_item()], format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        seeker = User.objects.create_user(
+            email="seeker@testing.com", name="Testing Seeker", user_type="Job Seeker"
+        )
+        client = APIClient()
+        client.force_authenticate(seeker)
+        response = client.post("/jobs/bulk/", [self.job_item()], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_creates_updates_and_reports_errors(self):
+        payload = [
+            self.job_item(),
+            self.job_item(job_type="forever"),
+            self.job_item(
+                job_id=str(self.existing.job_id), job_role="Lead Data Scientist"
+            ),
+            self.job_item(job_id=str(uuid.uuid4())),
+        ]
+        response = self.client.post("/jobs/bulk/", payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["created", "error", "updated", "error"],
+        )
+        self.assertIn("job_type", response.data["results"][1]["errors"])
+
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.job_role, "Lead Data Scientist")
+        created = Job.objects.get(job_id=response.data["results"][0]["job_id"])
+        self.assertEqual(created.company, self.company)
+        self.assertTrue(created.slug)
+        self.assertTrue(created.is_active)
+
+    def test_is_active_can_be_set(self):
+        payload = [
+            self.job_item(is_active=False),
+            self.job_item(job_id=str(self.existing.job_id), is_active=True),
+        ]
+        response = self.client.post("/jobs/bulk/", payload, format="json")
+
+        created = Job.objects.get(job_id=response.data["results"][0]["job_id"])
+        self.assertFalse(created.is_active)
+        self.existing.refresh_from_db()
+        self.assertTrue(self.existing.is_active)
+
+    def test_repeated_job_ids_are_rejected(self):
+        job_id = str(self.existing.job_id)
+        payload = [
+            self.job_item(job_id=job_id, job_role="First"),
+            self.job_item(job_id=job_id, job_role="Second"),
+        ]
+        response = self.client.post("/jobs/bulk/", payload, format="json")
+
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["error", "error"],
+        )
+        self.assertIn("job_id", response.data["results"][0]["errors"])
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.job_role, "Data Scientist")
+
+    def test_query_count_does_not_grow_with_batch(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/jobs/bulk/", [self.job_item() for _ in range(50)], format="json"
+            )
+        self.assertEqual(response.data["created"], 50)
+        # the new jobs are active, the facet counters take one write per
+        # distinct value on top of the inserts
+        self.assertLess(len(queries), 20)
+
+
+class JobSparseFieldsetsTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        create_job(self.employer, self.company, about="Long description")
+        cache.clear()
+        self.client = APIClient()
+
+    def test_omitted_description_is_not_read(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/jobs/?omit=description")
+
+        job = response.data["results"][0]
+        self.assertNotIn("description", job)
+        self.assertIn("job_role", job)
+        self.assertFalse(any('"about"' in query["sql"] for query in queries))
+
+    def test_fields_limits_response(self):
+        response = self.client.get("/jobs/?fields=job_role,slug")
+        self.assertEqual(set(response.data["results"][0]), {"job_role", "slug"})
+
+    def test_description_is_kept_as_a_whole(self):
+        response = self.client.get("/jobs/?fields=job_role,description&omit=about")
+        job = response.data["results"][0]
+        self.assertEqual(set(job), {"job_role", "description"})
+        self.assertEqual(job["description"]["about"], "Long description")
+
+
+class JobFacetsTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        create_job(self.employer, self.company, experience=0, skills_required="Python")
+        create_job(self.employer, self.company, experience=3, job_type="full time")
+        create_job(
+            self.employer,
+            self.company,
+            experience=12,
+            category="Security",
+            is_featured=True,
+        )
+        job_index.clear()
+        cache.clear()
+        self.client = APIClient()
+
+    def test_facets_follow_filters_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/jobs/?facets=true&category=Analytics")
+        # page, count and the single facet aggregation
+        self.assertEqual(len(queries), 3)
+
+        facets = response.data["facets"]
+        self.assertEqual(facets["category"], [{"value": "Analytics", "count": 2}])
+        self.assertEqual(
+            facets["experience"],
+            [{"value": "0-1", "count": 1}, {"value": "2-4", "count": 1}],
+        )
+        self.assertEqual(facets["is_featured"], [{"value": False, "count": 2}])
+
+    def test_facets_follow_search(self):
+        with patch.object(
+            JobSearchFilter,
+            "filter_queryset",
+            autospec=True,
+            side_effect=JobSearchFilter.filter_queryset,
+        ) as search_filter:
+            response = self.client.get("/jobs/?facets=true&search=python")
+
+        self.assertEqual(
+            response.data["facets"]["job_type"], [{"value": "part time", "count": 1}]
+        )
+        # the page and the facets share one pass of the filter backends
+        self.assertEqual(search_filter.call_count, 1)
+
+    def test_facets_are_opt_in(self):
+        self.assertNotIn("facets", self.client.get("/jobs/").data)
+
+
+class HashedFeatureMatrixTestCase(TestCase):
+    def test_rows_are_recycled_and_doc_freq_kept(self):
+        matrix = HashedFeatureMatrix(dimensions=2**10, row_width=4, capacity=1)
+        matrix.add("a", {"python": 2, "django": 1})
+        matrix.add("b", {"java": 1})
+        self.assertEqual(len(matrix), 2)
+
+        matrix.remove("a")
+        matrix.add("c", {"python": 1})
+        self.assertEqual(matrix.rows["c"], 0)
+        self.assertEqual(int(matrix.doc_freq.sum()), 2)
+
+        self.assertEqual([doc_id for doc_id, _ in matrix.score({"python": 1})], ["c"])
+
+
+class JobRecommendationsTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        self.python_job = create_job(
+            self.employer,
+            self.company,
+            is_active=True,
+            job_role="Backend Developer",
+            skills_required="Python, Django, SQL",
+        )
+        self.java_job = create_job(
+            self.employer,
+            self.company,
+            is_active=True,
+            job_role="Backend Developer",
+            skills_required="Java, Spring, SQL",
+        )
+        self.inactive_job = create_job(
+            self.employer, self.company, skills_required="Python, Django"
+        )
+
+        self.seeker = User.objects.create_user(
+            email="seeker@testing.com", name="Testing Seeker", user_type="Job Seeker"
+        )
+        self.profile = UserProfile.objects.create(
+            user=self.seeker,
+            professional_skills=[
+                {"skill_name": "Python", "total_yoe": 4, "last_used": 2024},
+                {"skill_name": "Java", "total_yoe": 1, "last_used": 2012},
+            ],
+        )
+        job_recommender.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def test_jobs_are_ranked_by_skill_match(self):
+        response = self.client.get("/jobs/recommended/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [job["job_id"] for job in response.data],
+            [str(self.python_job.job_id), str(self.java_job.job_id)],
+        )
+        self.assertGreater(
+            response.data[0]["match_score"], response.data[1]["match_score"]
+        )
+
+    def test_job_changes_update_the_matrix(self):
+        self.client.get("/jobs/recommended/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python_job.skills_required = "Go, Kubernetes"
+            self.python_job.job_role = "Platform Engineer"
+            self.python_job.save()
+            Applicants.objects.create(job=self.java_job, user=self.profile)
+
+        self.assertEqual(self.client.get("/jobs/recommended/").data, [])
+
+    def test_only_job_seekers_get_recommendations(self):
+        client = APIClient()
+        client.force_authenticate(self.employer)
+        response = client.get("/jobs/recommended/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class JobSimilarityTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        text = {
+            "job_role": "Senior Python Developer",
+            "skills_required": "Python, Django, PostgreSQL, Redis, Celery, Docker",
+            "about": "Build and scale the backend services behind our hiring platform.",
+        }
+        self.job = create_job(self.employer, self.company, is_active=True, **text)
+        self.repost = create_job(self.employer, self.company, is_active=True, **text)
+        self.other = create_job(
+            self.employer,
+            self.company,
+            is_active=True,
+            job_role="Graphic Designer",
+            skills_required="Figma, Illustrator",
+            about="Design marketing material for our brand.",
+        )
+        job_similarity.clear()
+        self.client = APIClient()
+
+    def test_signatures_are_stored_on_save(self):
+        self.assertEqual(JobSignature.objects.count(), 3)
+        signature = job_similarity.unpack(
+            JobSignature.objects.get(job=self.job).signature
+        )
+        self.assertEqual(len(signature), job_similarity.hasher.num_perm)
+
+    def test_similar_action(self):
+        response = self.client.get(f"/jobs/{self.job.job_id}/similar/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [job["job_id"] for job in response.data], [str(self.repost.job_id)]
+        )
+        self.assertEqual(response.data[0]["similarity"], 1.0)
+
+    def test_similar_follows_edits(self):
+        self.client.get(f"/jobs/{self.job.job_id}/similar/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.repost.job_role = "Pastry Chef"
+            self.repost.skills_required = "Baking"
+            self.repost.about = "Run the morning bakery shift."
+            self.repost.save()
+
+        self.assertEqual(self.client.get(f"/jobs/{self.job.job_id}/similar/").data, [])
+
+    def test_similar_does_not_backfill_signatures(self):
+        JobSignature.objects.filter(job=self.repost).delete()
+        with patch.object(JobSignature.objects, "bulk_create") as bulk_create:
+            response = self.client.get(f"/jobs/{self.job.job_id}/similar/")
+
+        self.assertEqual(response.data, [])
+        bulk_create.assert_not_called()
+
+    def test_signatures_are_upserted_without_conflict_target(self):
+        # MySQL's ON DUPLICATE KEY UPDATE takes no unique_fields, passing
+        # them raises NotSupportedError there
+        with patch.object(
+            connection.features, "supports_update_conflicts_with_target", False
+        ), patch.object(JobSignature.objects, "bulk_create") as bulk_create:
+            self.repost.skills_required = "Baking"
+            self.repost.save()
+
+        self.assertTrue(bulk_create.call_args.kwargs["update_conflicts"])
+        self.assertNotIn("unique_fields", bulk_create.call_args.kwargs)
+
+    def test_duplicate_report(self):
+        JobSignature.objects.all().delete()
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("report_duplicate_jobs", "--fail-on-duplicates", stdout=out)
+
+        report = out.getvalue()
+        self.assertIn("group 1: 2 postings", report)
+        self.assertIn(str(self.repost.job_id), report)
+        self.assertNotIn(str(self.other.job_id), report)
+        # the report computed the signatures it was missing
+        self.assertEqual(JobSignature.objects.count(), 3)
+
+
+class EmployerJobsTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        self.jobs = [
+            create_job(self.employer, self.company, job_role=f"Role {number}")
+            for number in range(3)
+        ]
+        deleted = create_job(self.employer, self.company, job_role="Deleted")
+        Job.objects.filter(job_id=deleted.job_id).update(is_deleted=True)
+
+        JobStatusCount.objects.create(job=self.jobs[0], status="applied", count=3)
+        JobStatusCount.objects.create(job=self.jobs[0], status="shortlisted", count=1)
+        JobStatusCount.objects.create(job=self.jobs[2], status="rejected", count=2)
+
+        job_index.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def test_jobs_are_paginated_with_status_counts(self):
+        with self.assertNumQueries(3):
+            response = self.client.get("/jobs/employer/?limit=2&ordering=created_at")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        first, second = response.data["results"]
+        self.assertEqual(first["job_id"], str(self.jobs[0].job_id))
+        self.assertEqual(first["applicants_by_status"]["applied"], 3)
+        self.assertEqual(first["applicants_by_status"]["shortlisted"], 1)
+        self.assertEqual(sum(second["applicants_by_status"].values()), 0)
+
+    def test_jobs_are_filterable(self):
+        response = self.client.get("/jobs/employer/?search=role 2&omit=description")
+        self.assertEqual(
+            [job["job_id"] for job in response.data["results"]],
+            [str(self.jobs[2].job_id)],
+        )
+        self.assertNotIn("description", response.data["results"][0])
+
+
+class ArchiveJobsTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        seeker = User.objects.create_user(
+            email="seeker@testing.com", name="Testing Seeker", user_type="Job Seeker"
+        )
+        self.profile = UserProfile.objects.create(user=seeker)
+
+        long_ago = timezone.now() - timedelta(days=200)
+        self.deleted_jobs = [create_job(self.employer, self.company) for _ in range(3)]
+        for job in self.deleted_jobs:
+            Applicants.objects.create(job=job, user=self.profile)
+        Job.objects.filter(job_id__in=[job.job_id for job in self.deleted_jobs]).update(
+            is_deleted=True, updated_at=long_ago, created_at=long_ago
+        )
+
+        self.recently_deleted = create_job(self.employer, self.company)
+        Job.objects.filter(job_id=self.recently_deleted.job_id).update(is_deleted=True)
+
+        self.stale_job = create_job(self.employer, self.company, is_active=True)
+        Job.objects.filter(job_id=self.stale_job.job_id).update(created_at=long_ago)
+        self.fresh_job = create_job(self.employer, self.company, is_active=True)
+
+    def test_dry_run_writes_nothing(self):
+        out = StringIO()
+        call_command("archive_jobs", "--dry-run", stdout=out)
+
+        self.assertIn("1 job(s) would be expired", out.getvalue())
+        self.assertIn("3 job(s) would be archived", out.getvalue())
+        self.assertEqual(Job.objects.count(), 6)
+        self.assertFalse(ArchivedJob.objects.exists())
+
+    def test_jobs_are_expired_and_archived(self):
+        call_command("archive_jobs", "--batch-size=2", stdout=StringIO())
+
+        self.assertEqual(
+            set(Job.objects.values_list("job_id", flat=True)),
+            {
+                self.recently_deleted.job_id,
+                self.stale_job.job_id,
+                self.fresh_job.job_id,
+            },
+        )
+        self.assertFalse(Job.objects.get(job_id=self.stale_job.job_id).is_active)
+        self.assertTrue(Job.objects.get(job_id=self.fresh_job.job_id).is_active)
+
+        self.assertEqual(ArchivedJob.objects.count(), 3)
+        self.assertEqual(ArchivedApplicant.objects.count(), 3)
+        self.assertFalse(Applicants.objects.exists())
+        archived = ArchivedJob.objects.get(job_id=self.deleted_jobs[0].job_id)
+        self.assertEqual(archived.data["job_role"], "Data Scientist")
+        self.assertFalse(ArchiveCheckpoint.objects.exists())
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        call_command(
+            "archive_jobs",
+            "--expire-days=0",
+            "--batch-size=2",
+            "--max-batches=1",
+            stdout=StringIO(),
+        )
+        self.assertEqual(ArchivedJob.objects.count(), 2)
+        checkpoint = ArchiveCheckpoint.objects.get(name="archive")
+
+        call_command("archive_jobs", "--expire-days=0", "--resume", stdout=StringIO())
+        self.assertEqual(ArchivedJob.objects.count(), 3)
+        self.assertFalse(ArchiveCheckpoint.objects.filter(pk=checkpoint.pk).exists())
+
+    def test_interrupted_run_is_restarted_without_resume(self):
+        call_command(
+            "archive_jobs",
+            "--expire-days=0",
+            "--batch-size=2",
+            "--max-batches=1",
+            stdout=StringIO(),
+        )
+        self.assertTrue(ArchiveCheckpoint.objects.filter(name="archive").exists())
+
+        call_command("archive_jobs", "--expire-days=0", stdout=StringIO())
+        self.assertEqual(ArchivedJob.objects.count(), 3)
+        self.assertFalse(ArchiveCheckpoint.objects.exists())
+
+
+class CompanyListTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        create_job(self.employer, self.company, is_active=True)
+        create_job(self.employer, self.company, is_active=True)
+        create_job(self.employer, self.company)
+
+        other_employer = User.objects.create_user(
+            email="other@testing.com", name="Other Employer", user_type="Employer"
+        )
+        self.other_company = Company.objects.create(
+            creator=other_employer,
+            name="Another name",
+            location="Remote",
+            about="Testing about",
+            founded_year=2020,
+        )
+        cache.clear()
+        self.client = APIClient()
+
+    def test_companies_are_paginated_with_active_job_counts(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/company/?limit=1")
+
+        data = response.data["data"]
+        self.assertEqual(data["count"], 2)
+        self.assertEqual(data["results"][0]["company_id"], str(self.company.company_id))
+        self.assertEqual(data["results"][0]["active_jobs"], 2)
+
+        response = self.client.get("/company/?ordering=name")
+        self.assertEqual(
+            [company["active_jobs"] for company in response.data["data"]["results"]],
+            [0, 2],
+        )
+
+    def test_list_is_cached_until_jobs_or_companies_change(self):
+        self.client.get("/company/")
+        with self.assertNumQueries(0):
+            self.client.get("/company/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_job(self.employer, self.other_company, is_active=True)
+        response = self.client.get("/company/")
+        self.assertEqual(
+            [company["active_jobs"] for company in response.data["data"]["results"]],
+            [2, 1],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_company.name = "Renamed"
+            self.other_company.save()
+        response = self.client.get("/company/")
+        self.assertEqual(response.data["data"]["results"][1]["name"], "Renamed")
+
+
+class PrefixIndexTestCase(TestCase):
+    def test_words_are_matched_by_prefix_and_ranked_by_weight(self):
+        index = PrefixIndex(scan_limit=1)
+        index.load(
+            [
+                (("company", "1"), "Acme Security", 1),
+                (("company", "2"), "Secure Labs", 5),
+            ]
+        )
+        index.add(("job_role", "security engineer"), "Security Engineer", 3)
+
+        self.assertEqual(
+            [label for _, _, label, _ in index.search("sec")],
+            ["Secure Labs", "Security Engineer", "Acme Security"],
+        )
+        self.assertEqual(
+            [label for _, _, label, _ in index.search("acme s")], ["Acme Security"]
+        )
+
+        index.add_weight(("company", "1"), 10)
+        index.remove(("company", "2"))
+        self.assertEqual(
+            [label for _, _, label, _ in index.search("sec")],
+            ["Acme Security", "Security Engineer"],
+        )
+
+    def test_cached_prefixes_follow_writes(self):
+        cached = PrefixIndex(scan_limit=1)
+        uncached = PrefixIndex(scan_limit=1, max_cached=0)
+        for index in (cached, uncached):
+            index.load(
+                (("company", str(number)), f"Sec Company {number}", number)
+                for number in range(30)
+            )
+        cached.search("sec")
+
+        writes = [
+            lambda index: index.add_weight(("company", "3"), 40),
+            lambda index: index.add(("job_role", "sec ops"), "Sec Ops", 27),
+            lambda index: index.add_weight(("company", "29"), -29),
+            lambda index: index.remove(("company", "28")),
+            lambda index: index.add(("company", "5"), "Other 5", 50),
+        ]
+        for write in writes:
+            write(cached)
+            write(uncached)
+            for prefix in ("s", "sec", "sec c", "company 2", "o"):
+                self.assertEqual(cached.search(prefix), uncached.search(prefix))
+            if write is writes[0]:
+                # raising a weight updates the cached list in place
+                self.assertIn("sec", cached._cache)
+
+
+class CompanyAutocompleteTestCase(TestCase):
+    def setUp(self):
+        self.employer, self.company = create_employer_with_company()
+        create_job(
+            self.employer, self.company, is_active=True, job_role="Test Engineer"
+        )
+        company_autocomplete.clear()
+        self.client = APIClient()
+
+    def test_suggestions_follow_writes(self):
+        response = self.client.get("/company/autocomplete/?q=test")
+        self.assertEqual(
+            [
+                (item["type"], item["label"], item["active_jobs"])
+                for item in response.data
+            ],
+            [("job_role", "Test Engineer", 1), ("company", "Testing name", 1)],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_job(
+                self.employer, self.company, is_active=True, job_role="test  engineer"
+            )
+            create_job(self.employer, self.company, is_active=True, job_role="Tester")
+            self.company.name = "Renamed"
+            self.company.save()
+
+        response = self.client.get("/company/autocomplete/?q=te&limit=5")
+        self.assertEqual(
+            [(item["label"], item["active_jobs"]) for item in response.data],
+            [("Test Engineer", 2), ("Tester", 1)],
+        )
+        self.assertEqual(
+            self.client.get("/company/autocomplete/?q=ren").data[0]["active_jobs"], 3
+        )
@@ -1,25 +1,32 @@
-from django.db import connection
-from django.db.models import Count
+from collections import defaultdict
+
+from django.db.models import Count, Q
 import django_filters.rest_framework as df_filters
 from drf_spectacular.utils import extend_schema
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import BooleanField, Case, Value, When
 from rest_framework import exceptions, parsers, status, viewsets, filters
 
 
 from apps.accounts.permissions import Moderator
 from apps.jobs.constants import response, values
-from apps.userprofile.models import UserProfile
-from apps.applicants.models import Applicants
+from apps.applicants.models import Applicants, EmployerStats, JobStatusCount
+from apps.jobs.bulk import JobBulkWriter
+from apps.jobs.cache import company_response_cache, job_response_cache
 from apps.jobs.models import Company, ContactMessage, Job
-from apps.accounts.permissions import IsEmployer, IsJobSeeker
-from apps.jobs.serializers import CompanySerializer, ContactUsSerializer, JobSerializer, JobsCountByCategoriesSerializer, CompanyStatsResponseSerializer
+from apps.jobs.rollups import JobFacetCounts
+from apps.jobs.signals import jobs_deleted
+from apps.accounts.permissions import IsEmployer, IsJobSeeker, IsProfileCompleted
+from apps.jobs.search import JobSearchFilter, company_autocomplete, compute_facets, job_recommender, job_similarity, trending_keywords
+from apps.jobs.serializers import CompanyListSerializer, CompanySerializer, ContactUsSerializer, JobBulkItemSerializer, JobBulkResponseSerializer, JobSerializer, JobsCountByCategoriesSerializer, JobsCountByJobTypesSerializer, CompanyStatsResponseSerializer
 from apps.jobs.utils.validators import validationClass
+from apps.userprofile.models import UserProfile
 from apps.utils.responses import InternalServerError
-from apps.utils.pagination import DefaultPagination
+from apps.utils.cache import normalize_query_params
+from apps.utils.fieldsets import parse_fieldsets
+from apps.utils.pagination import DefaultPagination, KeysetOptInMixin, KeysetPagination
 
 from .utils.user_permissions import UserTypeCheck
 
@@ -35,7 +42,7 @@ class JobsFilter(df_filters.FilterSet):
         model = Job
         fields = ["category", "job_type", 'experience', "is_active", "is_featured"]
 
-class JobViewSets(viewsets.ModelViewSet):
+class JobViewSets(KeysetOptInMixin, viewsets.ModelViewSet):
     """
     Job object viewsets
     API: /api/v1/jobs
@@ -44,29 +51,114 @@ class JobViewSets(viewsets.ModelViewSet):
         1. List jobs/specific job
         3. check number of applicants
         4. create or update job
+
+    Listing uses limit/offset pagination by default, `?pagination=cursor`
+    switches to keyset pagination on (created_at, job_id). `?fields=` and
+    `?omit=` select the rendered fields, e.g. `?omit=description` for cards.
     """
 
-    queryset = Job.objects.filter(is_deleted=False).annotate(total_applicants=Count("applicants")).order_by('-created_at')
+    queryset = Job.objects.filter(is_deleted=False).order_by('-created_at')
     serializer_class = JobSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter, df_filters.DjangoFilterBackend]
-    search_fields = ["job_role", "location"]
+    filter_backends = [df_filters.DjangoFilterBackend, filters.OrderingFilter, JobSearchFilter]
     filterset_class = JobsFilter
     pagination_class = DefaultPagination
 
     def get_queryset(self):
         queryset = super().get_queryset()
 
-        if self.request.user.is_authenticated and self.request.user.user_type != "Employer":
-            queryset = queryset.annotate(
-                has_applied=Case(
-                    When(applicants__user=UserProfile.objects.get(user=self.request.user), then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                )
-            )
+        # columns left out by ?fields= / ?omit= are not read at all
+        if self.action in ("list", "retrieve", "employer"):
+            deferred_fields = JobSerializer.deferred_model_fields(parse_fieldsets(self.request))
+            if deferred_fields:
+                queryset = queryset.defer(*deferred_fields)
 
         return queryset
 
+    def get_search_scope(self):
+        """Index attributes matching the filters get_queryset adds per action"""
+        if self.action == "employer":
+            return {"employer_id": self.request.user.id}
+        return {}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ("list", "retrieve", "employer"):
+            context["fieldsets"] = parse_fieldsets(self.request)
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Resolve `has_applied` for job seekers with one lookup of their
+        applications to the jobs being serialized, instead of joining
+        tbl_applicants into the listing query.
+        """
+        user = self.request.user
+        if args and user.is_authenticated and user.user_type != "Employer":
+            kwargs.setdefault("context", self.get_serializer_context())
+            kwargs["context"]["applied_job_ids"] = self.get_applied_job_ids(args[0])
+        return super().get_serializer(*args, **kwargs)
+
+    def get_applied_job_ids(self, instance):
+        jobs = instance if isinstance(instance, (list, tuple)) else [instance]
+        job_ids = [job.job_id for job in jobs if isinstance(job, Job)]
+        if not job_ids:
+            return set()
+
+        return set(
+            Applicants.objects.filter(
+                user__user_id=self.request.user.id, job_id__in=job_ids
+            ).values_list("job_id", flat=True)
+        )
+
+    def list(self, request, *args, **kwargs):
+        # only count a search once, not again for each page of its results
+        params = request.query_params
+        if not params.get("offset") and KeysetPagination.cursor_query_param not in params:
+            trending_keywords.record(params.get("search"))
+
+        return self.cached_response(self.list_jobs, request, *args, **kwargs)
+
+    def list_jobs(self, request, *args, **kwargs):
+        """
+        `?facets=true` adds counts per category, job_type, is_featured and
+        experience bucket of the jobs matching the same filters and search
+        """
+        # the filter backends run once, for both the page and the facets
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        api_response = self.get_paginated_response(serializer.data)
+        if request.query_params.get("facets") in ("true", "1"):
+            api_response.data["facets"] = compute_facets(queryset)
+        return api_response
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, view_method, request, *args, **kwargs):
+        """
+        Serve anonymous reads from job_response_cache, keyed on the
+        normalized query string. Authenticated users are never cached as
+        their responses carry per user data such as has_applied.
+        """
+        if request.user.is_authenticated:
+            return view_method(request, *args, **kwargs)
+
+        key = (
+            self.action,
+            kwargs.get("pk"),
+            request.get_host(),
+            normalize_query_params(request.query_params),
+        )
+        data = job_response_cache.get(*key)
+        if data is not None:
+            return Response(data)
+
+        api_response = view_method(request, *args, **kwargs)
+        if api_response.status_code == status.HTTP_200_OK:
+            job_response_cache.set(api_response.data, *key)
+        return api_response
+
     def create(self, request, *args, **kwargs):
         """Overriding the create method to include permissions"""
 
@@ -94,6 +186,67 @@ class JobViewSets(viewsets.ModelViewSet):
             {"msg": "Created", "job_id": job.job_id}, status=status.HTTP_201_CREATED
         )
 
+    @extend_schema(
+        request=JobBulkItemSerializer(many=True),
+        responses={200: JobBulkResponseSerializer},
+        tags=["jobs"],
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[IsAuthenticated, IsEmployer, IsProfileCompleted],
+    )
+    def bulk(self, request):
+        """
+        API: POST /jobs/bulk
+        Create or update many jobs of the employer at once. The body is a
+        list of jobs, items with a job_id update that job, the others are
+        created. Items are validated together, the valid ones are written in
+        one transaction and the result of every item is reported.
+        """
+
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise exceptions.ValidationError("Expected a non empty list of jobs.")
+        if len(items) > values.BULK_JOBS_MAX_ITEMS:
+            raise exceptions.ValidationError(
+                f"At most {values.BULK_JOBS_MAX_ITEMS} jobs can be posted at once."
+            )
+
+        results = [None] * len(items)
+        valid_items, valid_positions = [], []
+        for position, item in enumerate(items):
+            serializer = JobBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                valid_positions.append(position)
+                valid_items.append(serializer.validated_data)
+            else:
+                results[position] = {"status": "error", "errors": serializer.errors}
+
+        if valid_items:
+            writer = JobBulkWriter(
+                employer=request.user,
+                company=Company.objects.get(creator=request.user),
+            )
+            for position, result in zip(valid_positions, writer.write(valid_items)):
+                results[position] = result
+
+        for position, result in enumerate(results):
+            result["index"] = position
+
+        statuses = [result["status"] for result in results]
+        return Response(
+            JobBulkResponseSerializer(
+                {
+                    "created": statuses.count("created"),
+                    "updated": statuses.count("updated"),
+                    "failed": statuses.count("error"),
+                    "results": results,
+                }
+            ).data,
+            status=status.HTTP_200_OK,
+        )
+
     def update(self, request, *args, **kwargs):
         """
         API: UPDATE /jobs/{id}
@@ -151,7 +304,9 @@ class JobViewSets(viewsets.ModelViewSet):
         # else, set is_created=False and is_deleted=True
         try:
             updated_job_data = Job.objects.filter(job_id=pk)
+            deleted_jobs = list(updated_job_data.filter(is_deleted=False))
             updated_job_data.update(is_created=False, is_deleted=True, is_active=False)
+            jobs_deleted.send(sender=Job, jobs=deleted_jobs)
             serialized_updated_job_data = JobSerializer(updated_job_data, many=True)
             return response.create_response(
                 serialized_updated_job_data.data, status.HTTP_200_OK
@@ -165,12 +320,20 @@ class JobViewSets(viewsets.ModelViewSet):
     def get_trending_keywords(self, request):
         """
         API: /get_trending_keywords
-        This API returns a list of trending keywords
+        This API returns a list of trending keywords, the most searched
+        terms first, topped up with the curated keywords
         """
 
         try:
+            keywords = trending_keywords.top(values.TRENDING_KEYWORDS_COUNT)
+            for keyword in values.trending_keywords:
+                if len(keywords) >= values.TRENDING_KEYWORDS_COUNT:
+                    break
+                if keyword.lower() not in keywords:
+                    keywords.append(keyword)
+
             return response.create_response(
-                {"trending_keywords": values.trending_keywords}, status.HTTP_200_OK
+                {"trending_keywords": keywords}, status.HTTP_200_OK
             )
         except Exception:
             return response.create_response(
@@ -183,18 +346,116 @@ class JobViewSets(viewsets.ModelViewSet):
         tags=["jobs"]
     )
     def get_count_by_categories(self, request):
-        category_job_counts = Job.objects.values('category').annotate(count=Count('job_id'))
+        """
+        API: /get_count_by_categories
+        Number of active jobs per category, served from the facet rollup
+        """
+        category_job_counts = [
+            {"category": category, "count": count}
+            for category, count in JobFacetCounts.counts("category").items()
+        ]
         return Response(JobsCountByCategoriesSerializer(category_job_counts, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    @extend_schema(
+        responses={200: JobsCountByJobTypesSerializer(many=True)},
+        tags=["jobs"]
+    )
+    def get_count_by_job_types(self, request):
+        """
+        API: /get_count_by_job_types
+        Number of active jobs per job type, served from the facet rollup
+        """
+        job_type_counts = [
+            {"job_type": job_type, "count": count}
+            for job_type, count in JobFacetCounts.counts("job_type").items()
+        ]
+        return Response(JobsCountByJobTypesSerializer(job_type_counts, many=True).data)
     
     
+    @action(detail=True, methods=["get"])
+    def similar(self, request, pk=None):
+        """
+        Active jobs whose role, skills and about text are most similar to
+        this job's, found through the MinHash LSH index
+        API: /api/v1/jobs/<job_id>/similar/
+        """
+        job = self.get_object()
+        scores = dict(
+            job_similarity.similar(
+                job.job_id, values.SIMILAR_JOBS_THRESHOLD, values.SIMILAR_JOBS_COUNT
+            )
+        )
+        jobs = {
+            job.job_id: job
+            for job in self.get_queryset().filter(job_id__in=scores, is_active=True)
+        }
+
+        similar_jobs = [jobs[job_id] for job_id in scores if job_id in jobs]
+        data = self.get_serializer(similar_jobs, many=True).data
+        for job, score in zip(data, (scores[job.job_id] for job in similar_jobs)):
+            job["similarity"] = round(score, 4)
+        return Response(data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAuthenticated, IsJobSeeker],
+    )
+    def recommended(self, request):
+        """
+        Active jobs best matching the professional skills of the job seeker,
+        excluding the ones they already applied to
+        API: /api/v1/jobs/recommended/?limit=10
+        """
+        try:
+            limit = int(request.query_params.get("limit", values.RECOMMENDED_JOBS_COUNT))
+        except ValueError:
+            raise exceptions.ValidationError({"limit": "A valid integer is required."})
+        limit = max(1, min(limit, values.RECOMMENDED_JOBS_MAX_COUNT))
+
+        profile = UserProfile.objects.filter(user_id=request.user.id).first()
+        if profile is None:
+            return Response([])
+
+        applied = Applicants.objects.filter(user=profile).values_list("job_id", flat=True)
+        scores = dict(job_recommender.recommend(profile, limit, exclude=set(applied)))
+        jobs = {
+            job.job_id: job
+            for job in self.get_queryset().filter(job_id__in=scores)
+        }
+
+        recommended = [jobs[job_id] for job_id in scores if job_id in jobs]
+        data = self.get_serializer(recommended, many=True).data
+        for job, score in zip(data, (scores[job.job_id] for job in recommended)):
+            job["match_score"] = round(score, 4)
+        return Response(data)
+
     @action(
         detail=False, 
         methods=['get'],
         permission_classes=[IsAuthenticated, IsEmployer]
     )
     def employer(self, request):
-        jobs = Job.objects.filter(employer = request.user).order_by('-created_at')
-        return Response(JobSerializer(jobs, many=True).data)
+        """
+        Non-deleted jobs of the employer, paginated, filtered and searched
+        like the job listing, each with its applicant counts per status
+        API: /api/v1/jobs/employer/?is_active=true&limit=20
+        """
+        queryset = self.filter_queryset(self.get_queryset().filter(employer=request.user))
+        page = self.paginate_queryset(queryset)
+
+        status_counts = defaultdict(dict)
+        rows = JobStatusCount.objects.filter(
+            job_id__in=[job.job_id for job in page], count__gt=0
+        ).values_list("job_id", "status", "count")
+        for job_id, job_status, count in rows:
+            status_counts[job_id][job_status] = count
+
+        context = self.get_serializer_context()
+        context["status_counts"] = status_counts
+        serializer = self.get_serializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
 
 
     
@@ -215,29 +476,51 @@ class CompanyViewSets(viewsets.ModelViewSet):
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
 
     # Basic filters
-    filter_backends = [df_filters.DjangoFilterBackend]
+    filter_backends = [df_filters.DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ["name", "location"]
+    ordering_fields = ["name", "founded_year", "active_jobs"]
+    pagination_class = DefaultPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = queryset.filter(is_deleted=False).annotate(
+                active_jobs=Count(
+                    "company",
+                    filter=Q(company__is_active=True, company__is_deleted=False),
+                )
+            ).order_by("-active_jobs", "name", "company_id")
+        return queryset
 
     def list(self, request):
         """
         Method to return a list of companies available,
         Along with the count of active jobs present in the company
+
+        The page is read with one grouped query and served from
+        company_response_cache, which company and job writes invalidate.
         """
 
-        try:
-            company_data = self.queryset.filter(is_deleted=False)
-            serialized_company_data = self.serializer_class(
-                company_data, many=True, context={"request": request}
-            )
+        key = (request.get_host(), normalize_query_params(request.query_params))
+        data = company_response_cache.get(*key)
+        if data is not None:
+            return response.create_response(data, status.HTTP_200_OK)
 
-            return response.create_response(
-                serialized_company_data.data, status.HTTP_200_OK
+        try:
+            company_data = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(company_data)
+            serialized_company_data = CompanyListSerializer(
+                page, many=True, context={"request": request}
             )
+            data = self.get_paginated_response(serialized_company_data.data).data
         except Exception:
             return response.create_response(
                 response.SOMETHING_WENT_WRONG, status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+        company_response_cache.set(data, *key)
+        return response.create_response(data, status.HTTP_200_OK)
+
     @extend_schema(exclude=True)
     def update(self, request, *args, **kwargs):
         """
@@ -347,6 +630,21 @@ class CompanyViewSets(viewsets.ModelViewSet):
             status.HTTP_201_CREATED,
         )
 
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """
+        Company names and job roles starting with any word of `q`, ranked
+        by their number of active jobs
+        API: /api/v1/company/autocomplete/?q=sec&limit=10
+        """
+        try:
+            limit = int(request.query_params.get("limit", values.AUTOCOMPLETE_COUNT))
+        except ValueError:
+            raise exceptions.ValidationError({"limit": "A valid integer is required."})
+        limit = max(1, min(limit, values.AUTOCOMPLETE_MAX_COUNT))
+
+        return Response(company_autocomplete.suggest(request.query_params.get("q", ""), limit))
+
     @action(detail=False, methods=["get"])
     def me(self, request):
         if request.user.is_anonymous:
@@ -419,32 +717,12 @@ class CompanyStats(APIView):
 
     @extend_schema(tags=["company"], responses={200: CompanyStatsResponseSerializer})
     def get(self, request):
-        """Get company stats"""
-        try:
-            raw_query = """
-            SELECT 
-                COUNT(DISTINCT(tj.job_id)) AS job_count, 
-                COUNT(ta.id) AS applications_count,
-                COUNT(CASE WHEN ta.status != 'applied' THEN 1 ELSE NULL END) AS reviewed_count,
-                COUNT(CASE WHEN ta.status = 'shortlisted' THEN 1 ELSE NULL END) AS shortlisted_count
-            FROM tbl_job tj 
-            JOIN tbl_applicants ta ON tj.job_id = ta.job_id 
-            WHERE tj.employer_id = %s
-            """
-
-            # Execute the raw SQL query
-            with connection.cursor() as cursor:
-                cursor.execute(raw_query, [str(request.user.id).replace("-", "")])
-                result = cursor.fetchone()
-
-            job_count, applications_count, reviewed_count, shortlisted_count = result
-            company_stats = CompanyStatsResponseSerializer({
-                "job_count": job_count,
-                "applications_count": applications_count,
-                "reviewed_count": reviewed_count,
-                "shortlisted_count": shortlisted_count
-            })
-
-            return Response(company_stats.data)
-        except Exception as e:
-            raise InternalServerError()
\ No newline at end of file
+        """
+        Get company stats, read from the EmployerStats rollup which the
+        apply and status update flows maintain
+        """
+        stats = EmployerStats.objects.filter(employer_id=request.user.id).first()
+        company_stats = CompanyStatsResponseSerializer(
+            {name: getattr(stats, name, 0) for name in EmployerStats.COUNTS}
+        )
+        return Response(company_stats.data)
\ No newline at end of file
@@ -0,0 +1,65 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+
+
+def normalize_query_params(query_params):
+    """Render query params in a canonical order so equivalent URLs share a key"""
+    return urlencode(
+        sorted(
+            (key, value)
+            for key in query_params
+            for value in query_params.getlist(key)
+            if value != ""
+        )
+    )
+
+
+class VersionedCache:
+    """
+    Cache namespace invalidated as a whole by bumping a version counter.
+
+    Entries are stored under `<namespace>:<version>:<digest>`, so bumping the
+    version makes every older entry unreachable without having to know or
+    delete its key; the backend then evicts them on expiry. The version
+    starts from the current time rather than 1, so an evicted counter can
+    never come back to a version that older entries were written under.
+    """
+
+    def __init__(self, namespace, timeout=300, cache_alias="default"):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @property
+    def version_key(self):
+        return f"{self.namespace}:version"
+
+    def version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            self.cache.add(self.version_key, time.time_ns(), timeout=None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def bump(self):
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            self.cache.add(self.version_key, time.time_ns(), timeout=None)
+
+    def make_key(self, *parts):
+        digest = hashlib.md5(repr(parts).encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{self.version()}:{digest}"
+
+    def get(self, *parts):
+        return self.cache.get(self.make_key(*parts))
+
+    def set(self, value, *parts):
+        self.cache.set(self.make_key(*parts), value, timeout=self.timeout)
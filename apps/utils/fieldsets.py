@@ -0,0 +1,105 @@
+"""
+Sparse fieldsets: `?fields=a,b` limits a response to the listed fields,
+`?omit=c` drops fields from it. Nested serializers are addressed with a
+dotted path, e.g. `?fields=status,job.job_role` or `?omit=job.description`.
+
+The same selection drives the serializer and the queryset, so columns
+which won't be rendered aren't read from the database either.
+"""
+
+FIELDS_QUERY_PARAM = "fields"
+OMIT_QUERY_PARAM = "omit"
+
+
+def parse_fieldsets(request):
+    """Return the requested and omitted field names of the request"""
+
+    def parse(param):
+        value = request.query_params.get(param)
+        if value is None:
+            return None
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    return {
+        "fields": parse(FIELDS_QUERY_PARAM),
+        "omit": parse(OMIT_QUERY_PARAM) or set(),
+    }
+
+
+def select_field_names(names, fieldsets, groups=None, prefix=""):
+    """
+    Filter `names` (the fields of a serializer found at `prefix`) down to
+    the ones the fieldsets ask for. `groups` maps fields composed in
+    to_representation to the fields they are built from, those members
+    are kept or dropped together with their group.
+    """
+    groups = groups or {}
+    group_of = {
+        member: group for group, members in groups.items() for member in members
+    }
+
+    def relative(selected):
+        return {name[len(prefix) :] for name in selected if name.startswith(prefix)}
+
+    wanted = None
+    requested = fieldsets.get("fields")
+    if requested is not None:
+        # only the top segment matters here, `job.slug` keeps the `job` field
+        wanted = {name.split(".")[0] for name in relative(requested)} or None
+    omitted = {name for name in relative(fieldsets.get("omit", ())) if "." not in name}
+
+    def keep(name):
+        name = group_of.get(name, name)
+        return (wanted is None or name in wanted) and name not in omitted
+
+    return [name for name in names if keep(name)]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin applying the `fieldsets` found in the context, as
+    produced by parse_fieldsets. Set `fieldset_groups` for fields composed
+    from several model fields in to_representation.
+    """
+
+    fieldset_groups = {}
+
+    def fieldset_prefix(self):
+        parts = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                parts.append(node.field_name)
+            node = node.parent
+        return "".join(f"{part}." for part in reversed(parts))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldsets = self.context.get("fieldsets")
+        if not fieldsets:
+            return fields
+
+        keep = select_field_names(
+            fields, fieldsets, self.fieldset_groups, self.fieldset_prefix()
+        )
+        return {name: field for name, field in fields.items() if name in keep}
+
+    @classmethod
+    def deferred_model_fields(cls, fieldsets, prefix=""):
+        """
+        Names of the model's concrete fields the serializer won't render,
+        ready to be passed to QuerySet.defer() (prefix with `job__` etc.
+        for related models).
+        """
+        if not fieldsets:
+            return []
+
+        names = [
+            field.name
+            for field in cls.Meta.model._meta.concrete_fields
+            if not field.primary_key
+        ]
+        keep = select_field_names(
+            names, fieldsets, cls.fieldset_groups, prefix.replace("__", ".")
+        )
+        return [f"{prefix}{name}" for name in names if name not in keep]
@@ -1,7 +1,216 @@
-from rest_framework import pagination
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework import exceptions, pagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
 
 class DefaultPagination(pagination.LimitOffsetPagination):
     default_limit = 10
     max_limit = 100
 
-    
\ No newline at end of file
+
+class KeysetOptInMixin:
+    """
+    View mixin using KeysetPagination for requests which opt into it and
+    the view's `pagination_class` for every other request
+    """
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.request is not None and KeysetPagination.is_requested(self.request):
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination keyed on (created_at, primary key).
+
+    Every page is fetched with a seek predicate on the last row seen
+    instead of an OFFSET, and no COUNT(*) is issued, so the cost of a page
+    does not depend on how deep into the result set it is. The primary key
+    breaks ties between rows created within the same timestamp.
+
+    The mode is opt-in: it is used when the request carries
+    `?pagination=cursor` or a `cursor` returned by a previous page.
+    """
+
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    mode_query_value = "cursor"
+    page_size = 10
+    page_size_query_param = "limit"
+    max_page_size = 100
+    ordering_field = "created_at"
+    invalid_cursor_message = "Invalid cursor"
+
+    @classmethod
+    def is_requested(cls, request):
+        """Return True if the request opted into cursor pagination"""
+        params = request.query_params
+        return (
+            params.get(cls.mode_query_param) == cls.mode_query_value
+            or cls.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.descending = self.get_descending(request, view)
+        self.pk_name = queryset.model._meta.pk.name
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor["reverse"]
+
+        # walking backwards means seeking in the opposite direction and
+        # flipping the fetched rows back into display order afterwards
+        seek_down = self.descending != reverse
+        ordering = [self.ordering_field, self.pk_name]
+        if seek_down:
+            ordering = ["-" + field for field in ordering]
+        queryset = queryset.order_by(*ordering)
+
+        if cursor is not None:
+            queryset = queryset.filter(
+                self.seek_filter(cursor["position"], cursor["pk"], seek_down)
+            )
+
+        # fetch one extra row to find out if there is a following page
+        results = list(queryset[: self.page_size + 1])
+        has_following = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def seek_filter(self, position, pk, seek_down):
+        """Build the (created_at, pk) row comparison as a Q object"""
+        lookup = "lt" if seek_down else "gt"
+        return Q(**{f"{self.ordering_field}__{lookup}": position}) | Q(
+            **{self.ordering_field: position, f"{self.pk_name}__{lookup}": pk}
+        )
+
+    def get_descending(self, request, view):
+        """
+        Cursor pages are always keyed on created_at, so the only orderings
+        OrderingFilter may ask for are created_at in either direction.
+        """
+        ordering = request.query_params.get("ordering", "").strip()
+        if ordering in ("", "-" + self.ordering_field):
+            return True
+        if ordering == self.ordering_field:
+            return False
+
+        raise exceptions.ValidationError(
+            {
+                "ordering": f"Cursor pagination only supports ordering by "
+                f"'{self.ordering_field}' or '-{self.ordering_field}'"
+            }
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            position = parse_datetime(tokens["p"][0])
+            pk = tokens["k"][0]
+            reverse = tokens.get("r", ["0"])[0] == "1"
+        except (TypeError, ValueError, KeyError, IndexError):
+            raise exceptions.NotFound(self.invalid_cursor_message)
+
+        if position is None or not pk:
+            raise exceptions.NotFound(self.invalid_cursor_message)
+
+        return {"position": position, "pk": pk, "reverse": reverse}
+
+    def encode_cursor(self, instance, reverse):
+        tokens = {
+            "p": getattr(instance, self.ordering_field).isoformat(),
+            "k": str(getattr(instance, self.pk_name)),
+        }
+        if reverse:
+            tokens["r"] = "1"
+
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 'cursor' to use cursor pagination.",
+                "schema": {"type": "string"},
+            },
+        ]
@@ -0,0 +1,75 @@
+import string
+import threading
+
+from django.apps import apps
+
+SLUG_ALPHABET = string.digits + string.ascii_uppercase
+SLUG_LENGTH = 9
+SLUG_SPACE = len(SLUG_ALPHABET) ** SLUG_LENGTH
+
+# affine permutation of the slug space, the multiplier is coprime with 36
+# so every sequence number maps to a different slug
+PERMUTATION_MULTIPLIER = 62768116757593
+PERMUTATION_OFFSET = 27182818284590
+
+
+def encode_slug(number):
+    """Map a sequence number to a fixed width base36 slug"""
+    number = (number * PERMUTATION_MULTIPLIER + PERMUTATION_OFFSET) % SLUG_SPACE
+    characters = []
+    for _ in range(SLUG_LENGTH):
+        number, remainder = divmod(number, len(SLUG_ALPHABET))
+        characters.append(SLUG_ALPHABET[remainder])
+    return "".join(reversed(characters))
+
+
+class SlugAllocator:
+    """
+    Hands out slugs that are unique by construction, so saving a model
+    doesn't need to check the table for a free one first.
+
+    Slugs are derived from sequence numbers reserved in blocks: inserting a
+    row into tbl_slug_block yields an auto-increment id which is the block
+    number, no two callers ever get the same one, and the `block_size`
+    numbers of a block are then handed out from memory. The numbers go
+    through a permutation of the base36 space so consecutive slugs don't
+    look sequential. Sequence slugs are 9 characters long, which keeps them
+    apart from the 8 character random slugs issued before.
+    """
+
+    def __init__(self, name, block_size=100):
+        self.name = name
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def reserve_block(self):
+        SlugBlock = apps.get_model("accounts", "SlugBlock")
+        block = SlugBlock.objects.create(name=self.name)
+        self._next = block.id * self.block_size
+        self._end = self._next + self.block_size
+
+    def allocate(self):
+        return self.allocate_many(1)[0]
+
+    def allocate_many(self, count):
+        """Bulk mode, e.g. for objects passed to bulk_create"""
+        numbers = []
+        with self._lock:
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    self.reserve_block()
+                take = min(count - len(numbers), self._end - self._next)
+                numbers.extend(range(self._next, self._next + take))
+                self._next += take
+        return [encode_slug(number) for number in numbers]
+
+    def assign(self, instances, field_name="slug"):
+        """Give a slug to each instance which doesn't have one yet"""
+        missing = [
+            instance for instance in instances if not getattr(instance, field_name)
+        ]
+        for instance, slug in zip(missing, self.allocate_many(len(missing))):
+            setattr(instance, field_name, slug)
+        return instances
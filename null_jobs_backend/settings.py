@@ -256,3 +256,51 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 # Set DATA_UPLOAD_MAX_NUMBER_FIELDS to a custom value
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 3000
+
+# Seconds after which a worker rebuilds its in-memory job search index, this
+# bounds how long jobs written by other workers can be missing from search
+JOB_SEARCH_INDEX_TTL = int(os.getenv("JOB_SEARCH_INDEX_TTL", 900))
+
+# The same for the other in-memory indexes: job recommendations, similar jobs
+# and the company/role autocomplete
+JOB_RECOMMENDER_TTL = int(os.getenv("JOB_RECOMMENDER_TTL", 900))
+JOB_SIMILARITY_INDEX_TTL = int(os.getenv("JOB_SIMILARITY_INDEX_TTL", 1800))
+COMPANY_AUTOCOMPLETE_TTL = int(os.getenv("COMPANY_AUTOCOMPLETE_TTL", 900))
+
+# Build the in-memory job indexes in the background as soon as a worker gets
+# its first request, rather than in the first request which needs them
+JOB_INDEXES_WARM_UP = os.getenv("JOB_INDEXES_WARM_UP", "true").lower() == "true"
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "null-jobs",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+}
+
+# Seconds an anonymous job listing stays cached. Job writes invalidate it
+# right away, this only bounds how stale the applicant counts can get
+JOB_RESPONSE_CACHE_TIMEOUT = int(os.getenv("JOB_RESPONSE_CACHE_TIMEOUT", 60))
+
+# Seconds the active job counts per category and job_type stay cached,
+# this bounds how stale other workers' counts can get after a job write
+JOB_FACET_CACHE_TIMEOUT = int(os.getenv("JOB_FACET_CACHE_TIMEOUT", 60))
+
+# Seconds a company list page stays cached, company and job writes
+# invalidate it right away
+COMPANY_RESPONSE_CACHE_TIMEOUT = int(os.getenv("COMPANY_RESPONSE_CACHE_TIMEOUT", 300))
+
+# Trending search keywords: seconds between merges of each worker's sketch
+# into the database, and the half life of a search in the ranking
+TRENDING_KEYWORDS_FLUSH_INTERVAL = int(os.getenv("TRENDING_KEYWORDS_FLUSH_INTERVAL", 300))
+TRENDING_KEYWORDS_HALF_LIFE = int(os.getenv("TRENDING_KEYWORDS_HALF_LIFE", 24 * 60 * 60))
+
+# archive_jobs: active jobs older than JOB_EXPIRY_DAYS are deactivated,
+# jobs soft deleted more than JOB_ARCHIVE_AFTER_DAYS ago are moved out of
+# tbl_job into the archive tables
+JOB_EXPIRY_DAYS = int(os.getenv("JOB_EXPIRY_DAYS", 90))
+JOB_ARCHIVE_AFTER_DAYS = int(os.getenv("JOB_ARCHIVE_AFTER_DAYS", 30))
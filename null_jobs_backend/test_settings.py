@@ -2,3 +2,6 @@ from .settings import *
 
 DATABASES["default"]["ENGINE"] = "django.db.backends.sqlite3"
 DATABASES["default"]["NAME"] = "mytestdatabase"
+
+# the tests build the job indexes in the test case's own transaction
+JOB_INDEXES_WARM_UP = False